@@ -0,0 +1,72 @@
+"""
+Times combinefeeds on a local archive and records its peak traced memory, which should
+stay the same as the number of past runs in the archive grows.
+"""
+
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+from scrapy.settings import Settings
+
+from city_scrapers.commands.combinefeeds import Command
+
+SPIDER_NAMES = ["spider_{}".format(idx) for idx in range(10)]
+MEETINGS_PER_FEED = 300
+RUNS_PER_DAY = 4
+
+
+class FakeSpiderLoader:
+    def list(self):
+        return SPIDER_NAMES
+
+
+class FakeCrawlerProcess:
+    spider_loader = FakeSpiderLoader()
+
+
+def write_archive(root, days):
+    now = datetime.now()
+    for day in range(days):
+        day_dt = now - timedelta(days=day)
+        for run in range(RUNS_PER_DAY):
+            run_dir = root / day_dt.strftime("%Y/%m/%d") / "{:02d}00".format(run)
+            run_dir.mkdir(parents=True)
+            for name in SPIDER_NAMES:
+                with open(run_dir / "{}.json".format(name), "w") as f:
+                    for idx in range(MEETINGS_PER_FEED):
+                        start = day_dt + timedelta(days=idx - MEETINGS_PER_FEED // 2)
+                        item = {
+                            "_id": "ocd-event/{}-{}".format(name, idx),
+                            "name": "Board Meeting",
+                            "start_time": start.isoformat(timespec="seconds"),
+                        }
+                        f.write(json.dumps(item) + "\n")
+
+
+def combine(root):
+    command = Command()
+    command.settings = Settings(
+        {
+            "FEED_URI": str(root / "%(year)s/%(month)s/%(day)s/%(name)s.json"),
+            "ITEM_PIPELINES": {
+                "city_scrapers_core.pipelines.OpenCivicDataPipeline": 400
+            },
+        }
+    )
+    command.crawler_process = FakeCrawlerProcess()
+    tracemalloc.start()
+    try:
+        command.run([], None)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("days", [1, 30, 90])
+def bench_combinefeeds_archive(benchmark, tmp_path, days):
+    write_archive(tmp_path, days)
+    peak = benchmark.pedantic(combine, args=(tmp_path,), rounds=3)
+    benchmark.extra_info["peak_memory_kb"] = peak // 1024
+    assert (tmp_path / "latest.json").exists()
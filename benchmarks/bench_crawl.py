@@ -0,0 +1,166 @@
+"""
+Times complete crawls through the scheduler, middlewares and pipelines against a local
+replay server, using a recording built from the pgh_public_schools and
+pitt_ethics_board fixtures. Each response is delayed to stand in for a remote site, so
+concurrency settings change the results like they would on a live crawl.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta
+from os.path import dirname, join
+
+import pytest
+
+from city_scrapers.replay import RecordingStore, ReplayServer
+
+ROOT_DIR = dirname(dirname(__file__))
+FILES_DIR = join(ROOT_DIR, "tests", "files")
+EVENT_COUNT = 200
+LATENCY = 0.05
+
+API_URL = "https://awsapieast1-prod2.schoolwires.com/REST/api/v4/CalendarEvents/"
+JSON_HEADERS = {"Content-Type": ["application/json; charset=utf-8"]}
+
+
+def read_fixture(*path):
+    with open(join(FILES_DIR, *path), "rb") as f:
+        return f.read()
+
+
+def record_fixtures(store):
+    """Record the token, calendar and detail requests of pgh_public_schools for
+    EVENT_COUNT events, and the single page of pitt_ethics_board"""
+    store.add(
+        "pgh_public_schools",
+        "GET",
+        "https://www.pghschools.org/Generator/TokenGenerator.ashx/ProcessRequest",
+        b"",
+        200,
+        JSON_HEADERS,
+        read_fixture("pgh_public_schools", "token.json"),
+    )
+    calendar_event = json.loads(read_fixture("pgh_public_schools", "calendar.json"))[0]
+    detail = json.loads(read_fixture("pgh_public_schools", "detail.json"))
+    start = datetime.strptime(detail["StartDate"], "%Y-%m-%dT%H:%M:%S")
+    events = []
+    for idx in range(EVENT_COUNT):
+        events.append(dict(calendar_event, Id=idx))
+        detail_start = start + timedelta(days=idx * 7)
+        detail.update(
+            Id=idx,
+            StartDate=detail_start.isoformat(),
+            EndDate=(detail_start + timedelta(hours=2)).isoformat(),
+        )
+        store.add(
+            "pgh_public_schools",
+            "GET",
+            API_URL + "GetEventDate/1/{}".format(idx),
+            b"",
+            200,
+            JSON_HEADERS,
+            json.dumps(detail).encode(),
+        )
+    store.add(
+        "pgh_public_schools",
+        "GET",
+        API_URL + "GetEvents/1",
+        b"",
+        200,
+        JSON_HEADERS,
+        json.dumps(events).encode(),
+    )
+    store.add(
+        "pitt_ethics_board",
+        "GET",
+        "http://pittsburghpa.gov/ehb/ehb-meetings",
+        b"",
+        200,
+        {"Content-Type": ["text/html; charset=utf-8"]},
+        read_fixture("pitt_ethics_board.html"),
+    )
+
+
+@pytest.fixture(scope="module")
+def replay_url(tmp_path_factory):
+    store = RecordingStore(str(tmp_path_factory.mktemp("replay") / "recordings.db"))
+    record_fixtures(store)
+    server = ReplayServer(("127.0.0.1", 0), store, latency=LATENCY)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(server.server_port)
+    server.shutdown()
+    server.server_close()
+    store.close()
+
+
+def crawl(spider_name, replay_url, settings):
+    """Run a crawl in a new process, since the Twisted reactor can't be restarted"""
+    args = [sys.executable, "-m", "scrapy", "crawl", spider_name]
+    for name, value in dict(
+        settings, CITY_SCRAPERS_REPLAY_URL=replay_url, LOG_LEVEL="INFO"
+    ).items():
+        args.extend(["-s", "{}={}".format(name, value)])
+    env = dict(os.environ, SCRAPY_SETTINGS_MODULE="city_scrapers.settings.replay")
+    result = subprocess.run(
+        args,
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        check=True,
+    )
+    return stat(result.stdout, "item_scraped_count"), stat(
+        result.stdout, "downloader/request_count"
+    )
+
+
+def stat(log, name):
+    match = re.search(r"'{}': (\d+)".format(name), log)
+    return int(match.group(1)) if match else 0
+
+
+@pytest.mark.parametrize(
+    "spider_name,settings,warm_cache",
+    [
+        ("pgh_public_schools", {"CONCURRENT_REQUESTS_PER_DOMAIN": 1}, False),
+        ("pgh_public_schools", {"CONCURRENT_REQUESTS_PER_DOMAIN": 8}, False),
+        ("pgh_public_schools", {"CONCURRENT_REQUESTS_PER_DOMAIN": 32}, False),
+        (
+            "pgh_public_schools",
+            {"CONCURRENT_REQUESTS_PER_DOMAIN": 32, "AUTOTHROTTLE_ENABLED": True},
+            False,
+        ),
+        ("pgh_public_schools", {}, True),
+        ("pitt_ethics_board", {}, False),
+    ],
+    ids=[
+        "pgh_public_schools-concurrency-1",
+        "pgh_public_schools-concurrency-8",
+        "pgh_public_schools-concurrency-32",
+        "pgh_public_schools-autothrottle",
+        "pgh_public_schools-cached-details",
+        "pitt_ethics_board",
+    ],
+)
+def bench_crawl(benchmark, tmp_path, replay_url, spider_name, settings, warm_cache):
+    cache_path = tmp_path / "spider_cache.db"
+    settings = dict(settings, CITY_SCRAPERS_SPIDER_CACHE_PATH=str(cache_path))
+    if warm_cache:
+        crawl(spider_name, replay_url, settings)
+
+    def setup():
+        # Start each round without values that spiders cached in earlier rounds
+        if not warm_cache and cache_path.exists():
+            cache_path.unlink()
+        return (spider_name, replay_url, settings), {}
+
+    item_count, request_count = benchmark.pedantic(crawl, setup=setup, rounds=3)
+    benchmark.extra_info["items"] = item_count
+    benchmark.extra_info["requests"] = request_count
+    assert item_count > 0
@@ -0,0 +1,197 @@
+"""
+Times city_scrapers.utils.dates against the date parsing spiders did before moving onto
+it, on a thousand unique strings of each shape the spiders read.
+
+The batch benchmarks time parse_dates against calling strptime for each string, on the
+dates of the scaled pitt_art_commission fixture and on strings in the formats of the
+other list-style pages.
+
+    python -m pytest benchmarks/bench_dates.py
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import dateutil.parser
+import pytest
+
+from city_scrapers.utils.dates import (
+    find_dates,
+    parse_date,
+    parse_dates,
+    parse_datetime,
+    parse_time,
+)
+
+from .fixtures import SCALED_FIXTURES, scaled_fixture
+
+ROUNDS = 20
+DAYS = [datetime(2019, 1, 1) + timedelta(days=idx) for idx in range(1000)]
+MONTH_NAMES = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+FINANCE_PATTERN = (
+    "(january|february|march|april|may|june|"
+    + "july|august|september|october|november|december) "
+    + "(\\d*),( )*(\\d\\d\\d\\d)"
+)
+
+
+def airport_reference(lines):
+    dates = []
+    for string in lines:
+        for idx in range(len(MONTH_NAMES)):
+            if MONTH_NAMES[idx].lower() in string.lower():
+                day = re.sub("[^0-9]", "", string)
+                if day:
+                    dates.append(datetime(2019, idx + 1, int(day)))
+                break
+    return dates
+
+
+def airport_dates(lines):
+    return [parse_date(string, default_year=2019) for string in lines]
+
+
+def finance_reference(soups):
+    return [
+        dateutil.parser.parse(item[0] + " " + item[1] + " " + item[-1] + " 9:30 am")
+        for soup in soups
+        for item in re.findall(FINANCE_PATTERN, soup)
+    ]
+
+
+def finance_dates(soups):
+    time = parse_time("9:30 am")
+    return [datetime.combine(day, time) for soup in soups for day in find_dates(soup)]
+
+
+def task_force_reference(lines):
+    return [datetime.strptime(line, "%B %d, %Y | %I:%M%p") for line in lines]
+
+
+def task_force_dates(lines):
+    return [parse_datetime(line) for line in lines]
+
+
+def utility_reference(lines):
+    return [dateutil.parser.parse(line) for line in lines]
+
+
+def utility_dates(lines):
+    return [parse_date(line) for line in lines]
+
+
+# Spider, strings of the shape it reads, and its previous and current parsers
+CASES = [
+    (
+        "alle_airport",
+        ["\n" + day.strftime("%B %-d") + "\xa0" * 8 for day in DAYS[:365]],
+        airport_reference,
+        airport_dates,
+    ),
+    (
+        "alle_finance_dev",
+        [
+            "<br>".join(
+                day.strftime("%B %-d, %Y").lower() for day in DAYS[idx : idx + 12]
+            )
+            for idx in range(0, len(DAYS), 12)
+        ],
+        finance_reference,
+        finance_dates,
+    ),
+    (
+        "pitt_public_algorithms_task_force",
+        [
+            (day + timedelta(minutes=idx * 7 % 1440)).strftime("%B %d, %Y | %I:%M%p")
+            for idx, day in enumerate(DAYS)
+        ],
+        task_force_reference,
+        task_force_dates,
+    ),
+    (
+        "pa_utility",
+        ["\n\t" + day.strftime("%A, %B %-d, %Y") + " -\xa0" for day in DAYS],
+        utility_reference,
+        utility_dates,
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "name,strings,reference,parser", CASES, ids=[case[0] for case in CASES]
+)
+def bench_reference(benchmark, name, strings, reference, parser):
+    benchmark.group = name
+    result = benchmark.pedantic(reference, args=(strings,), rounds=ROUNDS)
+    assert len(result) > 0
+
+
+@pytest.mark.parametrize(
+    "name,strings,reference,parser", CASES, ids=[case[0] for case in CASES]
+)
+def bench_dates(benchmark, name, strings, reference, parser):
+    benchmark.group = name
+    result = benchmark.pedantic(parser, args=(strings,), rounds=ROUNDS)
+    assert len(result) == len(reference(strings))
+
+
+# Spider and the format of its dates, with the strings of its scaled fixture or None to
+# use a thousand generated ones
+BATCH_CASES = [
+    ("pitt_art_commission", "%m/%d/%Y", 10000),
+    ("pa_liquorboard", "%A, %B %d, %Y", None),
+    ("alle_improvements", "%B%d,%Y", None),
+    ("alle_health", "%B %d, %Y", None),
+]
+
+
+def batch_strings(name, fmt, size):
+    if size is None:
+        return [day.strftime(fmt) for day in DAYS]
+    config = SCALED_FIXTURES[name]
+    return re.findall(config["date"], scaled_fixture(name, size))
+
+
+def strptime_all(strings, fmt):
+    parsed = []
+    for value in strings:
+        try:
+            parsed.append(datetime.strptime(value, fmt))
+        except ValueError:
+            parsed.append(None)
+    return parsed
+
+
+@pytest.mark.parametrize(
+    "name,fmt,size", BATCH_CASES, ids=[case[0] for case in BATCH_CASES]
+)
+def bench_batch_strptime(benchmark, name, fmt, size):
+    benchmark.group = "batch-" + name
+    strings = batch_strings(name, fmt, size)
+    result = benchmark.pedantic(strptime_all, args=(strings, fmt), rounds=ROUNDS)
+    benchmark.extra_info["strings"] = len(strings)
+    assert len(result) > 0
+
+
+@pytest.mark.parametrize(
+    "name,fmt,size", BATCH_CASES, ids=[case[0] for case in BATCH_CASES]
+)
+def bench_batch_parse_dates(benchmark, name, fmt, size):
+    benchmark.group = "batch-" + name
+    strings = batch_strings(name, fmt, size)
+    result = benchmark.pedantic(parse_dates, args=(strings, fmt), rounds=ROUNDS)
+    benchmark.extra_info["strings"] = len(strings)
+    assert result == strptime_all(strings, fmt)
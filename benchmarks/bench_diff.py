@@ -0,0 +1,103 @@
+"""
+Compares loading previous results for a diff from a full jsonlines feed, the way
+S3DiffPipeline does after downloading it, against LocalDiffPipeline's indexed store.
+The feed is read from a local file so download time isn't counted for either.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from city_scrapers_core.items import Meeting
+from city_scrapers_core.pipelines import DiffPipeline
+from city_scrapers_core.spiders import CityScrapersSpider
+from scrapy.settings import Settings
+from scrapy.signalmanager import SignalManager
+
+from city_scrapers.pipelines import LocalDiffPipeline
+from city_scrapers.pipelines.diff import MeetingStore
+
+HISTORY_SIZE = 100000
+SCRAPED_SIZE = 200
+SPIDER_NAME = "bench_spider"
+
+
+class FeedDiffPipeline(DiffPipeline):
+    """S3DiffPipeline's parsing of the previous feed, reading from a local file"""
+
+    def __init__(self, crawler, output_format):
+        self.feed_path = crawler.settings.get("BENCH_FEED_PATH")
+        super().__init__(crawler, output_format)
+
+    def load_previous_results(self):
+        with open(self.feed_path) as f:
+            feed_text = f.read()
+        return [json.loads(line) for line in feed_text.split("\n") if line.strip()]
+
+
+class FakeCrawler:
+    def __init__(self, settings):
+        self.settings = Settings(settings)
+        self.signals = SignalManager()
+        self.spider = CityScrapersSpider(name=SPIDER_NAME)
+
+
+def history_items():
+    """Meetings every hour for the past ~11 years, with the last week upcoming"""
+    start = datetime.now().replace(microsecond=0) + timedelta(days=7)
+    for idx in range(HISTORY_SIZE):
+        meeting_start = start - timedelta(hours=idx)
+        yield {
+            "_type": "event",
+            "_id": "ocd-event/{}".format(idx),
+            "name": "Board Meeting",
+            "description": "",
+            "status": "passed",
+            "start_time": meeting_start.isoformat() + "-04:00",
+            "location": {"url": "", "name": "City Hall", "coordinates": None},
+            "extras": {"cityscrapers/id": "{}/{}".format(SPIDER_NAME, idx)},
+        }
+
+
+@pytest.fixture(scope="module")
+def history(tmp_path_factory):
+    path = tmp_path_factory.mktemp("history")
+    feed_path = path / "feed.jsonl"
+    store_path = path / "{}.db".format(SPIDER_NAME)
+    store = MeetingStore(str(store_path))
+    with open(feed_path, "w") as f:
+        for item in history_items():
+            f.write(json.dumps(item) + "\n")
+            store.upsert(SPIDER_NAME, item)
+    store.commit()
+    store.close()
+    return {
+        "ITEM_PIPELINES": {"city_scrapers_core.pipelines.OpenCivicDataPipeline": 400},
+        "BENCH_FEED_PATH": str(feed_path),
+        "CITY_SCRAPERS_MEETING_STORE_PATH": str(store_path),
+    }
+
+
+def run_diff(pipeline_cls, settings):
+    """Open a pipeline and merge UIDs for a typical run's worth of recent meetings"""
+    crawler = FakeCrawler(settings)
+    pipeline = pipeline_cls.from_crawler(crawler)
+    for idx in range(SCRAPED_SIZE):
+        pipeline.process_item(
+            Meeting(id="{}/{}".format(SPIDER_NAME, idx), start=datetime.now()),
+            crawler.spider,
+        )
+    if isinstance(pipeline, LocalDiffPipeline):
+        pipeline.store.close()
+    return crawler.spider
+
+
+def bench_feed_diff(benchmark, history):
+    spider = benchmark(run_diff, FeedDiffPipeline, history)
+    assert len(spider._scraped_ids) == SCRAPED_SIZE
+
+
+def bench_local_diff(benchmark, history):
+    spider = benchmark(run_diff, LocalDiffPipeline, history)
+    assert len(spider._scraped_ids) == SCRAPED_SIZE
+    assert len(spider._previous_results) < HISTORY_SIZE
@@ -0,0 +1,74 @@
+"""
+Times exporting a feed built from meetings parsed from the tests/files fixtures, scaled
+up, with each compression codec and records the number of bytes written.
+"""
+
+import io
+from os.path import dirname, join
+
+import pytest
+from city_scrapers_core.pipelines import MeetingPipeline, OpenCivicDataPipeline
+from city_scrapers_core.utils import file_response
+
+from city_scrapers.exporters import CompressedJsonLinesItemExporter, iter_feed_lines
+from city_scrapers.spiders.pitt_art_commission import PittArtCommissionSpider
+from city_scrapers.spiders.pitt_ethics_board import PittEthicsBoardSpider
+
+FEED_SIZE = 5000
+
+fixtures = [
+    (
+        PittArtCommissionSpider,
+        "pitt_art_commission.html",
+        "https://pittsburghpa.gov/dcp/art-commission-schedule",
+    ),
+    (
+        PittEthicsBoardSpider,
+        "pitt_ethics_board.html",
+        "http://pittsburghpa.gov/ehb/ehb-meetings",
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def feed_items():
+    """OCD items from the fixtures, repeated with distinct IDs up to FEED_SIZE"""
+    meeting_pipeline = MeetingPipeline()
+    ocd_pipeline = OpenCivicDataPipeline()
+    parsed = []
+    for spider_cls, file_name, url in fixtures:
+        spider = spider_cls()
+        response = file_response(
+            join(dirname(dirname(__file__)), "tests", "files", file_name), url=url
+        )
+        for meeting in spider.parse(response):
+            meeting = meeting_pipeline.process_item(meeting, spider)
+            parsed.append(ocd_pipeline.process_item(meeting, spider))
+    items = []
+    for idx in range(FEED_SIZE):
+        item = dict(parsed[idx % len(parsed)])
+        item["_id"] = "ocd-event/{}".format(idx)
+        items.append(item)
+    return items
+
+
+def export(items, compression, level):
+    file = io.BytesIO()
+    exporter = CompressedJsonLinesItemExporter(
+        file, compression=compression, compression_level=level
+    )
+    exporter.start_exporting()
+    for item in items:
+        exporter.export_item(item)
+    exporter.finish_exporting()
+    return file.getvalue()
+
+
+@pytest.mark.parametrize(
+    "compression,level",
+    [(None, None), ("gzip", 1), ("gzip", 6), ("gzip", 9), ("zstd", 3), ("zstd", 10)],
+)
+def bench_export(benchmark, feed_items, compression, level):
+    output = benchmark(export, feed_items, compression, level)
+    benchmark.extra_info["bytes_written"] = len(output)
+    assert len(list(iter_feed_lines(io.BytesIO(output)))) == FEED_SIZE
@@ -0,0 +1,77 @@
+"""
+Times reading a 10,000 event copy of the Bethel Park calendar with the streaming
+iCalendar parser used by bethel_park_public_meetings, against building an
+`ics.Calendar` as the spider used to. The ics library takes tens of milliseconds for
+each event, so it's timed once on a 1,000 event copy. Each benchmark records events
+parsed per second and the peak memory traced while parsing once.
+
+    python -m pytest benchmarks/bench_ical.py
+"""
+
+import tracemalloc
+
+import ics
+import pytest
+from freezegun import freeze_time
+
+from city_scrapers.spiders.bethel_park_public_meetings import BethelParkSpider
+from city_scrapers.utils import iter_ical_events
+
+from .fixtures import scaled_response
+
+EVENTS = 10000
+ICS_EVENTS = 1000
+
+
+def read_events(body):
+    return sum(
+        1
+        for event in iter_ical_events(body)
+        if event.text("SUMMARY") is not None and event.end is not None
+    )
+
+
+def read_ics_events(body):
+    return sum(
+        1
+        for event in ics.Calendar(body.decode("utf-8")).events
+        if event.name is not None and event.end is not None
+    )
+
+
+def parse_spider(response):
+    return len(list(BethelParkSpider().parse(response)))
+
+
+def run(benchmark, func, arg, rounds, size):
+    event_count = benchmark.pedantic(func, args=(arg,), rounds=rounds)
+    tracemalloc.start()
+    try:
+        func(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    benchmark.group = "ical"
+    benchmark.extra_info["events"] = event_count
+    benchmark.extra_info["events_per_second"] = event_count / benchmark.stats.stats.mean
+    benchmark.extra_info["peak_memory_kb"] = peak // 1024
+    assert event_count >= size
+
+
+@pytest.fixture(scope="module")
+def response():
+    return scaled_response(BethelParkSpider.name, EVENTS)
+
+
+def bench_iter_ical_events(benchmark, response):
+    run(benchmark, read_events, response.body, 5, EVENTS)
+
+
+def bench_parse_spider(benchmark, response):
+    with freeze_time("2020-08-23"):
+        run(benchmark, parse_spider, response, 5, EVENTS)
+
+
+def bench_ics_calendar(benchmark):
+    response = scaled_response(BethelParkSpider.name, ICS_EVENTS)
+    run(benchmark, read_ics_events, response.body, 1, ICS_EVENTS)
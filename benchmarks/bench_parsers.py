@@ -0,0 +1,275 @@
+"""
+Times each spider's parsing callback over the same saved responses and frozen times
+used in tests/, so it runs without network access. Each benchmark records items
+parsed per second and the peak memory traced while parsing once.
+
+Save a baseline and fail later runs that regress against it with:
+
+    python -m pytest benchmarks/bench_parsers.py --benchmark-save=baseline
+    python -m pytest benchmarks/bench_parsers.py --benchmark-compare \
+        --benchmark-compare-fail=mean:25%
+"""
+
+import json
+import tracemalloc
+from os.path import dirname, join
+
+import pytest
+from city_scrapers_core.utils import file_response
+from freezegun import freeze_time
+from scrapy import Request
+
+from city_scrapers.spiders.alle_airport import AlleAirportSpider
+from city_scrapers.spiders.alle_asset_district import AlleAssetDistrictSpider
+from city_scrapers.spiders.alle_county import AlleCountySpider
+from city_scrapers.spiders.alle_finance_dev import AlleFinanceDevSpider
+from city_scrapers.spiders.alle_health import AlleHealthSpider
+from city_scrapers.spiders.alle_improvements import AlleImprovementsSpider
+from city_scrapers.spiders.bethel_park_public_meetings import BethelParkSpider
+from city_scrapers.spiders.pa_dept_environmental_protection import (
+    PaDeptEnvironmentalProtectionSpider,
+)
+from city_scrapers.spiders.pa_development import PaDevelopmentSpider
+from city_scrapers.spiders.pa_liquorboard import PaLiquorboardSpider
+from city_scrapers.spiders.pa_utility import PaUtilitySpider
+from city_scrapers.spiders.pgh_public_schools import PghPublicSchoolsSpider
+from city_scrapers.spiders.pitt_art_commission import PittArtCommissionSpider
+from city_scrapers.spiders.pitt_city_council import PittCityCouncilSpider
+from city_scrapers.spiders.pitt_city_planning import PittCityPlanningSpider
+from city_scrapers.spiders.pitt_ethics_board import PittEthicsBoardSpider
+from city_scrapers.spiders.pitt_housing import PittHousingSpider
+from city_scrapers.spiders.pitt_housing_opp import PittHousingOppSpider
+from city_scrapers.spiders.pitt_public_algorithms_task_force import (
+    PittPublicAlgorithmsTaskForceSpider,
+)
+from city_scrapers.spiders.pitt_urbandev import PittUrbandevSpider
+
+FILES_DIR = join(dirname(dirname(__file__)), "tests", "files")
+ROUNDS = 20
+
+# Spider, callback, fixture, response URL and frozen time, matching tests/. Legistar
+# callbacks take the parsed list of events rather than a response, so have no URL.
+CASES = [
+    (
+        AlleAirportSpider,
+        "parse",
+        "alle_airport.html",
+        "https://www.flypittsburgh.com/about-us/leadership",
+        "2019-11-04",
+    ),
+    (
+        AlleAssetDistrictSpider,
+        "parse",
+        "alle_asset_district.html",
+        "https://radworkshere.org/pages/whats-happening?cal=board-meetings",
+        "2019-02-08",
+    ),
+    (AlleCountySpider, "parse_legistar", "alle_county.json", None, "2019-01-23"),
+    (
+        AlleFinanceDevSpider,
+        "parse",
+        "alle_finance_dev.html",
+        "https://alleghenycounty.us/economic-development/authorities/"
+        "meetings-reports/fdc/meetings.aspx",
+        "2020-10-03",
+    ),
+    (
+        AlleHealthSpider,
+        "parse",
+        "alle_health.html",
+        "https://www.alleghenycounty.us/Health-Department/Resources/"
+        "About/Board-of-Health/Public-Meeting-Schedule.aspx",
+        "2019-04-12",
+    ),
+    (
+        AlleImprovementsSpider,
+        "parse",
+        "alle_improvements.html",
+        "https://www.alleghenycounty.us/economic-development/authorities/"
+        "meetings-reports/aim/meetings.aspx",
+        "2020-09-12",
+    ),
+    (
+        BethelParkSpider,
+        "parse",
+        join("bethel_park", "bethel_park_public_meetings.ics"),
+        "http://bethelpark.net/?plugin=all-in-one-event-calendar"
+        "&controller=ai1ec_exporter_controller&action=export_events"
+        "&ai1ec_cat_ids=42&no_html=true",
+        "2020-08-23",
+    ),
+    (
+        PaDeptEnvironmentalProtectionSpider,
+        "parse",
+        "pa_dept_environmental_protection.html",
+        "http://www.ahs.dep.pa.gov/CalendarOfEvents/Default.aspx?list=true",
+        "2019-08-28",
+    ),
+    (
+        PaDevelopmentSpider,
+        "parse",
+        "pa_development.json",
+        "https://dced.pa.gov/events/",
+        "2019-03-11",
+    ),
+    (
+        PaLiquorboardSpider,
+        "parse",
+        "pa_liquorboard.html",
+        "https://www.lcb.pa.gov/About-Us/Board/Pages/Public-Meetings.aspx",
+        "2020-01-02",
+    ),
+    (
+        PaUtilitySpider,
+        "parse",
+        "pa_utility.html",
+        "http://www.puc.pa.gov/about_puc/public_meeting_calendar/"
+        "public_meeting_audio_summaries_.aspx",
+        "2020-01-16",
+    ),
+    (
+        PghPublicSchoolsSpider,
+        "_parse_detail_api",
+        join("pgh_public_schools", "detail.json"),
+        "https://awsapieast1-prod2.schoolwires.com/REST/api/v4/CalendarEvents/"
+        "GetEventDate/1/17864",
+        "2019-02-26",
+    ),
+    (
+        PittArtCommissionSpider,
+        "parse",
+        "pitt_art_commission.html",
+        "https://pittsburghpa.gov/dcp/art-commission-schedule",
+        "2019-12-01",
+    ),
+    (
+        PittCityCouncilSpider,
+        "parse_legistar",
+        "pitt_city_council.json",
+        None,
+        "2019-02-25",
+    ),
+    (
+        PittCityPlanningSpider,
+        "parse",
+        "pitt_city_planning.html",
+        "http://pittsburghpa.gov/dcp/notices",
+        "2019-08-14",
+    ),
+    (
+        PittEthicsBoardSpider,
+        "parse",
+        "pitt_ethics_board.html",
+        "http://pittsburghpa.gov/ehb/ehb-meetings",
+        "2020-02-09",
+    ),
+    (
+        PittHousingSpider,
+        "parse",
+        "pitt_housing.html",
+        "https://hacp.org/about/board-commissioners-minutes/",
+        "2020-02-21",
+    ),
+    (
+        PittHousingOppSpider,
+        "parse",
+        "pitt_housing_opp.html",
+        "https://www.ura.org/events/housing-opportunity-fund-advisory-board-meeting",
+        "2019-03-13",
+    ),
+    (
+        PittHousingOppSpider,
+        "parse_events",
+        "pitt_housing_opp.json",
+        "http://www.ura.org/events.json",
+        "2019-03-13",
+    ),
+    (
+        PittPublicAlgorithmsTaskForceSpider,
+        "parse",
+        "pitt_public_algorithms_task_force.html",
+        "https://www.cyber.pitt.edu/community-meetings",
+        "2020-06-12",
+    ),
+    (
+        PittUrbandevSpider,
+        "parse",
+        "pitt_urbandev.html",
+        "https://www.ura.org/pages/board-meeting-notices-agendas-and-minutes",
+        "2020-01-25",
+    ),
+]
+
+
+def load_fixture(fixture, url):
+    path = join(FILES_DIR, fixture)
+    if url is None:
+        with open(path) as f:
+            return json.load(f)
+    return file_response(path, url=url)
+
+
+def parse_all(callback, response, kwargs):
+    """Return the number of items and requests the callback yields"""
+    outputs = list(callback(response, **kwargs))
+    request_count = sum(isinstance(output, Request) for output in outputs)
+    return len(outputs) - request_count, request_count
+
+
+def peak_memory(setup):
+    args, _ = setup()
+    tracemalloc.start()
+    try:
+        parse_all(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_parser(benchmark, setup):
+    """
+    Benchmark a callback, with `setup` returning the callback of a new spider along
+    with its response and keyword arguments, since some spiders keep state between
+    callbacks.
+    """
+    item_count, request_count = benchmark.pedantic(
+        parse_all, setup=setup, rounds=ROUNDS, warmup_rounds=1
+    )
+    benchmark.extra_info["items"] = item_count
+    benchmark.extra_info["requests"] = request_count
+    benchmark.extra_info["items_per_second"] = item_count / benchmark.stats.stats.mean
+    benchmark.extra_info["peak_memory_kb"] = peak_memory(setup) // 1024
+    assert item_count + request_count > 0
+
+
+@pytest.mark.parametrize(
+    "spider_cls,callback_name,fixture,url,frozen_time",
+    CASES,
+    ids=["{}-{}".format(case[0].name, case[1].lstrip("_")) for case in CASES],
+)
+def bench_parse(benchmark, spider_cls, callback_name, fixture, url, frozen_time):
+    response = load_fixture(fixture, url)
+
+    def setup():
+        return (getattr(spider_cls(), callback_name), response, {}), {}
+
+    with freeze_time(frozen_time):
+        run_parser(benchmark, setup)
+
+
+def bench_parse_pitt_housing_opp_detail(benchmark):
+    events_response = load_fixture(
+        "pitt_housing_opp.json", "http://www.ura.org/events.json"
+    )
+    response = load_fixture(
+        "pitt_housing_opp.html",
+        "https://www.ura.org/events/housing-opportunity-fund-advisory-board-meeting",
+    )
+
+    def setup():
+        spider = PittHousingOppSpider()
+        detail_request = next(spider.parse_events(events_response))
+        return (spider._parse_detail, response, detail_request.cb_kwargs), {}
+
+    with freeze_time("2019-03-13"):
+        run_parser(benchmark, setup)
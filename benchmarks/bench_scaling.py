@@ -0,0 +1,81 @@
+"""
+Times spider parsers on fixtures scaled up to many times their saved size, grouped by
+spider so each group's table shows parse time against input size. Each result records
+its scaling exponent relative to the original fixture, where 1 is linear and anything
+well above it points to superlinear parsing that will slow down as sites grow.
+
+Plot each group with pytest-benchmark's histogram option, which requires pygal:
+
+    python -m pytest benchmarks/bench_scaling.py --benchmark-histogram=scaling
+"""
+
+import math
+
+import pytest
+from freezegun import freeze_time
+
+from city_scrapers.spiders.alle_county import AlleCountySpider
+from city_scrapers.spiders.bethel_park_public_meetings import BethelParkSpider
+from city_scrapers.spiders.pitt_art_commission import PittArtCommissionSpider
+from city_scrapers.spiders.pitt_city_planning import PittCityPlanningSpider
+from city_scrapers.spiders.pitt_ethics_board import PittEthicsBoardSpider
+
+from .fixtures import SCALED_FIXTURES, record_count, scaled_response
+
+ROUNDS = 3
+
+# Spider, frozen time from tests/ and multiples of the original fixture's size
+CASES = [
+    (AlleCountySpider, "2019-01-23", [1, 100, 25000]),
+    (BethelParkSpider, "2020-08-23", [1, 10, 100]),
+    (PittArtCommissionSpider, "2019-12-01", [1, 10, 100]),
+    (PittCityPlanningSpider, "2019-08-14", [1, 10, 100]),
+    (PittEthicsBoardSpider, "2020-02-09", [1, 10, 100]),
+]
+
+
+def parse_all(callback, response):
+    return len(list(callback(response)))
+
+
+@pytest.fixture(scope="module")
+def base_times():
+    """Fastest parse times of each spider's original fixture, as they're benchmarked"""
+    return {}
+
+
+@pytest.mark.parametrize(
+    "spider_cls,frozen_time,factor",
+    [
+        (spider_cls, frozen_time, factor)
+        for spider_cls, frozen_time, factors in CASES
+        for factor in factors
+    ],
+    ids=[
+        "{}-x{}".format(spider_cls.name, factor)
+        for spider_cls, _, factors in CASES
+        for factor in factors
+    ],
+)
+def bench_scaling(benchmark, base_times, spider_cls, frozen_time, factor):
+    name = spider_cls.name
+    callback_name = SCALED_FIXTURES[name]["callback"]
+    size = record_count(name) * factor
+    response = scaled_response(name, size)
+
+    def setup():
+        return (getattr(spider_cls(), callback_name), response), {}
+
+    benchmark.group = name
+    with freeze_time(frozen_time):
+        item_count = benchmark.pedantic(parse_all, setup=setup, rounds=ROUNDS)
+    benchmark.extra_info["records"] = size
+    benchmark.extra_info["items"] = item_count
+    if factor == 1:
+        base_times[name] = benchmark.stats.stats.min
+    elif name in base_times:
+        benchmark.extra_info["exponent"] = round(
+            math.log(benchmark.stats.stats.min / base_times[name]) / math.log(factor),
+            2,
+        )
+    assert item_count > 0
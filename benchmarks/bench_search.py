@@ -0,0 +1,92 @@
+"""
+Times search queries against a SearchIndex of a synthetic archive of 1M meetings.
+"""
+
+import itertools
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from city_scrapers.search import SearchIndex
+
+ARCHIVE_SIZE = 1000000
+VOCABULARY_SIZE = 5000
+
+AGENCIES = [
+    "Pittsburgh City Council",
+    "Pittsburgh City Planning",
+    "Allegheny County",
+    "Pittsburgh Public Schools",
+    "Urban Redevelopment Authority",
+    "Pittsburgh Housing Authority",
+]
+TITLES = [
+    "Regular Meeting",
+    "Board Meeting",
+    "Public Hearing",
+    "Committee Meeting",
+    "Special Meeting",
+    "Zoning Board of Adjustment",
+    "Finance Committee",
+]
+WORDS = (
+    "agenda budget zoning housing transit school parks water sewer permit "
+    "variance contract appointment ordinance resolution hearing review plan "
+    "development district property tax grant election police fire library "
+    "bridge street lighting demolition landmark historic"
+).split()
+
+
+def synthetic_meetings():
+    """Meetings with descriptions drawn from a Zipf-distributed vocabulary"""
+    rand = random.Random(0)
+    vocabulary = WORDS + ["term{}".format(idx) for idx in range(VOCABULARY_SIZE)]
+    rand.shuffle(vocabulary)
+    cum_weights = list(
+        itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary)))
+    )
+    start = datetime(2010, 1, 1)
+    for idx in range(ARCHIVE_SIZE):
+        meeting_start = start + timedelta(minutes=idx * 5)
+        yield {
+            "id": "spider_{}/{}".format(idx % 30, idx),
+            "spider": "spider_{}".format(idx % 30),
+            "agency": AGENCIES[idx % len(AGENCIES)],
+            "title": rand.choice(TITLES),
+            "description": " ".join(
+                rand.choices(vocabulary, cum_weights=cum_weights, k=20)
+            ),
+            "location": "City Hall 414 Grant St",
+            "links": "Agenda Minutes",
+            "start": meeting_start.isoformat(),
+            "status": "passed",
+            "source": "https://example.com",
+        }
+
+
+@pytest.fixture(scope="module")
+def search_index(tmp_path_factory):
+    search_index = SearchIndex(str(tmp_path_factory.mktemp("search") / "search.db"))
+    for fields in synthetic_meetings():
+        search_index.add(fields)
+    search_index.conn.commit()
+    yield search_index
+    search_index.close()
+
+
+@pytest.mark.parametrize(
+    "query,kwargs",
+    [
+        ("landmark demolition", {}),
+        ("zoning", {}),
+        ("zoning", {"start": "2017-01-01", "end": "2019-01-01"}),
+        ("hearing", {"page": 10}),
+        ("board", {"spiders": ["spider_3"]}),
+    ],
+    ids=["rare", "common", "date-range", "page-10", "spider"],
+)
+def bench_search(benchmark, search_index, query, kwargs):
+    results = benchmark(search_index.search, query, **kwargs)
+    benchmark.extra_info["total"] = results["total"]
+    assert results["results"]
@@ -0,0 +1,165 @@
+"""
+Builds larger versions of the fixtures in tests/files by copying each meeting record in
+place with its dates shifted and identifiers changed, so parsers can be timed on inputs
+many times the size of the saved pages.
+
+Write a scaled fixture to a file with:
+
+    python -m benchmarks.fixtures bethel_park_public_meetings 10000 calendar.ics
+"""
+
+import copy
+import json
+import math
+import re
+import sys
+from datetime import datetime, timedelta
+from os.path import dirname, join
+
+from scrapy.http import HtmlResponse, TextResponse
+
+FILES_DIR = join(dirname(dirname(__file__)), "tests", "files")
+
+# Fixture, response URL and callback for each spider, and for text fixtures the pattern
+# matching one meeting record along with the pattern and format of dates within it
+SCALED_FIXTURES = {
+    "bethel_park_public_meetings": {
+        "fixture": join("bethel_park", "bethel_park_public_meetings.ics"),
+        "url": "http://bethelpark.net/",
+        "callback": "parse",
+        "record": r"BEGIN:VEVENT\r?\n.*?END:VEVENT\r?\n",
+        "uid": r"(?<=UID:)[^@\r\n]+",
+        "date": r"\d{8}T\d{6}",
+        "date_format": "%Y%m%dT%H%M%S",
+    },
+    "pitt_art_commission": {
+        "fixture": "pitt_art_commission.html",
+        "url": "https://pittsburghpa.gov/dcp/art-commission-schedule",
+        "callback": "parse",
+        "record": r"<tr class='data'>.*?</tr>",
+        "date": r"\d{2}/\d{2}/\d{4}",
+        "date_format": "%m/%d/%Y",
+    },
+    "pitt_city_planning": {
+        "fixture": "pitt_city_planning.html",
+        "url": "http://pittsburghpa.gov/dcp/notices",
+        "callback": "parse",
+        "record": r"<p><strong>.*?</ul>\s*",
+        "date": r"(?:January|February|March|April|May|June|July|August|September|"
+        r"October|November|December) \d{1,2}, \d{4}",
+        "date_format": "%B %d, %Y",
+    },
+    "pitt_ethics_board": {
+        "fixture": "pitt_ethics_board.html",
+        "url": "http://pittsburghpa.gov/ehb/ehb-meetings",
+        "callback": "parse",
+        "record": r"<p><strong>.*?</p>\s*",
+        "date": r"(?:January|February|March|April|May|June|July|August|September|"
+        r"October|November|December) \d{1,2},? \d{4}",
+        "date_format": "%B %d, %Y",
+    },
+    "alle_county": {
+        "fixture": "alle_county.json",
+        "callback": "parse_legistar",
+        "date_format": "%m/%d/%Y",
+    },
+}
+
+
+def shift_dates(text, pattern, date_format, days):
+    """Shift every date matching pattern in text by a number of days"""
+
+    def shift(match):
+        date_str = match.group(0)
+        # Some dates on the same page leave out the comma before the year
+        fmt = date_format if "," in date_str else date_format.replace(",", "")
+        shifted = datetime.strptime(date_str, fmt) + timedelta(days=days)
+        return shifted.strftime(fmt)
+
+    return re.sub(pattern, shift, text)
+
+
+def scale_text(text, config, factor):
+    """
+    Replace each record in text with `factor` copies, with dates in each copy shifted
+    by a week more than the last and record UIDs suffixed with the copy number
+    """
+
+    def copies(match):
+        record = match.group(0)
+        scaled = []
+        for idx in range(factor):
+            copied = shift_dates(record, config["date"], config["date_format"], idx * 7)
+            if idx and config.get("uid"):
+                copied = re.sub(
+                    config["uid"], lambda m: "{}-{}".format(m.group(0), idx), copied
+                )
+            scaled.append(copied)
+        return "".join(scaled)
+
+    return re.sub(config["record"], copies, text, flags=re.DOTALL)
+
+
+def scale_legistar(events, date_format, factor):
+    """Copy each Legistar event `factor` times with the meeting date shifted weekly"""
+    scaled = []
+    for event, extra in events:
+        start = datetime.strptime(event["Meeting Date"], date_format)
+        for idx in range(factor):
+            copied = copy.deepcopy(event)
+            copied["Meeting Date"] = (start + timedelta(days=idx * 7)).strftime(
+                date_format
+            )
+            scaled.append([copied, extra])
+    return scaled
+
+
+def record_count(name):
+    """Return the number of meeting records in a spider's original fixture"""
+    config = SCALED_FIXTURES[name]
+    with open(join(FILES_DIR, config["fixture"]), encoding="utf-8") as f:
+        if "record" not in config:
+            return len(json.load(f))
+        return len(re.findall(config["record"], f.read(), flags=re.DOTALL))
+
+
+def scaled_fixture(name, size):
+    """
+    Return the contents of a spider's fixture scaled to at least `size` meeting records
+    as text, or as a list of events for Legistar spiders
+    """
+    config = SCALED_FIXTURES[name]
+    factor = max(1, math.ceil(size / record_count(name)))
+    with open(join(FILES_DIR, config["fixture"]), encoding="utf-8") as f:
+        if "record" not in config:
+            return scale_legistar(json.load(f), config["date_format"], factor)
+        return scale_text(f.read(), config, factor)
+
+
+def scaled_response(name, size):
+    """Return the input for a spider's callback scaled to at least `size` records"""
+    config = SCALED_FIXTURES[name]
+    content = scaled_fixture(name, size)
+    if "url" not in config:
+        return content
+    response_cls = HtmlResponse if config["fixture"].endswith(".html") else TextResponse
+    return response_cls(url=config["url"], body=content.encode(), encoding="utf-8")
+
+
+def main(args):
+    if len(args) != 3 or args[0] not in SCALED_FIXTURES:
+        sys.exit(
+            "Usage: python -m benchmarks.fixtures <spider> <size> <output>\n"
+            "Spiders: {}".format(", ".join(sorted(SCALED_FIXTURES)))
+        )
+    name, size, output_path = args
+    content = scaled_fixture(name, int(size))
+    with open(output_path, "w", encoding="utf-8") as f:
+        if isinstance(content, list):
+            json.dump(content, f)
+        else:
+            f.write(content)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
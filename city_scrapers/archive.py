@@ -0,0 +1,190 @@
+"""
+Compacts archived jsonlines feeds into a Parquet dataset of meetings, partitioned by
+spider, year and month so queries only read the files and columns they need.
+
+Feeds are read from a local directory in the FEED_URI layout
+(%(year)s/%(month)s/%(day)s/%(hour_min)s/%(name)s.json[.gz]) and only the most recent
+version of each meeting is kept. Everything runs offline on local files.
+"""
+
+import json
+import os
+import shutil
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from .exporters import iter_feed_lines
+
+PARTITION_COLS = ["spider", "year", "month"]
+
+# Combined feeds written by combinefeeds rather than spiders
+COMBINED_FEEDS = {"latest", "upcoming"}
+
+
+def meeting_schema():
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("uid", pa.string()),
+            ("title", pa.string()),
+            ("start", pa.timestamp("s")),
+            ("end", pa.timestamp("s")),
+            ("status", category),
+            ("classification", category),
+            ("location", pa.string()),
+            ("source", pa.string()),
+            ("spider", pa.string()),
+            ("year", pa.int32()),
+            ("month", pa.int32()),
+        ]
+    )
+
+
+def parse_datetime(value):
+    """Parse the local date and time of an ISO datetime string, ignoring the offset"""
+    if not value:
+        return None
+    return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+
+
+def meeting_row(item, spider_name):
+    """Flatten an OCD or Meeting feed item into a row of the meeting schema"""
+    extras = item.get("extras") or item.get("extra") or {}
+    start = parse_datetime(item.get("start_time") or item.get("start"))
+    location = item.get("location") or {}
+    sources = item.get("sources") or [{"url": item.get("source")}]
+    return {
+        "id": extras.get("cityscrapers/id") or item.get("id") or item.get("_id"),
+        "uid": item.get("_id"),
+        "title": item.get("name") or item.get("title"),
+        "start": start,
+        "end": parse_datetime(item.get("end_time") or item.get("end")),
+        "status": item.get("status"),
+        "classification": item.get("classification"),
+        "location": " ".join(
+            filter(None, [location.get("name"), location.get("address")])
+        ),
+        "source": sources[0].get("url"),
+        "spider": spider_name,
+        "year": start.year,
+        "month": start.month,
+    }
+
+
+def find_feeds(feeds_dir):
+    """Return a dict of each spider name to its feed paths, oldest first"""
+    feeds = defaultdict(list)
+    for dir_path, _, file_names in os.walk(feeds_dir):
+        for file_name in file_names:
+            spider_name = file_name.split(".")[0]
+            if ".json" not in file_name or spider_name in COMBINED_FEEDS:
+                continue
+            feeds[spider_name].append(os.path.join(dir_path, file_name))
+    # Paths are zero-padded dates and times, so they sort chronologically
+    return {name: sorted(paths) for name, paths in feeds.items()}
+
+
+def compact_spider(spider_name, paths, dataset_dir):
+    """Replace a spider's partitions with the latest version of each of its meetings"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    meetings = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            for line in iter_feed_lines(f):
+                row = meeting_row(json.loads(line), spider_name)
+                if row["start"] is not None:
+                    meetings[row["id"]] = row
+
+    schema = meeting_schema()
+    rows = sorted(meetings.values(), key=lambda row: row["start"])
+    table = pa.Table.from_pydict(
+        {field.name: [row[field.name] for row in rows] for field in schema},
+        schema=schema,
+    )
+    shutil.rmtree(
+        os.path.join(dataset_dir, "spider={}".format(spider_name)), ignore_errors=True
+    )
+    if table.num_rows:
+        # pq.write_to_dataset goes through pandas on older pyarrow releases. Other
+        # spiders' partitions are left in place, and this spider's were removed above
+        ds.write_dataset(
+            table,
+            dataset_dir,
+            format="parquet",
+            partitioning=PARTITION_COLS,
+            partitioning_flavor="hive",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+    return table.num_rows
+
+
+def compact_feeds(feeds_dir, dataset_dir, spider_names=None):
+    """
+    Compact the feeds under feeds_dir into a Parquet dataset at dataset_dir, one spider
+    at a time so only one spider's meetings are held in memory. Returns a dict of the
+    number of meetings written for each spider.
+    """
+    feeds = find_feeds(feeds_dir)
+    counts = {}
+    for spider_name in sorted(feeds):
+        if spider_names and spider_name not in spider_names:
+            continue
+        counts[spider_name] = compact_spider(
+            spider_name, feeds[spider_name], dataset_dir
+        )
+    return counts
+
+
+def _month_filter(op, value):
+    """Filter on the year and month partitions of a bound on meeting start times"""
+    import pyarrow.dataset as ds
+
+    year, month = ds.field("year"), ds.field("month")
+    if op == ">=":
+        return (year > value.year) | ((year == value.year) & (month >= value.month))
+    return (year < value.year) | ((year == value.year) & (month <= value.month))
+
+
+def read_meetings(dataset_dir, spiders=None, start=None, end=None, columns=None):
+    """
+    Read meetings from a compacted dataset as a pyarrow Table, optionally only for a
+    list of spiders, meetings starting in [start, end) and a list of columns. Spider,
+    year and month filters skip partitions without reading them.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning="hive")
+    filters = []
+    if spiders:
+        filters.append(ds.field("spider").isin(list(spiders)))
+    if start:
+        filters.append(_month_filter(">=", start))
+        filters.append(ds.field("start") >= start)
+    if end:
+        filters.append(_month_filter("<=", end))
+        filters.append(ds.field("start") < end)
+    expression = None
+    for dataset_filter in filters:
+        expression = (
+            dataset_filter if expression is None else expression & dataset_filter
+        )
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+def monthly_counts(dataset_dir, spider_name, start=None, end=None):
+    """Return a Counter of (year, month) to the number of a spider's meetings"""
+    table = read_meetings(
+        dataset_dir,
+        spiders=[spider_name],
+        start=start,
+        end=end,
+        columns=["year", "month"],
+    )
+    return Counter(
+        zip(table.column("year").to_pylist(), table.column("month").to_pylist())
+    )
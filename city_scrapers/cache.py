@@ -0,0 +1,74 @@
+import json
+import os
+import sqlite3
+import time
+
+
+class SpiderCache:
+    """
+    SQLite store of JSON values a spider keeps between runs, like API tokens or detail
+    responses, grouped into named tables of keys for each spider
+    """
+
+    def __init__(self, path, spider_name):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.spider_name = spider_name
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                spider TEXT NOT NULL,
+                name TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (spider, name, key)
+            )
+            """)
+        self.conn.commit()
+
+    def get(self, name, key, default=None):
+        row = self.conn.execute(
+            "SELECT value FROM cache WHERE spider = ? AND name = ? AND key = ?",
+            (self.spider_name, name, str(key)),
+        ).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def set(self, name, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+            (self.spider_name, name, str(key), json.dumps(value), time.time()),
+        )
+
+    def delete(self, name, key):
+        self.conn.execute(
+            "DELETE FROM cache WHERE spider = ? AND name = ? AND key = ?",
+            (self.spider_name, name, str(key)),
+        )
+
+    def keys(self, name):
+        return {
+            key
+            for key, in self.conn.execute(
+                "SELECT key FROM cache WHERE spider = ? AND name = ?",
+                (self.spider_name, name),
+            )
+        }
+
+    def items(self, name):
+        return {
+            key: json.loads(value)
+            for key, value in self.conn.execute(
+                "SELECT key, value FROM cache WHERE spider = ? AND name = ?",
+                (self.spider_name, name),
+            )
+        }
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
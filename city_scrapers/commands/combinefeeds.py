@@ -0,0 +1,218 @@
+import gzip
+import heapq
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from itertools import islice
+from operator import itemgetter
+from urllib.parse import urlparse
+
+from city_scrapers_core.commands.combinefeeds import Command as CoreCommand
+
+from city_scrapers.exporters import iter_feed_lines
+
+
+def write_sorted_runs(lines, start_key, new_run_file, run_size):
+    """
+    Write one feed's meetings to run files of at most run_size meetings, each sorted by
+    start time and yielded once written. Meetings are written one per line prefixed
+    with the start time and a tab so runs can be merged without parsing them again.
+    """
+    meetings = (json.loads(line) for line in lines if line.strip())
+    while True:
+        chunk = sorted(islice(meetings, run_size), key=itemgetter(start_key))
+        if not chunk:
+            return
+        run_file = new_run_file()
+        for meeting in chunk:
+            run_file.write(meeting[start_key][:19] + "\t" + json.dumps(meeting) + "\n")
+        run_file.seek(0)
+        yield run_file
+
+
+def merge_runs(run_files, latest_file, upcoming_file, since):
+    """
+    Merge sorted runs into the latest and upcoming feeds in one pass, holding one line
+    of each run in memory at a time
+    """
+    latest_sep = upcoming_sep = ""
+    for line in heapq.merge(*run_files):
+        start, meeting = line.rstrip("\n").split("\t", 1)
+        latest_file.write(latest_sep + meeting)
+        latest_sep = "\n"
+        if start > since:
+            upcoming_file.write(upcoming_sep + meeting)
+            upcoming_sep = "\n"
+
+
+class Command(CoreCommand):
+    """
+    Streams the latest feed of each spider into the combined latest and upcoming feeds,
+    sorting chunks of CITY_SCRAPERS_COMBINEFEEDS_RUN_SIZE meetings into runs and merging
+    them by start time so memory use doesn't depend on the number or size of feeds.
+    Spider feeds can be compressed by CompressedJsonLinesItemExporter, and output is
+    gzip-compressed if CITY_SCRAPERS_COMBINEFEEDS_GZIP is set. Only feeds ending like
+    FEED_URI are read, so compressed copies written alongside them from FEEDS are
+    ignored.
+
+    S3 and local feed storage are handled here, other providers use city_scrapers_core.
+    """
+
+    def run(self, args, opts):
+        storages = self.settings.get("FEED_STORAGES", {})
+        if "s3" in storages:
+            self.combine_s3()
+        elif urlparse(self.settings.get("FEED_URI") or "").scheme in ("", "file"):
+            self.combine_local()
+        else:
+            super().run(args, opts)
+
+    @property
+    def gzip(self):
+        return self.settings.getbool("CITY_SCRAPERS_COMBINEFEEDS_GZIP")
+
+    @property
+    def feed_suffix(self):
+        """Ending of spider feed paths after the spider name in FEED_URI"""
+        feed_uri = self.settings.get("FEED_URI") or ""
+        return feed_uri.split("%(name)s")[-1] if "%(name)s" in feed_uri else ""
+
+    def get_spider_paths(self, path_list):
+        return super().get_spider_paths(
+            [path for path in path_list if path.endswith(self.feed_suffix)]
+        )
+
+    @property
+    def feed_prefix(self):
+        return self.settings.get("CITY_SCRAPERS_DIFF_FEED_PREFIX", "%Y/%m/%d")
+
+    def combine_s3(self):
+        import boto3
+
+        parsed = urlparse(self.settings.get("FEED_URI"))
+        bucket = parsed.netloc
+        client = boto3.client(
+            "s3",
+            aws_access_key_id=self.settings.get("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=self.settings.get("AWS_SECRET_ACCESS_KEY"),
+        )
+        paginator = client.get_paginator("list_objects_v2")
+
+        max_days_previous = 3
+        days_previous = 0
+        prefix_keys = []
+        while days_previous <= max_days_previous:
+            prefix = (datetime.now() - timedelta(days=days_previous)).strftime(
+                self.feed_prefix
+            )
+            prefix_keys = [
+                obj["Key"]
+                for page in paginator.paginate(Bucket=bucket, Prefix=prefix)
+                for obj in page.get("Contents", [])
+            ]
+            if len(prefix_keys) > 0:
+                break
+            days_previous += 1
+
+        def read_feed(key):
+            body = client.get_object(Bucket=bucket, Key=key)["Body"]
+            yield from iter_feed_lines(body)
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            spider_keys = self.get_spider_paths(prefix_keys)
+            latest_path, upcoming_path = self.combine(
+                [read_feed(key) for key in spider_keys], work_dir
+            )
+            for key in spider_keys:
+                # Copy latest results for each spider
+                client.copy_object(
+                    Bucket=bucket,
+                    Key=key.split("/")[-1],
+                    CopySource={"Bucket": bucket, "Key": key},
+                )
+            extra_args = {"CacheControl": "no-cache", "ContentType": "application/json"}
+            if self.gzip:
+                extra_args["ContentEncoding"] = "gzip"
+            client.upload_file(latest_path, bucket, "latest.json", ExtraArgs=extra_args)
+            client.upload_file(
+                upcoming_path, bucket, "upcoming.json", ExtraArgs=extra_args
+            )
+
+    def combine_local(self):
+        feed_uri = self.settings.get("FEED_URI") or ""
+        # Feeds are under the directory before the first placeholder in FEED_URI
+        feed_root = os.path.dirname(urlparse(feed_uri).path.split("%(")[0])
+
+        max_days_previous = 3
+        days_previous = 0
+        prefix_paths = []
+        while days_previous <= max_days_previous:
+            prefix_dir = os.path.join(
+                feed_root,
+                (datetime.now() - timedelta(days=days_previous)).strftime(
+                    self.feed_prefix
+                ),
+            )
+            prefix_paths = [
+                os.path.join(dir_path, file_name)
+                for dir_path, _, file_names in os.walk(prefix_dir)
+                for file_name in file_names
+            ]
+            if len(prefix_paths) > 0:
+                break
+            days_previous += 1
+
+        spider_paths = self.get_spider_paths(prefix_paths)
+        with tempfile.TemporaryDirectory() as work_dir:
+            feed_files = [open(path, "rb") for path in spider_paths]
+            try:
+                latest_path, upcoming_path = self.combine(
+                    [iter_feed_lines(feed_file) for feed_file in feed_files], work_dir
+                )
+            finally:
+                for feed_file in feed_files:
+                    feed_file.close()
+            for path in spider_paths:
+                # Copy latest results for each spider
+                shutil.copyfile(path, os.path.join(feed_root, os.path.basename(path)))
+            suffix = ".gz" if self.gzip else ""
+            shutil.copyfile(
+                latest_path, os.path.join(feed_root, "latest.json" + suffix)
+            )
+            shutil.copyfile(
+                upcoming_path, os.path.join(feed_root, "upcoming.json" + suffix)
+            )
+
+    def combine(self, feeds, work_dir):
+        """
+        Write the combined latest and upcoming feeds from iterables of jsonlines to
+        files in work_dir, returning their paths
+        """
+        run_files = []
+        try:
+            run_size = self.settings.getint(
+                "CITY_SCRAPERS_COMBINEFEEDS_RUN_SIZE", 10000
+            )
+            for lines in feeds:
+                for run_file in write_sorted_runs(
+                    lines,
+                    self.start_key,
+                    lambda: tempfile.TemporaryFile("w+", dir=work_dir),
+                    run_size,
+                ):
+                    run_files.append(run_file)
+
+            open_output = gzip.open if self.gzip else open
+            latest_path = os.path.join(work_dir, "latest.json")
+            upcoming_path = os.path.join(work_dir, "upcoming.json")
+            yesterday_iso = (datetime.now() - timedelta(days=1)).isoformat()[:19]
+            with open_output(latest_path, "wt") as latest_file, open_output(
+                upcoming_path, "wt"
+            ) as upcoming_file:
+                merge_runs(run_files, latest_file, upcoming_file, yesterday_iso)
+        finally:
+            for run_file in run_files:
+                run_file.close()
+        return latest_path, upcoming_path
@@ -0,0 +1,31 @@
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+
+from ..archive import compact_feeds
+
+
+class Command(ScrapyCommand):
+    requires_project = True
+
+    def syntax(self):
+        return "[options] <feeds_dir> <dataset_dir> [spider ...]"
+
+    def short_desc(self):
+        return "Compact archived feeds into a Parquet dataset of meetings"
+
+    def long_desc(self):
+        return (
+            "Read every jsonlines feed under feeds_dir, laid out like FEED_URI, and "
+            "write the latest version of each meeting to a Parquet dataset in "
+            "dataset_dir partitioned by spider, year and month. Only the listed "
+            "spiders are replaced if any are given. Query the dataset with "
+            "city_scrapers.archive.read_meetings."
+        )
+
+    def run(self, args, opts):
+        if len(args) < 2:
+            raise UsageError("Both feeds_dir and dataset_dir are required")
+        feeds_dir, dataset_dir, spider_names = args[0], args[1], args[2:]
+        counts = compact_feeds(feeds_dir, dataset_dir, spider_names=spider_names)
+        for spider_name, count in counts.items():
+            print("{:<40} {:>8} meetings".format(spider_name, count))
@@ -0,0 +1,75 @@
+import time
+
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+
+from ..runner import (
+    OK,
+    format_summary,
+    load_history,
+    run_all,
+    run_sharded,
+    save_history,
+    shard_spiders,
+    update_history,
+    write_summary,
+)
+
+
+class Command(ScrapyCommand):
+    requires_project = True
+
+    def syntax(self):
+        return "[options] [spider ...]"
+
+    def short_desc(self):
+        return "Run all spiders (or the ones listed) in a single process"
+
+    def long_desc(self):
+        return (
+            "Run all spiders in the project, or only the ones listed, sharing one "
+            "crawler process and reactor. Set CITY_SCRAPERS_CRAWLALL_CONCURRENCY to "
+            "control how many spiders run at once, and CITY_SCRAPERS_CRAWLALL_SUMMARY "
+            "to write a JSON summary of each spider's status and timing. Setting "
+            "CITY_SCRAPERS_CRAWLALL_SHARDS above 1 splits the spiders across that many "
+            "worker processes, balanced by the durations in "
+            "CITY_SCRAPERS_CRAWLALL_HISTORY."
+        )
+
+    def run(self, args, opts):
+        spider_names = args or self.crawler_process.spider_loader.list()
+        concurrency = self.settings.getint("CITY_SCRAPERS_CRAWLALL_CONCURRENCY", 8)
+        shards = self.settings.getint("CITY_SCRAPERS_CRAWLALL_SHARDS", 1)
+        history_path = self.settings.get("CITY_SCRAPERS_CRAWLALL_HISTORY")
+        history = load_history(history_path) if history_path else {}
+
+        started = time.time()
+        shard_reports = None
+        if shards > 1:
+            try:
+                assignment = shard_spiders(
+                    spider_names,
+                    history,
+                    shards,
+                    heavy=self.settings.getlist("CITY_SCRAPERS_HEAVY_SPIDERS"),
+                )
+            except ValueError as e:
+                raise UsageError(str(e))
+            runs, shard_reports = run_sharded(
+                assignment,
+                self.settings,
+                concurrency,
+                output=self.settings.get("CITY_SCRAPERS_CRAWLALL_OUTPUT"),
+            )
+        else:
+            runs = run_all(self.crawler_process, spider_names, concurrency)
+        elapsed = time.time() - started
+
+        print(format_summary(runs))
+        summary_path = self.settings.get("CITY_SCRAPERS_CRAWLALL_SUMMARY")
+        if summary_path:
+            write_summary(runs, summary_path, elapsed=elapsed, shards=shard_reports)
+        if history_path:
+            save_history(update_history(history, runs), history_path)
+        if any(run.status != OK for run in runs):
+            self.exitcode = 1
@@ -0,0 +1,5 @@
+from city_scrapers_core.commands.genspider import Command as CoreCommand
+
+
+class Command(CoreCommand):
+    """Exposes the city_scrapers_core `genspider` command from COMMANDS_MODULE"""
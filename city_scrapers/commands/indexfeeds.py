@@ -0,0 +1,36 @@
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+from scrapy.utils.project import data_path
+
+from ..archive import find_feeds
+from ..search import SearchIndex
+
+
+class Command(ScrapyCommand):
+    requires_project = True
+
+    def syntax(self):
+        return "[options] <feeds_dir>"
+
+    def short_desc(self):
+        return "Update the meeting search index from feeds in a local directory"
+
+    def long_desc(self):
+        return (
+            "Add meetings from feeds under feeds_dir that are new or changed since the "
+            "last run to the SQLite full-text index at CITY_SCRAPERS_SEARCH_INDEX_PATH, "
+            "replacing earlier versions of the same meetings. Serve it with the Flask "
+            "app in city_scrapers.search.app."
+        )
+
+    def run(self, args, opts):
+        if len(args) != 1:
+            raise UsageError("feeds_dir is required")
+        search_index = SearchIndex(
+            data_path(self.settings.get("CITY_SCRAPERS_SEARCH_INDEX_PATH", "search.db"))
+        )
+        try:
+            changed = search_index.update(find_feeds(args[0]))
+        finally:
+            search_index.close()
+        print("{} meetings added or updated".format(changed))
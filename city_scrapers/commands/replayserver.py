@@ -0,0 +1,50 @@
+from urllib.parse import urlsplit
+
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+from scrapy.utils.project import data_path
+
+from ..replay import RecordingStore, ReplayServer
+
+
+class Command(ScrapyCommand):
+    requires_project = True
+
+    def syntax(self):
+        return "[options]"
+
+    def short_desc(self):
+        return "Serve recorded responses for crawls without network access"
+
+    def long_desc(self):
+        return (
+            "Serve the exchanges recorded to CITY_SCRAPERS_RECORDING_PATH (by crawling "
+            "with -s CITY_SCRAPERS_RECORD=1) at CITY_SCRAPERS_REPLAY_URL. Crawl against "
+            "it with SCRAPY_SETTINGS_MODULE=city_scrapers.settings.replay. Set "
+            "CITY_SCRAPERS_REPLAY_LATENCY to delay each response by a number of seconds."
+        )
+
+    def run(self, args, opts):
+        if args:
+            raise UsageError()
+        replay_url = urlsplit(
+            self.settings.get("CITY_SCRAPERS_REPLAY_URL") or "http://127.0.0.1:8800"
+        )
+        store = RecordingStore(
+            data_path(
+                self.settings.get("CITY_SCRAPERS_RECORDING_PATH", "recordings.db")
+            )
+        )
+        server = ReplayServer(
+            (replay_url.hostname, replay_url.port or 80),
+            store,
+            latency=self.settings.getfloat("CITY_SCRAPERS_REPLAY_LATENCY"),
+        )
+        print("Replaying recorded responses at {}".format(replay_url.geturl()))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            store.close()
@@ -0,0 +1,5 @@
+from city_scrapers_core.commands.validate import Command as CoreCommand
+
+
+class Command(CoreCommand):
+    """Exposes the city_scrapers_core `validate` command from COMMANDS_MODULE"""
@@ -0,0 +1,128 @@
+import gzip
+import io
+
+from scrapy.exporters import JsonLinesItemExporter
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def compress_stream(file, compression, level=None):
+    """
+    Wrap a binary file in a writable stream compressed with "gzip" or "zstd". Closing
+    the stream finishes the compressed data without closing the file.
+    """
+    if compression == GZIP:
+        return gzip.GzipFile(
+            fileobj=file, mode="wb", compresslevel=9 if level is None else level
+        )
+    if compression == ZSTD:
+        return ZstdWriter(file, 3 if level is None else level)
+    raise ValueError("Unsupported feed compression: {}".format(compression))
+
+
+class ZstdWriter(io.RawIOBase):
+    """Writable zstd stream that ends the frame on close without closing the file"""
+
+    def __init__(self, file, level):
+        import zstandard
+
+        self.writer = zstandard.ZstdCompressor(level=level).stream_writer(file)
+        self.flush_frame = zstandard.FLUSH_FRAME
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.writer.write(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.writer.flush(self.flush_frame)
+        super().close()
+
+
+class CompressedJsonLinesItemExporter(JsonLinesItemExporter):
+    """
+    JsonLinesItemExporter that compresses the feed as it's written, using the codec in
+    CITY_SCRAPERS_FEED_COMPRESSION ("gzip" or "zstd", unset for no compression) at
+    CITY_SCRAPERS_FEED_COMPRESSION_LEVEL if set. Feeds can be read back with
+    `iter_feed_lines`.
+    """
+
+    def __init__(self, file, compression=None, compression_level=None, **kwargs):
+        self.stream = None
+        if compression:
+            self.stream = compress_stream(file, compression, compression_level)
+        super().__init__(self.stream or file, **kwargs)
+
+    @classmethod
+    def from_crawler(cls, crawler, file, *args, **kwargs):
+        settings = crawler.settings
+        level = settings.get("CITY_SCRAPERS_FEED_COMPRESSION_LEVEL")
+        return cls(
+            file,
+            *args,
+            compression=settings.get("CITY_SCRAPERS_FEED_COMPRESSION"),
+            compression_level=None if level is None else int(level),
+            **kwargs
+        )
+
+    def finish_exporting(self):
+        super().finish_exporting()
+        if self.stream is not None:
+            self.stream.close()
+
+
+class PrefixedStream(io.RawIOBase):
+    """Readable stream that returns bytes already read from a stream before the rest"""
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.prefix:
+            size = min(len(buffer), len(self.prefix))
+            buffer[:size] = self.prefix[:size]
+            self.prefix = self.prefix[size:]
+            return size
+        data = self.stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def open_feed(stream):
+    """
+    Return a text stream of a jsonlines feed from a binary stream that's either
+    uncompressed or compressed with gzip or zstd, detected from the first bytes. Only
+    calls `read` on the stream, so S3 response bodies can be read without downloading.
+    """
+    prefix = stream.read(len(ZSTD_MAGIC))
+    raw = PrefixedStream(prefix, stream)
+    if prefix.startswith(GZIP_MAGIC):
+        binary = gzip.GzipFile(fileobj=io.BufferedReader(raw), mode="rb")
+    elif prefix.startswith(ZSTD_MAGIC):
+        import zstandard
+
+        # Concatenated feeds are read as one, like multi-member gzip files
+        binary = zstandard.ZstdDecompressor().stream_reader(
+            raw, read_across_frames=True
+        )
+    else:
+        binary = io.BufferedReader(raw)
+    return io.TextIOWrapper(binary, encoding="utf-8")
+
+
+def iter_feed_lines(stream):
+    """Yield the non-empty lines of a feed from a possibly compressed binary stream"""
+    for line in open_feed(stream):
+        if line.strip():
+            yield line
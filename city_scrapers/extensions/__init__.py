@@ -0,0 +1,2 @@
+from .instrumentation import InstrumentationExtension  # noqa
+from .profiler import ProfilerExtension  # noqa
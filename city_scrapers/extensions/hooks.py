@@ -0,0 +1,113 @@
+import functools
+import inspect
+import time
+
+from scrapy.http import Request
+
+
+def bound_method(method):
+    return hasattr(method, "__self__")
+
+
+class SpiderHooks:
+    """
+    Base for extensions that run code around a spider's callbacks and item pipelines.
+
+    Callbacks are wrapped as requests are scheduled, and the `process_item` methods in
+    the item pipeline manager are wrapped when the spider opens, so subclasses don't
+    need any middleware or pipeline settings. Subclasses override `start_segment` and
+    `stop_segment` to run around each stretch of callback or pipeline code, and
+    `record_callback` and `record_pipeline` to receive timings.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    def start_segment(self):
+        pass
+
+    def stop_segment(self):
+        pass
+
+    def record_callback(self, name, elapsed, item_count):
+        pass
+
+    def record_pipeline(self, name, elapsed):
+        pass
+
+    def wrap_pipelines(self, spider):
+        itemproc = self.crawler.engine.scraper.itemproc
+        methods = itemproc.methods["process_item"]
+        # Newer versions of Scrapy track which methods take a spider argument
+        requiring_spider = getattr(itemproc, "_mw_methods_requiring_spider", None)
+        for idx, method in enumerate(methods):
+            takes_spider = requiring_spider is None or method in requiring_spider
+            methods[idx] = self.hooked_pipeline(method, spider, takes_spider)
+
+    def hooked_pipeline(self, method, spider, takes_spider):
+        # Pipelines already wrapped by another extension keep their original name, and
+        # older versions of Scrapy wrap each method to accept coroutines
+        name = getattr(method, "_pipeline_name", None) or (
+            type(inspect.unwrap(method, stop=bound_method).__self__).__name__
+        )
+
+        @functools.wraps(method)
+        def process_item(item, *args):
+            started = time.perf_counter()
+            self.start_segment()
+            try:
+                if takes_spider:
+                    return method(item, spider)
+                return method(item)
+            finally:
+                self.stop_segment()
+                self.record_pipeline(name, time.perf_counter() - started)
+
+        process_item._pipeline_name = name
+        return process_item
+
+    def request_scheduled(self, request, spider):
+        callback = request.callback or spider.parse
+        # Retries and redirects copy requests with callbacks that are already wrapped
+        if id(self) not in getattr(callback, "_hooks", ()):
+            request.callback = self.hooked_callback(callback)
+
+    def hooked_callback(self, callback):
+        name = callback.__name__
+
+        @functools.wraps(callback)
+        def hooked(response, **kwargs):
+            started = time.perf_counter()
+            self.start_segment()
+            try:
+                result = callback(response, **kwargs)
+            finally:
+                self.stop_segment()
+            elapsed = time.perf_counter() - started
+            if not inspect.isgenerator(result):
+                self.record_callback(name, elapsed, 0)
+                return result
+            return self.hooked_iter(result, name, elapsed)
+
+        hooked._hooks = getattr(callback, "_hooks", frozenset()) | {id(self)}
+        return hooked
+
+    def hooked_iter(self, result, name, elapsed):
+        """Yield from a callback's generator, only timing the callback's own work"""
+        item_count = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                self.start_segment()
+                try:
+                    output = next(result)
+                except StopIteration:
+                    break
+                finally:
+                    self.stop_segment()
+                    elapsed += time.perf_counter() - started
+                if not isinstance(output, Request):
+                    item_count += 1
+                yield output
+        finally:
+            self.record_callback(name, elapsed, item_count)
@@ -0,0 +1,129 @@
+import json
+import os
+import time
+from collections import defaultdict
+
+from scrapy import signals
+from scrapy.utils.project import data_path
+
+from .hooks import SpiderHooks
+
+
+def histogram(samples):
+    """Summarize samples as their count, p50, p95, max and total"""
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "max": None, "total": 0}
+    ordered = sorted(samples)
+
+    def percentile(pct):
+        return ordered[
+            min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        ]
+
+    return {
+        "count": len(ordered),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "max": ordered[-1],
+        "total": sum(ordered),
+    }
+
+
+class InstrumentationExtension(SpiderHooks):
+    """
+    Records where each spider's time goes and writes a JSON report when it closes, to
+    CITY_SCRAPERS_INSTRUMENTATION_PATH (with %(name)s replaced by the spider name).
+
+    For each callback it records download latency, bytes received and time spent
+    iterating the callback's output, and for each item pipeline the time spent in
+    `process_item`. Each is summarized as a p50/p95/max histogram, along with items
+    scraped per second for the spider overall.
+    """
+
+    def __init__(self, crawler, path):
+        super().__init__(crawler)
+        self.path = path
+        self.spider = None
+        self.started = None
+        self.item_count = 0
+        self.download_latency = defaultdict(list)
+        self.response_bytes = defaultdict(list)
+        self.callback_time = defaultdict(list)
+        self.callback_items = defaultdict(int)
+        self.pipeline_time = defaultdict(list)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        ext = cls(
+            crawler,
+            crawler.settings.get(
+                "CITY_SCRAPERS_INSTRUMENTATION_PATH", "instrumentation/%(name)s.json"
+            ),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    def spider_opened(self, spider):
+        self.spider = spider
+        self.started = time.time()
+        self.wrap_pipelines(spider)
+
+    def record_callback(self, name, elapsed, item_count):
+        self.callback_time[name].append(elapsed)
+        self.callback_items[name] += item_count
+
+    def record_pipeline(self, name, elapsed):
+        self.pipeline_time[name].append(elapsed)
+
+    def response_received(self, response, request, spider):
+        callback = request.callback or spider.parse
+        name = callback.__name__
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.download_latency[name].append(latency)
+        self.response_bytes[name].append(len(response.body))
+
+    def item_scraped(self, item, spider):
+        self.item_count += 1
+
+    def report(self, spider, reason):
+        elapsed = time.time() - self.started
+        callbacks = sorted(
+            set(self.download_latency)
+            | set(self.callback_time)
+            | set(self.response_bytes)
+        )
+        return {
+            "spider": spider.name,
+            "finish_reason": reason,
+            "elapsed": elapsed,
+            "item_count": self.item_count,
+            "items_per_second": self.item_count / elapsed if elapsed else None,
+            "callbacks": {
+                name: {
+                    "download_latency": histogram(self.download_latency[name]),
+                    "response_bytes": histogram(self.response_bytes[name]),
+                    "callback_time": histogram(self.callback_time[name]),
+                    "item_count": self.callback_items[name],
+                }
+                for name in callbacks
+            },
+            "pipelines": {
+                name: histogram(samples) for name, samples in self.pipeline_time.items()
+            },
+        }
+
+    def spider_closed(self, spider, reason):
+        report = self.report(spider, reason)
+        path = data_path(self.path % {"name": spider.name})
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        spider.logger.info(
+            "Instrumentation report for %s written to %s", spider.name, path
+        )
@@ -0,0 +1,76 @@
+import cProfile
+import io
+import os
+import pstats
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.project import data_path
+
+from .hooks import SpiderHooks
+
+
+class ProfilerExtension(SpiderHooks):
+    """
+    Profiles the callbacks and item pipelines of spiders listed in
+    CITY_SCRAPERS_PROFILE_SPIDERS with cProfile, and writes the stats to
+    CITY_SCRAPERS_PROFILE_PATH (with %(name)s replaced by the spider name) as a .prof
+    file for tools like snakeviz along with a .txt summary of the top
+    CITY_SCRAPERS_PROFILE_TOP functions by cumulative time.
+
+    The profiler is only enabled while a callback or pipeline is running, so time
+    spent waiting on downloads isn't included. Spiders that aren't listed don't load
+    the extension at all.
+    """
+
+    def __init__(self, crawler, path, top):
+        super().__init__(crawler)
+        self.path = path
+        self.top = top
+        self.profile = cProfile.Profile()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        spider_names = crawler.settings.getlist("CITY_SCRAPERS_PROFILE_SPIDERS")
+        if crawler.spidercls.name not in spider_names:
+            raise NotConfigured
+        ext = cls(
+            crawler,
+            crawler.settings.get("CITY_SCRAPERS_PROFILE_PATH", "profiles/%(name)s"),
+            crawler.settings.getint("CITY_SCRAPERS_PROFILE_TOP", 30),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.request_scheduled, signal=signals.request_scheduled)
+        return ext
+
+    def start_segment(self):
+        self.profile.enable()
+
+    def stop_segment(self):
+        self.profile.disable()
+
+    def spider_opened(self, spider):
+        self.wrap_pipelines(spider)
+
+    def summary(self):
+        """Return the top functions by cumulative time as text"""
+        output = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=output)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        return output.getvalue()
+
+    def spider_closed(self, spider, reason):
+        try:
+            summary = self.summary()
+        except TypeError:
+            # pstats raises TypeError if nothing was profiled
+            spider.logger.info("No profile recorded for %s", spider.name)
+            return
+        path = data_path(self.path % {"name": spider.name})
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.profile.dump_stats(path + ".prof")
+        with open(path + ".txt", "w") as f:
+            f.write(summary)
+        spider.logger.info("Profile for %s written to %s.prof", spider.name, path)
@@ -0,0 +1,21 @@
+from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+
+
+class SharedPoolDownloadHandler(HTTP11DownloadHandler):
+    """
+    HTTP download handler that shares one keep-alive connection pool between every
+    crawler that uses it in a process, like spiders crawled together by crawlall that
+    request the same hosts. The pool keeps connections for each host up to the
+    CONCURRENT_REQUESTS_PER_DOMAIN setting of the first crawler.
+
+    Idle connections are closed when each crawler finishes, and are opened again by the
+    crawlers still running.
+    """
+
+    shared_pool = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if SharedPoolDownloadHandler.shared_pool is None:
+            SharedPoolDownloadHandler.shared_pool = self._pool
+        self._pool = SharedPoolDownloadHandler.shared_pool
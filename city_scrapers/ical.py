@@ -0,0 +1,301 @@
+import hashlib
+import unicodedata
+from datetime import datetime, timedelta
+from itertools import takewhile
+
+from city_scrapers_core.constants import NOT_CLASSIFIED
+from city_scrapers_core.items import Meeting
+from dateutil.rrule import rruleset, rrulestr
+from dateutil.tz import gettz
+
+from .middlewares.parse_cache import spider_version
+from .mixins import SpiderCacheMixin
+from .utils import iter_ical_events
+from .utils.ical import parse_ical_datetime
+
+# Properties that change on every export without the event changing
+VOLATILE_PROPERTIES = {"DTSTAMP"}
+RECURRENCE_PROPERTIES = ("RRULE", "RDATE")
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def event_hash(event):
+    """Return a hash of an event's properties, except ones that change every export"""
+    content = hashlib.sha1()
+    for name in sorted(event.properties):
+        if name in VOLATILE_PROPERTIES:
+            continue
+        for params, value in event.properties[name]:
+            content.update(
+                "{};{}:{}\n".format(name, sorted(params.items()), value).encode()
+            )
+    return content.hexdigest()
+
+
+def dump_meeting(meeting):
+    """Return a meeting as a dict that can be stored as JSON"""
+    data = dict(meeting)
+    for key in ["start", "end"]:
+        if data.get(key) is not None:
+            data[key] = data[key].strftime(DATETIME_FORMAT)
+    return data
+
+
+def load_meeting(data):
+    meeting = Meeting(**data)
+    for key in ["start", "end"]:
+        if meeting.get(key) is not None:
+            meeting[key] = datetime.strptime(meeting[key], DATETIME_FORMAT)
+    return meeting
+
+
+class ICalEventsMixin(SpiderCacheMixin):
+    """
+    Mixin for spiders of iCalendar exports at `start_urls`, like the All-in-One Event
+    Calendar WordPress plugin's. Each VEVENT is read as the response is parsed and
+    mapped to a Meeting through `ical_fields`, which has the property each field is
+    read from.
+
+    Recurring events are expanded into a meeting for each occurrence from
+    `ical_past_days` before today through `ical_future_days` after it, with occurrences
+    generated one at a time rather than listed in full. Events overriding a single
+    occurrence with RECURRENCE-ID replace that occurrence.
+
+    The SEQUENCE, LAST-MODIFIED and a content hash of each event are kept in the
+    spider cache by UID along with its meetings. Meetings of unchanged events are
+    output from the cache without being built again, since the diff pipeline cancels
+    upcoming meetings missing from a scrape. Cached meetings are built again when the
+    spider's source or its `ical_` attributes change.
+    """
+
+    # Meeting fields with the VEVENT property each is read from
+    ical_fields = {
+        "title": "SUMMARY",
+        "description": "DESCRIPTION",
+        "location": "LOCATION",
+        "source": "URL",
+    }
+    ical_classification = NOT_CLASSIFIED
+    # Expand RRULE and RDATE recurrences, or only output each event at DTSTART
+    ical_expand_recurrences = True
+    # Days before and after today to output occurrences of recurring events within
+    ical_past_days = 60
+    ical_future_days = 365
+    # Occurrences depend on the current date, and unchanged events are already cached
+    dont_parse_cache = True
+
+    def parse(self, response):
+        self._ical_version = self._ical_code_version()
+        self._ical_window = self._ical_recurrence_window()
+        self._ical_overrides = set()
+        self._ical_unknown_zones = set()
+        recurring = []
+        cached = self.cache.items("ical_events") if self.cache is not None else {}
+        seen = set()
+        for event in iter_ical_events(response.body):
+            key = self._ical_key(event)
+            seen.add(key)
+            self._ical_check_zones(event)
+            if event.raw("RECURRENCE-ID"):
+                self._ical_overrides.add(
+                    (
+                        event.raw("UID"),
+                        self._ical_datetime(event.datetime("RECURRENCE-ID")),
+                    )
+                )
+            if self._is_recurring(event):
+                # Occurrences are output once every override has been read
+                recurring.append((key, event))
+                continue
+            yield from self._ical_event_meetings(key, event, cached, response)
+
+        for key, event in recurring:
+            yield from self._ical_event_meetings(key, event, cached, response)
+
+        if self.cache is not None:
+            # Drop events that are no longer in the calendar
+            for key in set(cached) - seen:
+                self.cache.delete("ical_events", key)
+            self.cache.commit()
+
+    def _ical_event_meetings(self, key, event, cached, response):
+        state = self._ical_state(event)
+        if key in cached and cached[key]["state"] == state:
+            self.crawler.stats.inc_value("ical/cached")
+            for data in cached[key]["meetings"]:
+                yield self._ical_cached_meeting(data)
+            return
+        meetings = [
+            self._parse_ical_meeting(event, start, end, response)
+            for start, end in self._ical_occurrences(event)
+        ]
+        if self.cache is not None:
+            self.crawler.stats.inc_value("ical/parsed")
+            self.cache.set(
+                "ical_events",
+                key,
+                {"state": state, "meetings": [dump_meeting(item) for item in meetings]},
+            )
+        yield from meetings
+
+    def _parse_ical_meeting(self, event, start, end, response):
+        meeting = Meeting(
+            title=self._ical_text(event, "title"),
+            description=self._ical_text(event, "description"),
+            classification=self.ical_classification,
+            start=start,
+            end=end,
+            all_day=event.all_day,
+            time_notes=None,
+            location={"address": self._ical_text(event, "location"), "name": ""},
+            links=[],
+            source=self._ical_text(event, "source") or response.url,
+        )
+        meeting["status"] = self._get_status(meeting)
+        meeting["id"] = self._get_id(meeting)
+        return meeting
+
+    def _ical_cached_meeting(self, data):
+        meeting = load_meeting(data)
+        # Statuses depend on the current date, so can't be cached
+        meeting["status"] = self._get_status(meeting)
+        return meeting
+
+    def normalize(self, s):
+        """Apply some simple transformations to clean up a string (aka normalize it)
+
+        Specifically:
+        1. Apply unicode normalization to convert byte sequences like \xa0 to spaces.
+        2. Strip extra space from the beginning and end of the string.
+        3. Strip extra space from each line of text.
+        """
+        if not s:
+            return ""
+        unicode_normalized = unicodedata.normalize("NFKD", s).strip()
+        stripped_lines = [line.strip() for line in unicode_normalized.split("\n")]
+        return "\n".join(stripped_lines)
+
+    def _ical_text(self, event, field):
+        prop = self.ical_fields.get(field)
+        return self.normalize(event.text(prop) if prop else None)
+
+    def _ical_key(self, event):
+        """Return the UID of an event, along with its RECURRENCE-ID for overrides"""
+        return "/".join(
+            value for value in [event.raw("UID"), event.raw("RECURRENCE-ID")] if value
+        )
+
+    def _ical_state(self, event):
+        state = [
+            self._ical_version,
+            event.raw("SEQUENCE"),
+            event.raw("LAST-MODIFIED"),
+            event_hash(event),
+        ]
+        if self._is_recurring(event):
+            # Occurrences depend on the window and overrides as well as the event
+            uid = event.raw("UID")
+            state.append([day.strftime("%Y-%m-%d") for day in self._ical_window])
+            state.append(
+                sorted(
+                    start.strftime(DATETIME_FORMAT)
+                    for override_uid, start in self._ical_overrides
+                    if override_uid == uid
+                )
+            )
+        return state
+
+    def _ical_code_version(self):
+        """Hash of the spider's source and the settings its meetings are built with"""
+        code_hash = hashlib.sha1(spider_version(type(self)).encode())
+        code_hash.update(
+            repr(
+                [
+                    sorted(self.ical_fields.items()),
+                    self.ical_classification,
+                    self.ical_expand_recurrences,
+                    self.timezone,
+                ]
+            ).encode()
+        )
+        return code_hash.hexdigest()
+
+    def _is_recurring(self, event):
+        return self.ical_expand_recurrences and any(
+            event.raw(name) for name in RECURRENCE_PROPERTIES
+        )
+
+    def _ical_check_zones(self, event):
+        """Warn once about each TZID that can't be found, as its times are read as local"""
+        for name in ("DTSTART", "DTEND", "RECURRENCE-ID"):
+            tzid = event.params(name).get("TZID")
+            if tzid and tzid not in self._ical_unknown_zones and gettz(tzid) is None:
+                self._ical_unknown_zones.add(tzid)
+                self.logger.warning(
+                    "Unknown TZID %r, reading its times in %s", tzid, self.timezone
+                )
+
+    def _ical_datetime(self, value):
+        """Convert a datetime to the spider's timezone, returning it without tzinfo"""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(gettz(self.timezone)).replace(tzinfo=None)
+        return value
+
+    def _ical_end(self, begin, end):
+        # Events without an end have an end equal to their start, so leave the end as
+        # None for the parent spider's default
+        if end is None or end == begin:
+            return None
+        return self._ical_datetime(end)
+
+    def _ical_recurrence_window(self):
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return (
+            today - timedelta(days=self.ical_past_days),
+            today + timedelta(days=self.ical_future_days),
+        )
+
+    def _ical_occurrences(self, event):
+        """Yield the start and end of each occurrence of an event to output"""
+        begin, end = event.begin, event.end
+        if begin is None:
+            return
+        if not self._is_recurring(event):
+            yield self._ical_datetime(begin), self._ical_end(begin, end)
+            return
+
+        duration = end - begin if end is not None else timedelta(0)
+        window_start, window_end = self._ical_window
+        uid = event.raw("UID")
+        try:
+            occurrences = self._ical_rruleset(event, begin)
+            for occurrence in takewhile(
+                lambda value: self._ical_datetime(value) <= window_end,
+                occurrences,
+            ):
+                start = self._ical_datetime(occurrence)
+                if start < window_start or (uid, start) in self._ical_overrides:
+                    continue
+                yield start, self._ical_end(occurrence, occurrence + duration)
+        except (ValueError, TypeError):
+            self.logger.warning("Couldn't expand recurrences of event %s", uid)
+            yield self._ical_datetime(begin), self._ical_end(begin, end)
+
+    def _ical_rruleset(self, event, begin):
+        """Return a lazily evaluated set of an event's occurrences"""
+        occurrences = rruleset()
+        for _, value in event.properties.get("RRULE", []):
+            occurrences.rrule(rrulestr(value, dtstart=begin))
+        for name, add in [("RDATE", occurrences.rdate), ("EXDATE", occurrences.exdate)]:
+            for params, value in event.properties.get(name, []):
+                for date_str in value.split(","):
+                    date = parse_ical_datetime(date_str, params.get("TZID"))
+                    # Dates must all be aware or naive like DTSTART to be compared
+                    if begin.tzinfo is None:
+                        date = self._ical_datetime(date)
+                    elif date.tzinfo is None:
+                        date = date.replace(tzinfo=begin.tzinfo)
+                    add(date)
+        # DTSTART is always the first occurrence, even if the rules don't match it
+        occurrences.rdate(begin)
+        return occurrences
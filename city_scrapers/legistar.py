@@ -0,0 +1,471 @@
+"""
+Reads meetings from the Legistar Web API (https://webapi.legistar.com) instead of
+scraping the Calendar.aspx grid of a Legistar site, and serves a local stand-in for the
+API to tests and benchmarks.
+"""
+
+import json
+import operator
+import re
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, parse_qsl, quote, urlencode, urlsplit
+
+from scrapy import Request
+
+from .mixins import DateWindowMixin
+from .utils import loads_json
+
+API_URL = "https://webapi.legistar.com/v1/"
+YEAR_TARGET = "ctl00$ContentPlaceHolder1$lstYears"
+
+# Calendar columns with links, and the event fields they're read from
+LINK_FIELDS = [
+    ("Agenda", "EventAgendaFile"),
+    ("Minutes", "EventMinutesFile"),
+    ("Video", "EventVideoPath"),
+]
+
+
+def legistar_event(event, base_url, name_links=False):
+    """
+    Convert an event from the Web API to the columns of its row in the Calendar.aspx
+    grid of the site at `base_url`, in the format `parse_legistar` receives
+    """
+    event_date = datetime.strptime(event["EventDate"][:10], "%Y-%m-%d")
+    location = event.get("EventLocation") or ""
+    if event.get("EventComment"):
+        # The calendar shows comments in italics on a new line of the location
+        location += "\n--em--{}--em--".format(event["EventComment"])
+    name = event["EventBodyName"]
+    if name_links:
+        name = {
+            "label": name,
+            "url": "{}/DepartmentDetail.aspx?ID={}".format(
+                base_url, event["EventBodyId"]
+            ),
+        }
+    item = {
+        "Name": name,
+        "Meeting Date": "{d.month}/{d.day}/{d.year}".format(d=event_date),
+        "Meeting Time": event.get("EventTime") or "",
+        "Meeting Location": location,
+        "iCalendar": {
+            "url": "{}/View.ashx?M=IC&ID={}&GUID={}".format(
+                base_url, event["EventId"], event["EventGuid"]
+            )
+        },
+        "Meeting Details": "Not available",
+    }
+    if event.get("EventInSiteURL"):
+        item["Meeting Details"] = {
+            "label": "Meeting details",
+            "url": event["EventInSiteURL"],
+        }
+    for column, field in LINK_FIELDS:
+        if event.get(field):
+            item[column] = {"label": column, "url": event[field]}
+        else:
+            item[column] = "Not available"
+    return item
+
+
+class LegistarApiMixin(DateWindowMixin):
+    """
+    Mixin for LegistarSpider subclasses that reads events from the Legistar Web API
+    instead of the Calendar.aspx grid, and passes them to `parse_legistar` in the same
+    format.
+
+    Events are kept in the spider cache. The first run and full backfills request every
+    event in the date window. Later runs only request events modified since the last
+    sync with an OData filter on EventLastModifiedUtc, along with the IDs of events in
+    the window so deleted events are dropped, and output every cached event in the
+    window.
+
+    Setting CITY_SCRAPERS_LEGISTAR_API_URL to an empty string scrapes the calendar
+    instead, with a separate session for each year in the window so every year is
+    requested at once with its own viewstate. The time each year took is saved in the
+    legistar/year_seconds/<year> stat.
+
+    Both engines use SharedPoolDownloadHandler so Legistar spiders crawled in the same
+    process share keep-alive connections, and CITY_SCRAPERS_LEGISTAR_CONCURRENCY sets
+    their requests per host unless CONCURRENT_REQUESTS_PER_DOMAIN is set on the
+    command line.
+    """
+
+    # Client name in API URLs, like "pittsburgh" for pittsburgh.legistar.com
+    legistar_client = None
+    # Whether the calendar of the site links meeting names to the pages of their body
+    legistar_name_links = False
+    # Most events the API returns for a request
+    legistar_page_size = 1000
+    legistar_api_url = API_URL
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._legistar_events = {}
+        self._legistar_changed = set()
+        self._legistar_window_ids = set()
+        self._legistar_cursor = None
+        self._legistar_latest = None
+        self._calendar_started = {}
+        self._calendar_pages = {}
+        self._calendar_urls = set()
+
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        settings.set(
+            "CONCURRENT_REQUESTS_PER_DOMAIN",
+            settings.getint("CITY_SCRAPERS_LEGISTAR_CONCURRENCY", 8),
+            priority="spider",
+        )
+        handlers = dict(settings.getdict("DOWNLOAD_HANDLERS"))
+        for scheme in ["http", "https"]:
+            handlers.setdefault(
+                scheme, "city_scrapers.handlers.SharedPoolDownloadHandler"
+            )
+        settings.set("DOWNLOAD_HANDLERS", handlers, priority="spider")
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.legistar_api_url = crawler.settings.get(
+            "CITY_SCRAPERS_LEGISTAR_API_URL", API_URL
+        )
+        if spider.legistar_api_url:
+            spider.allowed_domains = list(spider.allowed_domains) + [
+                urlsplit(spider.legistar_api_url).hostname
+            ]
+        return spider
+
+    def start_requests(self):
+        if not self.legistar_api_url:
+            yield from self._calendar_requests()
+            return
+        if self.cache is not None and not self.full_backfill:
+            self._legistar_cursor = self.cache.get("cursor", "legistar_modified")
+        if self._legistar_cursor is None:
+            event_filter = self._window_filter()
+        else:
+            self._legistar_events = self.cache.items("legistar_events")
+            event_filter = "EventLastModifiedUtc gt datetime'{}'".format(
+                self._legistar_cursor
+            )
+        self._legistar_latest = self._legistar_cursor
+        yield self._legistar_request(event_filter, self._parse_api_events)
+
+    def _window_filter(self):
+        return "EventDate ge datetime'{:%Y-%m-%d}'".format(self.date_window()[0])
+
+    def _legistar_request(self, event_filter, callback, skip=0, select=None):
+        params = {
+            "$filter": event_filter,
+            "$orderby": "EventId",
+            "$top": self.legistar_page_size,
+            "$skip": skip,
+        }
+        if select:
+            params["$select"] = select
+        return Request(
+            "{}{}/events?{}".format(
+                self.legistar_api_url.rstrip("/") + "/",
+                self.legistar_client,
+                urlencode(params, safe="$'", quote_via=quote),
+            ),
+            headers={"Accept": "application/json"},
+            callback=callback,
+            cb_kwargs={"event_filter": event_filter, "skip": skip},
+        )
+
+    def _parse_api_events(self, response, event_filter=None, skip=0):
+        events = loads_json(response.body)
+        for event in events:
+            event_id = str(event["EventId"])
+            self._legistar_events[event_id] = event
+            self._legistar_changed.add(event_id)
+            modified = event.get("EventLastModifiedUtc")
+            if modified and (
+                self._legistar_latest is None or modified > self._legistar_latest
+            ):
+                self._legistar_latest = modified
+        if len(events) == self.legistar_page_size:
+            yield self._legistar_request(
+                event_filter, self._parse_api_events, skip=skip + len(events)
+            )
+        elif self._legistar_cursor is None:
+            yield from self._finish_api_sync()
+        else:
+            yield self._legistar_request(
+                self._window_filter(), self._parse_api_ids, select="EventId"
+            )
+
+    def _parse_api_ids(self, response, event_filter=None, skip=0):
+        events = loads_json(response.body)
+        self._legistar_window_ids.update(str(event["EventId"]) for event in events)
+        if len(events) == self.legistar_page_size:
+            yield self._legistar_request(
+                event_filter,
+                self._parse_api_ids,
+                skip=skip + len(events),
+                select="EventId",
+            )
+        else:
+            yield from self._finish_api_sync()
+
+    def _finish_api_sync(self):
+        """Save the synced events and pass the ones in the date window to
+        `parse_legistar`"""
+        start = self.date_window()[0].strftime("%Y-%m-%d")
+        for event_id, event in list(self._legistar_events.items()):
+            if event["EventDate"][:10] < start or (
+                self._legistar_cursor is not None
+                and event_id not in self._legistar_window_ids
+            ):
+                del self._legistar_events[event_id]
+
+        if self.cache is not None:
+            for event_id in self.cache.keys("legistar_events") - set(
+                self._legistar_events
+            ):
+                self.cache.delete("legistar_events", event_id)
+            for event_id in self._legistar_changed & set(self._legistar_events):
+                self.cache.set(
+                    "legistar_events", event_id, self._legistar_events[event_id]
+                )
+            if self._legistar_latest is not None:
+                self.cache.set("cursor", "legistar_modified", self._legistar_latest)
+            self.cache.commit()
+
+        base_url = self._legistar_base_url()
+        events = sorted(
+            self._legistar_events.values(),
+            key=lambda event: (event["EventDate"], event["EventId"]),
+        )
+        yield from self.parse_legistar(
+            [
+                (legistar_event(event, base_url, self.legistar_name_links), None)
+                for event in events
+            ]
+        )
+
+    @property
+    def base_url(self):
+        """Base URL of the Legistar site, which only some LegistarSpider versions have"""
+        return self._legistar_base_url()
+
+    def _legistar_base_url(self):
+        return "{0.scheme}://{0.netloc}".format(urlsplit(self.start_urls[0]))
+
+    def _calendar_requests(self):
+        """Start a separate session on the calendar for each year in the date window"""
+        calendar_url = self._legistar_base_url() + "/Calendar.aspx"
+        for year in range(self.date_window()[0].year, datetime.now().year + 1):
+            self._calendar_started[year] = time.time()
+            self._calendar_pages[year] = 0
+            yield Request(
+                calendar_url,
+                callback=self._parse_calendar_session,
+                cb_kwargs={"year": year},
+                meta={"cookiejar": "legistar-{}".format(year)},
+                dont_filter=True,
+            )
+
+    def _parse_calendar_session(self, response, year=None):
+        """Select the year on the calendar with the viewstate of its session"""
+        yield self._calendar_postback(
+            response,
+            {
+                "__EVENTTARGET": YEAR_TARGET,
+                "ctl00_ContentPlaceHolder1_lstYears_ClientState": json.dumps(
+                    {"value": str(year)}
+                ),
+            },
+            year,
+        )
+
+    def _parse_calendar_page(self, response, year=None):
+        self._calendar_pages[year] += 1
+        yield from self.parse_legistar(
+            [(event, None) for event in self._parse_calendar_events(response)]
+        )
+        next_page_link = response.css("a.rgCurrentPage + a")
+        if next_page_link:
+            yield self._calendar_postback(
+                response,
+                dict(
+                    parse_qsl(response.request.body.decode("utf-8")),
+                    __EVENTTARGET=next_page_link[0].attrib["href"].split("'")[1],
+                ),
+                year,
+            )
+            return
+        elapsed = time.time() - self._calendar_started[year]
+        self.logger.info(
+            "Legistar calendar for %d took %.2fs for %d pages",
+            year,
+            elapsed,
+            self._calendar_pages[year],
+        )
+        if getattr(self, "crawler", None) is not None:
+            stats = self.crawler.stats
+            stats.set_value("legistar/year_seconds/{}".format(year), round(elapsed, 3))
+            stats.set_value(
+                "legistar/year_pages/{}".format(year), self._calendar_pages[year]
+            )
+
+    def _calendar_postback(self, response, form, year):
+        form = dict(form, __EVENTARGUMENT="")
+        form["__VIEWSTATE"] = response.css("[name='__VIEWSTATE']")[0].attrib["value"]
+        event_validation = response.css("[name='__EVENTVALIDATION']")
+        if event_validation:
+            form["__EVENTVALIDATION"] = event_validation[0].attrib["value"]
+        return Request(
+            response.url,
+            method="POST",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            body=urlencode(form),
+            callback=self._parse_calendar_page,
+            cb_kwargs={"year": year},
+            meta={"cookiejar": response.meta["cookiejar"]},
+            dont_filter=True,
+        )
+
+    def _parse_calendar_events(self, response):
+        """Read the rows of the calendar grid as dicts of column names to text, or to
+        dicts of labels and URLs for links"""
+        tables = response.css("table.rgMasterTable")
+        if not tables:
+            return []
+        headers = []
+        for header in tables[0].css("th[class^='rgHeader']"):
+            header_text = " ".join(" ".join(header.css("*::text").extract()).split())
+            header_inputs = header.css("input")
+            if header_text:
+                headers.append(header_text)
+            elif header_inputs:
+                headers.append(header_inputs[0].attrib["value"])
+            else:
+                headers.append(header.css("img")[0].attrib.get("alt", ""))
+
+        events = []
+        for row in tables[0].css("tr.rgRow, tr.rgAltRow"):
+            event = {}
+            for header, field in zip(headers, row.css("td")):
+                text = " ".join(field.css("*::text").extract()).strip()
+                link = field.css("a")
+                url = None
+                if link:
+                    onclick = link[0].attrib.get("onclick", "")
+                    if onclick.startswith(
+                        ("radopen('", "window.open", "OpenTelerikWindow")
+                    ):
+                        url = response.urljoin(onclick.split("'")[1])
+                    elif "href" in link[0].attrib:
+                        url = response.urljoin(link[0].attrib["href"])
+                if url and header in ["", "ics"] and "View.ashx?M=IC" in url:
+                    event["iCalendar"] = {"url": url}
+                elif url:
+                    event[header] = {"label": text, "url": url}
+                else:
+                    event[header] = text
+            # Meetings can be listed on more than one page of the calendar
+            ical_url = event.get("iCalendar", {}).get("url")
+            if ical_url is None or ical_url in self._calendar_urls:
+                continue
+            self._calendar_urls.add(ical_url)
+            events.append(event)
+        return events
+
+
+# Comparisons in $filter clauses like "EventDate ge datetime'2020-01-01'"
+FILTER_RE = re.compile(
+    r"(\w+) (eq|ne|gt|ge|lt|le) (?:datetime'([^']*)'|'([^']*)'|(-?\d+))"
+)
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "lt": operator.lt,
+    "le": operator.le,
+}
+
+
+def query_events(events, params, page_size):
+    """
+    Apply the OData $filter, $orderby, $skip, $top and $select parameters the Web API
+    supports for events, limited to comparisons joined with "and". Dates are compared
+    as ISO strings.
+    """
+    results = list(events)
+    if params.get("$filter"):
+        for clause in params["$filter"].split(" and "):
+            match = FILTER_RE.fullmatch(clause.strip())
+            if match is None:
+                raise ValueError("Unsupported filter: {}".format(clause))
+            field, op, date_value, str_value, int_value = match.groups()
+            value = int(int_value) if int_value is not None else date_value
+            if value is None:
+                value = str_value
+            results = [
+                event
+                for event in results
+                if event.get(field) is not None and OPERATORS[op](event[field], value)
+            ]
+    if params.get("$orderby"):
+        field, _, direction = params["$orderby"].partition(" ")
+        results.sort(key=lambda event: event[field], reverse=direction == "desc")
+    skip = int(params.get("$skip", 0))
+    top = min(int(params.get("$top", page_size)), page_size)
+    results = results[skip : skip + top]
+    if params.get("$select"):
+        fields = params["$select"].split(",")
+        results = [{field: event.get(field) for field in fields} for event in results]
+    return results
+
+
+class LegistarApiHandler(BaseHTTPRequestHandler):
+    """Serves /v1/<client>/events from the events of the server"""
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        match = re.fullmatch(r"/v1/([^/]+)/events", parts.path)
+        events = self.server.events.get(match.group(1)) if match else None
+        if events is None:
+            self.send_error(404)
+            return
+        params = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        try:
+            results = query_events(events, params, self.server.page_size)
+        except (KeyError, ValueError) as e:
+            self.send_error(400, str(e))
+            return
+        self.server.requests.append(self.path)
+        body = json.dumps(results).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LegistarApiServer(ThreadingMixIn, HTTPServer):
+    """
+    Local stand-in for the Legistar Web API serving `events`, a dict of client names to
+    lists of events, and returning at most `page_size` events for each request like
+    the real API. Paths of requests are kept in `requests`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, events, page_size=1000):
+        super().__init__(address, LegistarApiHandler)
+        self.events = events
+        self.page_size = page_size
+        self.requests = []
@@ -0,0 +1,4 @@
+from .conditional_get import ConditionalGetMiddleware  # noqa
+from .link_check import LinkCheckMiddleware  # noqa
+from .parse_cache import ParseCacheMiddleware  # noqa
+from .replay import RecorderMiddleware, ReplayMiddleware  # noqa
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from scrapy import signals
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+from w3lib.url import canonicalize_url
+
+# Headers that describe the stored body rather than the original transfer
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class ConditionalGetStore:
+    """SQLite store of the last full response with validators for each request"""
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                spider TEXT NOT NULL,
+                key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (spider, key)
+            )
+            """)
+        self.conn.commit()
+
+    def get(self, spider_name, key):
+        row = self.conn.execute(
+            "SELECT url, status, headers, body, etag, last_modified, stored_at "
+            "FROM responses WHERE spider = ? AND key = ?",
+            (spider_name, key),
+        ).fetchone()
+        if row is None:
+            return None
+        url, status, headers, body, etag, last_modified, stored_at = row
+        return {
+            "url": url,
+            "status": status,
+            "headers": json.loads(headers),
+            "body": bytes(body),
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": stored_at,
+        }
+
+    def put(self, spider_name, key, response, etag, last_modified):
+        headers = {
+            name.decode("latin-1"): [value.decode("latin-1") for value in values]
+            for name, values in response.headers.items()
+            if name.decode("latin-1").lower() not in SKIPPED_HEADERS
+        }
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                spider_name,
+                key,
+                response.url,
+                response.status,
+                json.dumps(headers),
+                response.body,
+                etag,
+                last_modified,
+                time.time(),
+            ),
+        )
+        self.conn.commit()
+
+    def delete(self, spider_name, key):
+        self.conn.execute(
+            "DELETE FROM responses WHERE spider = ? AND key = ?", (spider_name, key)
+        )
+        self.conn.commit()
+
+    def expire(self, spider_name, stored_before):
+        """Remove a spider's responses that were downloaded before a timestamp"""
+        self.conn.execute(
+            "DELETE FROM responses WHERE spider = ? AND stored_at < ?",
+            (spider_name, stored_before),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class ConditionalGetMiddleware:
+    """
+    Downloader middleware that revalidates GET requests with If-None-Match and
+    If-Modified-Since using the validators of the last full response, and replays the
+    stored body into the spider's callback when the server answers 304 Not Modified.
+
+    Stored responses are downloaded in full again after
+    CITY_SCRAPERS_CONDITIONAL_GET_EXPIRATION_SECS (0 to never expire), and the hit
+    ratio for each spider is recorded in the "conditional_get/hit_ratio" stat.
+    """
+
+    def __init__(self, path, expiration_secs, stats):
+        self.path = path
+        self.expiration_secs = expiration_secs
+        self.stats = stats
+        self.store = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        middleware = cls(
+            data_path(
+                settings.get("CITY_SCRAPERS_CONDITIONAL_GET_PATH", "conditional_get.db")
+            ),
+            settings.getint("CITY_SCRAPERS_CONDITIONAL_GET_EXPIRATION_SECS", 0),
+            crawler.stats,
+        )
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.store = ConditionalGetStore(self.path)
+        if self.expiration_secs:
+            self.store.expire(spider.name, time.time() - self.expiration_secs)
+
+    def spider_closed(self, spider):
+        hits = self.stats.get_value("conditional_get/hit", 0)
+        misses = self.stats.get_value("conditional_get/miss", 0)
+        if hits + misses:
+            self.stats.set_value("conditional_get/hit_ratio", hits / (hits + misses))
+        self.store.close()
+
+    def process_request(self, request, spider):
+        if request.method != "GET" or request.meta.get("dont_cache"):
+            return
+        key = self._request_key(request)
+        request.meta["conditional_get_key"] = key
+        cached = self.store.get(spider.name, key)
+        if cached is None:
+            return
+        if cached["etag"]:
+            request.headers.setdefault("If-None-Match", cached["etag"])
+        if cached["last_modified"]:
+            request.headers.setdefault("If-Modified-Since", cached["last_modified"])
+
+    def process_response(self, request, response, spider):
+        key = request.meta.get("conditional_get_key")
+        if key is None:
+            return response
+        if response.status == 304:
+            cached = self.store.get(spider.name, key)
+            if cached is not None:
+                self.stats.inc_value("conditional_get/hit")
+                return self._cached_response(cached, request)
+            return response
+
+        self.stats.inc_value("conditional_get/miss")
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status == 200 and (etag or last_modified):
+            self.store.put(
+                spider.name,
+                key,
+                response,
+                etag.decode("latin-1") if etag else None,
+                last_modified.decode("latin-1") if last_modified else None,
+            )
+            self.stats.inc_value("conditional_get/stored")
+        else:
+            self.store.delete(spider.name, key)
+        return response
+
+    def _request_key(self, request):
+        key = hashlib.sha1(canonicalize_url(request.url).encode())
+        key.update(request.body or b"")
+        return key.hexdigest()
+
+    def _cached_response(self, cached, request):
+        headers = Headers(cached["headers"])
+        response_cls = responsetypes.from_args(
+            headers=headers, url=cached["url"], body=cached["body"]
+        )
+        return response_cls(
+            url=cached["url"],
+            status=cached["status"],
+            headers=headers,
+            body=cached["body"],
+            flags=["cached"],
+            request=request,
+        )
@@ -0,0 +1,185 @@
+import time
+from collections import Counter, defaultdict, deque
+from urllib.parse import urlsplit
+
+from city_scrapers_core.items import Meeting
+from scrapy import Request, signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.project import data_path
+
+from ..cache import SpiderCache
+
+# Statuses of links that are removed from meetings
+DEAD_STATUSES = {404, 410}
+# Statuses of servers that don't allow HEAD requests
+HEAD_NOT_ALLOWED_STATUSES = {405, 501}
+
+
+class LinkCheckMiddleware:
+    """
+    Spider middleware that checks the links and source of each meeting before it's
+    output, for spiders listed in CITY_SCRAPERS_LINK_CHECK_SPIDERS. Links returning 404
+    or 410 are removed from the meeting.
+
+    Links are checked with HEAD requests, or a GET request for the first byte when the
+    server doesn't allow HEAD. Working links are kept in the spider cache and aren't
+    checked again until CITY_SCRAPERS_LINK_CHECK_EXPIRATION_SECS later (0 to never
+    check them again), and at most CITY_SCRAPERS_LINK_CHECK_CONCURRENCY checks run at
+    once for each host.
+    """
+
+    def __init__(self, cache_path, concurrency, expiration_secs, stats):
+        self.cache_path = cache_path
+        self.concurrency = concurrency
+        self.expiration_secs = expiration_secs
+        self.stats = stats
+        self.cache = None
+        # Results of this run by URL, which are None for failed checks
+        self.results = {}
+        # Meetings waiting on each URL, as dicts of the meeting and its pending URLs
+        self.waiting = defaultdict(list)
+        self.active = Counter()
+        self.queued = defaultdict(deque)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if crawler.spidercls.name not in settings.getlist(
+            "CITY_SCRAPERS_LINK_CHECK_SPIDERS"
+        ):
+            raise NotConfigured
+        middleware = cls(
+            data_path(
+                settings.get("CITY_SCRAPERS_SPIDER_CACHE_PATH", "spider_cache.db")
+            ),
+            settings.getint("CITY_SCRAPERS_LINK_CHECK_CONCURRENCY", 2),
+            settings.getint("CITY_SCRAPERS_LINK_CHECK_EXPIRATION_SECS", 0),
+            crawler.stats,
+        )
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.cache = SpiderCache(self.cache_path, spider.name)
+
+    def spider_closed(self, spider):
+        self.cache.close()
+
+    def process_spider_output(self, response, result, spider):
+        for output in result:
+            yield from self._process_output(response, output)
+
+    async def process_spider_output_async(self, response, result, spider):
+        # Newer versions of Scrapy pass asynchronous output, like the output of start()
+        async for output in result:
+            for processed in self._process_output(response, output):
+                yield processed
+
+    def _process_output(self, response, output):
+        if isinstance(output, Meeting) and not (
+            response is not None
+            and response.request is not None
+            and "link_check" in response.request.meta
+        ):
+            yield from self._check_meeting(output)
+        else:
+            yield output
+
+    def _check_meeting(self, meeting):
+        urls = [link.get("href") for link in meeting.get("links") or []]
+        urls.append(meeting.get("source"))
+        pending = set()
+        for url in urls:
+            if not url or not url.startswith(("http://", "https://")):
+                continue
+            if url in self.results or url in pending:
+                continue
+            cached = self.cache.get("links", url)
+            if cached is not None and not self._expired(cached):
+                self.stats.inc_value("link_check/cached")
+                self.results[url] = cached
+                continue
+            pending.add(url)
+        if not pending:
+            yield self._finish(meeting)
+            return
+        held = {"meeting": meeting, "pending": pending}
+        for url in [url for url in urls if url in pending]:
+            self.waiting[url].append(held)
+            if len(self.waiting[url]) == 1:
+                yield from self._schedule(url)
+
+    def _expired(self, cached):
+        return bool(self.expiration_secs) and (
+            cached.get("checked", 0) < time.time() - self.expiration_secs
+        )
+
+    def _schedule(self, url):
+        host = urlsplit(url).hostname
+        if self.active[host] < self.concurrency:
+            self.active[host] += 1
+            yield self._request(url)
+        else:
+            self.queued[host].append(url)
+
+    def _request(self, url, method="HEAD"):
+        return Request(
+            url,
+            method=method,
+            headers={"Range": "bytes=0-0"} if method == "GET" else None,
+            callback=self._parse_link,
+            errback=self._link_error,
+            meta={
+                "link_check": url,
+                "handle_httpstatus_all": True,
+                "dont_parse_cache": True,
+            },
+            dont_filter=True,
+        )
+
+    def _parse_link(self, response):
+        url = response.meta["link_check"]
+        if (
+            response.request.method == "HEAD"
+            and response.status in HEAD_NOT_ALLOWED_STATUSES
+        ):
+            yield self._request(url, method="GET")
+            return
+        yield from self._resolve(
+            url, {"status": response.status, "checked": time.time()}
+        )
+
+    def _link_error(self, failure):
+        self.stats.inc_value("link_check/errors")
+        yield from self._resolve(failure.request.meta["link_check"], None)
+
+    def _resolve(self, url, result):
+        host = urlsplit(url).hostname
+        self.active[host] -= 1
+        if self.queued[host]:
+            self.active[host] += 1
+            yield self._request(self.queued[host].popleft())
+
+        self.results[url] = result
+        if result is not None:
+            self.stats.inc_value("link_check/checked")
+            # Failed checks are tried again on the next run
+            if 200 <= result["status"] < 400:
+                self.cache.set("links", url, result)
+                self.cache.commit()
+        for held in self.waiting.pop(url, []):
+            held["pending"].discard(url)
+            if not held["pending"]:
+                yield self._finish(held["meeting"])
+
+    def _finish(self, meeting):
+        links = []
+        for link in meeting.get("links") or []:
+            result = self.results.get(link.get("href"))
+            if result is not None and result["status"] in DEAD_STATUSES:
+                self.stats.inc_value("link_check/dead")
+                continue
+            links.append(link)
+        meeting["links"] = links
+        return meeting
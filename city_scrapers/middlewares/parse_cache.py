@@ -0,0 +1,226 @@
+import copy
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import time
+from functools import lru_cache
+
+import city_scrapers_core
+from city_scrapers_core.constants import CANCELLED
+from city_scrapers_core.items import Meeting
+from scrapy import signals
+from scrapy.utils.project import data_path
+
+import city_scrapers
+
+# Request meta keys that Scrapy and its middlewares set, which don't affect parsing
+SCRAPY_META_KEYS = {
+    "depth",
+    "download_latency",
+    "download_slot",
+    "download_timeout",
+    "redirect_reasons",
+    "redirect_times",
+    "redirect_ttl",
+    "redirect_urls",
+    "retry_times",
+}
+
+
+@lru_cache(maxsize=None)
+def package_version(package_dir):
+    """Hash of the source of every Python module in a package directory"""
+    code_hash = hashlib.sha1()
+    for root, dirs, files in os.walk(package_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(root, name)
+            code_hash.update(os.path.relpath(path, package_dir).encode())
+            with open(path, "rb") as f:
+                code_hash.update(f.read())
+    return code_hash.hexdigest()
+
+
+def spider_version(spider_cls):
+    """Hash of the source of the city_scrapers package and of a spider's module"""
+    code_hash = hashlib.sha1(
+        package_version(os.path.dirname(city_scrapers.__file__)).encode()
+    )
+    module_file = getattr(sys.modules.get(spider_cls.__module__), "__file__", None)
+    if module_file:
+        with open(module_file, "rb") as f:
+            code_hash.update(f.read())
+    return code_hash.hexdigest()
+
+
+class ParseCacheStore:
+    """SQLite store of the meetings a spider parsed from each response body"""
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                spider TEXT NOT NULL,
+                code_version TEXT NOT NULL,
+                response_hash TEXT NOT NULL,
+                items BLOB NOT NULL,
+                used_at REAL NOT NULL,
+                PRIMARY KEY (spider, code_version, response_hash)
+            )
+            """)
+        self.conn.commit()
+
+    def get(self, spider_name, code_version, response_hash):
+        row = self.conn.execute(
+            "SELECT items FROM results "
+            "WHERE spider = ? AND code_version = ? AND response_hash = ?",
+            (spider_name, code_version, response_hash),
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute(
+            "UPDATE results SET used_at = ? "
+            "WHERE spider = ? AND code_version = ? AND response_hash = ?",
+            (time.time(), spider_name, code_version, response_hash),
+        )
+        self.conn.commit()
+        return pickle.loads(row[0])
+
+    def put(self, spider_name, code_version, response_hash, items):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+            (
+                spider_name,
+                code_version,
+                response_hash,
+                pickle.dumps(items),
+                time.time(),
+            ),
+        )
+        self.conn.commit()
+
+    def expire(self, spider_name, used_before):
+        """Remove a spider's results that haven't been used since a timestamp"""
+        self.conn.execute(
+            "DELETE FROM results WHERE spider = ? AND used_at < ?",
+            (spider_name, used_before),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class ParseCacheMiddleware:
+    """
+    Spider middleware that skips parsing responses that are identical to ones parsed
+    before, yielding the meetings stored from the previous parse instead.
+
+    Results are keyed by the spider's name, a hash of the source of the city_scrapers
+    package and the spider's module (so any code change invalidates them) and a hash of
+    the response URL, callback, request meta and body. Only the status of each meeting
+    is recomputed since it depends on the current date.
+
+    Responses whose callbacks yield requests or take cb_kwargs, or of requests with the
+    dont_parse_cache meta key, are never cached. Callbacks that read other spider state
+    or the current date should set dont_parse_cache, since their output doesn't only
+    depend on the response. Spiders with a true `dont_parse_cache` attribute are never
+    cached.
+    """
+
+    def __init__(self, path, expiration_secs, stats):
+        self.path = path
+        self.expiration_secs = expiration_secs
+        self.stats = stats
+        self.store = None
+        self.code_version = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        middleware = cls(
+            data_path(settings.get("CITY_SCRAPERS_PARSE_CACHE_PATH", "parse_cache.db")),
+            settings.getint("CITY_SCRAPERS_PARSE_CACHE_EXPIRATION_SECS", 0),
+            crawler.stats,
+        )
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.store = ParseCacheStore(self.path)
+        self.code_version = self._code_version(spider)
+        if self.expiration_secs:
+            self.store.expire(spider.name, time.time() - self.expiration_secs)
+
+    def spider_closed(self, spider):
+        hits = self.stats.get_value("parse_cache/hit", 0)
+        misses = self.stats.get_value("parse_cache/miss", 0)
+        if hits + misses:
+            self.stats.set_value("parse_cache/skip_ratio", hits / (hits + misses))
+        self.store.close()
+
+    def process_spider_output(self, response, result, spider):
+        request = response.request
+        if getattr(spider, "dont_parse_cache", False) or (
+            request is not None
+            and (request.meta.get("dont_parse_cache") or request.cb_kwargs)
+        ):
+            yield from result
+            return
+        response_hash = self._response_hash(response)
+        items = self.store.get(spider.name, self.code_version, response_hash)
+        if items is not None:
+            # Callbacks are generators, so not iterating result skips parsing entirely
+            self.stats.inc_value("parse_cache/hit")
+            for item in items:
+                yield self._refresh_status(item, spider)
+            return
+
+        self.stats.inc_value("parse_cache/miss")
+        items = []
+        cacheable = True
+        for output in result:
+            if isinstance(output, Meeting):
+                items.append(copy.deepcopy(output))
+            else:
+                cacheable = False
+            yield output
+        if cacheable:
+            self.store.put(spider.name, self.code_version, response_hash, items)
+        else:
+            self.stats.inc_value("parse_cache/uncacheable")
+
+    def _refresh_status(self, item, spider):
+        if item.get("status") != CANCELLED:
+            item["status"] = spider._get_status(item)
+        return item
+
+    def _code_version(self, spider):
+        """
+        Hash of the city_scrapers package source, the spider's module source and the
+        city_scrapers_core version
+        """
+        code_hash = hashlib.sha1(city_scrapers_core.__version__.encode())
+        code_hash.update(spider_version(type(spider)).encode())
+        return code_hash.hexdigest()
+
+    def _response_hash(self, response):
+        callback = response.request.callback if response.request else None
+        response_hash = hashlib.sha1(response.url.encode())
+        response_hash.update(getattr(callback, "__name__", "parse").encode())
+        if response.request is not None:
+            meta = {
+                key: value
+                for key, value in response.request.meta.items()
+                if key not in SCRAPY_META_KEYS and not key.startswith("_")
+            }
+            response_hash.update(repr(sorted(meta.items())).encode())
+        response_hash.update(response.body)
+        return response_hash.hexdigest()
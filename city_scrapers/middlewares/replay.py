@@ -0,0 +1,94 @@
+from urllib.parse import urlsplit
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.project import data_path
+
+from ..replay import RecordingStore
+
+
+class RecorderMiddleware:
+    """
+    Downloader middleware that saves every request and response exchange of a crawl to
+    CITY_SCRAPERS_RECORDING_PATH when CITY_SCRAPERS_RECORD is enabled, so the crawl can
+    be replayed later with `scrapy replayserver` and the replay settings.
+
+    It should be the closest middleware to the downloader so that responses are saved
+    before redirects, decompression and retries are handled.
+    """
+
+    def __init__(self, path, stats):
+        self.path = path
+        self.stats = stats
+        self.store = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("CITY_SCRAPERS_RECORD"):
+            raise NotConfigured
+        middleware = cls(
+            data_path(settings.get("CITY_SCRAPERS_RECORDING_PATH", "recordings.db")),
+            crawler.stats,
+        )
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.store = RecordingStore(self.path)
+
+    def spider_closed(self, spider):
+        self.store.close()
+
+    def process_response(self, request, response, spider):
+        self.store.add(
+            spider.name,
+            request.method,
+            request.url,
+            request.body,
+            response.status,
+            {
+                name.decode("latin-1"): [value.decode("latin-1") for value in values]
+                for name, values in response.headers.items()
+            },
+            response.body,
+        )
+        self.stats.inc_value("replay/recorded")
+        return response
+
+
+class ReplayMiddleware:
+    """
+    Downloader middleware that sends every request to the replay server at
+    CITY_SCRAPERS_REPLAY_URL instead of the original site, with the original URL as the
+    path, and restores the original URL on the response.
+
+    Requests keep the download slot of their original domain, so concurrency and
+    throttling settings apply to the replayed crawl the same way as to a live one.
+    """
+
+    def __init__(self, replay_url):
+        self.replay_url = replay_url.rstrip("/") + "/"
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        replay_url = crawler.settings.get("CITY_SCRAPERS_REPLAY_URL")
+        if not replay_url:
+            raise NotConfigured
+        return cls(replay_url)
+
+    def process_request(self, request, spider):
+        if request.url.startswith(self.replay_url):
+            return None
+        request.meta["replay_original_url"] = request.url
+        request.meta.setdefault("download_slot", urlsplit(request.url).hostname)
+        # The replacement goes through the scheduler again, and the original request
+        # already passed the duplicate filter
+        return request.replace(url=self.replay_url + request.url, dont_filter=True)
+
+    def process_response(self, request, response, spider):
+        original_url = request.meta.get("replay_original_url")
+        if original_url is None or not request.url.startswith(self.replay_url):
+            return response
+        return response.replace(url=original_url)
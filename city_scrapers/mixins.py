@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+from scrapy.utils.project import data_path
+
+from .cache import SpiderCache
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+class SpiderCacheMixin:
+    """
+    Mixin for spiders that keep values between runs. Opens a SpiderCache at
+    CITY_SCRAPERS_SPIDER_CACHE_PATH as `cache` when crawling, which is None otherwise.
+    """
+
+    cache = None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.cache = SpiderCache(
+            data_path(
+                crawler.settings.get(
+                    "CITY_SCRAPERS_SPIDER_CACHE_PATH", "spider_cache.db"
+                )
+            ),
+            spider.name,
+        )
+        return spider
+
+    def closed(self, reason):
+        if self.cache is not None:
+            self.cache.close()
+
+
+class StartRequestsMixin:
+    """
+    Mixin for spiders with a `start_requests` method, which Scrapy 2.13 and later only
+    run through `start`
+    """
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+
+class DateWindowMixin(StartRequestsMixin, SpiderCacheMixin):
+    """
+    Mixin for spiders of APIs that can be queried by date, so runs only request meetings
+    from `window_days` before the last finished run through `horizon_days` from today.
+
+    The first run, and runs with `-a full_backfill=true` or
+    `-s CITY_SCRAPERS_FULL_BACKFILL=1`, request everything since `history_start`.
+    """
+
+    # Earliest date to request on a full backfill
+    history_start = None
+    # Days before the last finished run to request again, for meetings that changed
+    window_days = 60
+    # Days after today to request
+    horizon_days = 3650
+
+    def __init__(self, *args, full_backfill=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Spider arguments are strings when passed on the command line
+        self.full_backfill = str(full_backfill).lower() in TRUE_VALUES
+        self._date_window = None
+        self._window_run_date = None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if crawler.settings.getbool("CITY_SCRAPERS_FULL_BACKFILL"):
+            spider.full_backfill = True
+        return spider
+
+    def date_window(self):
+        """Return the start and end dates to request in this run"""
+        if self._date_window is None:
+            self._window_run_date = datetime.now().date()
+            start = self.history_start
+            cursor = None
+            if self.cache is not None and not self.full_backfill:
+                cursor = self.cache.get("cursor", "date_window")
+            if cursor is not None:
+                start = max(
+                    start,
+                    datetime.strptime(cursor, "%Y-%m-%d").date()
+                    - timedelta(days=self.window_days),
+                )
+            self._date_window = (
+                start,
+                self._window_run_date + timedelta(days=self.horizon_days),
+            )
+            self.logger.info("Requesting meetings from %s to %s", *self._date_window)
+        return self._date_window
+
+    def closed(self, reason):
+        # Only move the cursor when every request in the window was made
+        if (
+            reason == "finished"
+            and self.cache is not None
+            and self._date_window is not None
+        ):
+            self.cache.set(
+                "cursor", "date_window", self._window_run_date.strftime("%Y-%m-%d")
+            )
+        super().closed(reason)
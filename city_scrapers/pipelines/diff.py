@@ -0,0 +1,251 @@
+import io
+import json
+import os
+import shutil
+import sqlite3
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+from city_scrapers_core.pipelines import DiffPipeline
+from scrapy import signals
+from scrapy.utils.project import data_path
+
+from ..exporters import iter_feed_lines
+
+
+class MeetingStore:
+    """SQLite store of the latest OCD output for every meeting a spider has scraped,
+    indexed by meeting ID and by start time so diffs only query the rows they need.
+    """
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meetings (
+                spider TEXT NOT NULL,
+                id TEXT NOT NULL,
+                uid TEXT NOT NULL,
+                start_time TEXT NOT NULL,
+                item TEXT NOT NULL,
+                PRIMARY KEY (spider, id)
+            );
+            CREATE INDEX IF NOT EXISTS meetings_start
+                ON meetings (spider, start_time);
+            """)
+
+    def is_empty(self, spider_name):
+        row = self.conn.execute(
+            "SELECT 1 FROM meetings WHERE spider = ? LIMIT 1", (spider_name,)
+        ).fetchone()
+        return row is None
+
+    def get_uid(self, spider_name, meeting_id):
+        row = self.conn.execute(
+            "SELECT uid FROM meetings WHERE spider = ? AND id = ?",
+            (spider_name, meeting_id),
+        ).fetchone()
+        return row[0] if row else None
+
+    def upcoming(self, spider_name, since):
+        """Stored items for a spider starting at or after an ISO datetime string"""
+        return [
+            json.loads(row[0])
+            for row in self.conn.execute(
+                "SELECT item FROM meetings WHERE spider = ? AND start_time >= ? "
+                "ORDER BY start_time",
+                (spider_name, since[:19]),
+            )
+        ]
+
+    def upsert(self, spider_name, item):
+        """Save an OCD-formatted item, replacing any earlier output for the meeting"""
+        extras_dict = item.get("extras") or item.get("extra") or {}
+        meeting_id = extras_dict.get("cityscrapers/id") or extras_dict.get(
+            "cityscrapers.org/id"
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meetings VALUES (?, ?, ?, ?, ?)",
+            (
+                spider_name,
+                meeting_id,
+                item["_id"],
+                item["start_time"][:19],
+                json.dumps(item),
+            ),
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class FileStoreSync:
+    """Copies a meeting store to and from a local path, and reads feeds below one.
+    Stands in for object storage in tests and can be used for local runs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def download(self, local_path):
+        if os.path.exists(self.path):
+            shutil.copyfile(self.path, local_path)
+
+    def load_feed(self, spider_name, days):
+        """Return the lines of the latest feed of a spider anywhere below the path"""
+        paths = []
+        for dir_path, _, file_names in os.walk(self.path):
+            if spider_name + ".json" in file_names:
+                paths.append(os.path.join(dir_path, spider_name + ".json"))
+        if not paths:
+            return []
+        # Paths are zero-padded dates and times, so the latest sorts last
+        with open(max(paths), "rb") as f:
+            return list(iter_feed_lines(f))
+
+    def upload(self, local_path):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        shutil.copyfile(local_path, self.path)
+
+
+class S3StoreSync:
+    """Copies a meeting store to and from an S3 object, and reads feeds in its bucket"""
+
+    def __init__(self, uri, settings):
+        import boto3
+
+        parsed = urlparse(uri)
+        self.bucket = parsed.netloc
+        self.key = parsed.path.lstrip("/")
+        self.client = boto3.client(
+            "s3",
+            aws_access_key_id=settings.get("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=settings.get("AWS_SECRET_ACCESS_KEY"),
+        )
+
+    def download(self, local_path):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.download_file(self.bucket, self.key, local_path)
+        except ClientError:
+            # No store has been uploaded for this spider yet
+            pass
+
+    def upload(self, local_path):
+        self.client.upload_file(local_path, self.bucket, self.key)
+
+    def load_feed(self, spider_name, days):
+        """
+        Return the lines of a spider's latest feed in the bucket, looking under the
+        prefix of each day in turn like S3DiffPipeline
+        """
+        for day in days:
+            response = self.client.list_objects(
+                Bucket=self.bucket, Prefix=day, MaxKeys=1000
+            )
+            keys = [
+                obj["Key"]
+                for obj in response.get("Contents", [])
+                if obj["Key"].endswith("/{}.json".format(spider_name))
+            ]
+            if keys:
+                body = self.client.get_object(Bucket=self.bucket, Key=max(keys))
+                return list(iter_feed_lines(io.BytesIO(body["Body"].read())))
+        return []
+
+
+def get_store_sync(uri, settings):
+    """Return the sync backend for a CITY_SCRAPERS_MEETING_STORE_URI value"""
+    parsed = urlparse(uri)
+    if parsed.scheme == "s3":
+        return S3StoreSync(uri, settings)
+    if parsed.scheme == "file":
+        return FileStoreSync(parsed.path)
+    return FileStoreSync(uri)
+
+
+class LocalDiffPipeline(DiffPipeline):
+    """Drop-in replacement for :class:`S3DiffPipeline` that compares results against a
+    local :class:`MeetingStore` instead of downloading and scanning the previous feed.
+
+    Previous IDs are looked up per item and only upcoming meetings are loaded to be
+    marked as cancelled if they're missing. Each spider's store is a separate SQLite
+    file so spiders running at the same time don't share one. It's downloaded from
+    CITY_SCRAPERS_MEETING_STORE_URI before every crawl, replacing any local copy, and
+    uploaded back when the spider closes.
+
+    A spider without a store yet is seeded from its latest published feed at FEED_URI,
+    so meetings keep the IDs they were published with.
+    """
+
+    def __init__(self, crawler, output_format):
+        settings = crawler.settings
+        self.spider = crawler.spider
+        params = {"name": self.spider.name}
+        self.store_path = data_path(
+            settings.get("CITY_SCRAPERS_MEETING_STORE_PATH", "meetings/%(name)s.db")
+            % params,
+        )
+        store_uri = settings.get("CITY_SCRAPERS_MEETING_STORE_URI")
+        self.sync = get_store_sync(store_uri % params, settings) if store_uri else None
+        if self.sync:
+            # A local copy restored from an earlier run can be older than the remote
+            if os.path.dirname(self.store_path):
+                os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            self.sync.download(self.store_path)
+        self.store = MeetingStore(self.store_path)
+        if self.store.is_empty(self.spider.name):
+            self.seed_from_feed(settings)
+        crawler.signals.connect(self.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+        super().__init__(crawler, output_format)
+
+    def seed_from_feed(self, settings):
+        """Import the meetings of the spider's latest feed into its empty store"""
+        feed_uri = settings.get("FEED_URI")
+        if not feed_uri:
+            return
+        # Feeds are looked for below the part of FEED_URI before its first parameter
+        feed_root = os.path.dirname(feed_uri.split("%(")[0])
+        root_prefix = urlparse(feed_root).path.lstrip("/")
+        feed_prefix = settings.get("CITY_SCRAPERS_DIFF_FEED_PREFIX", "%Y/%m/%d")
+        days = [
+            os.path.join(
+                root_prefix,
+                (datetime.now() - timedelta(days=idx)).strftime(feed_prefix),
+            )
+            for idx in range(4)
+        ]
+        feed_lines = get_store_sync(feed_root, settings).load_feed(
+            self.spider.name, days
+        )
+        for line in feed_lines:
+            self.store.upsert(self.spider.name, json.loads(line))
+        self.store.commit()
+
+    def load_previous_results(self):
+        return self.store.upcoming(self.spider.name, datetime.now().isoformat())
+
+    def process_item(self, item, spider):
+        if "_id" not in item and item["id"] not in spider._previous_map:
+            uid = self.store.get_uid(spider.name, item["id"])
+            if uid:
+                spider._previous_map[item["id"]] = uid
+        return super().process_item(item, spider)
+
+    def item_scraped(self, item, spider):
+        """Save the final output of each item so the next run can compare against it"""
+        if isinstance(item, dict) and "_id" in item:
+            self.store.upsert(spider.name, item)
+
+    def spider_closed(self, spider):
+        self.store.commit()
+        self.store.close()
+        if self.sync:
+            self.sync.upload(self.store_path)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, urlunsplit
+
+from w3lib.url import canonicalize_url
+
+# Headers that are set again for the replayed body rather than copied
+SKIPPED_HEADERS = {"connection", "content-length", "transfer-encoding"}
+
+
+def url_path(url):
+    """Return a URL without its query string or fragment"""
+    scheme, netloc, path, _, _ = urlsplit(url)
+    return urlunsplit((scheme, netloc, path, "", ""))
+
+
+def body_hash(body):
+    return hashlib.sha1(body or b"").hexdigest()
+
+
+class RecordingStore:
+    """
+    SQLite store of request and response exchanges recorded during crawls, in the
+    order they were received
+    """
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS exchanges (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                spider TEXT NOT NULL,
+                method TEXT NOT NULL,
+                url TEXT NOT NULL,
+                path TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                recorded_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS exchanges_url
+                ON exchanges (method, url, body_hash);
+            CREATE INDEX IF NOT EXISTS exchanges_path ON exchanges (method, path);
+            """)
+        self.conn.commit()
+
+    def add(self, spider_name, method, url, request_body, status, headers, body):
+        """Record a response, with headers as a dict of names to lists of values"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO exchanges (spider, method, url, path, body_hash, status, "
+                "headers, body, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    spider_name,
+                    method,
+                    canonicalize_url(url),
+                    url_path(url),
+                    body_hash(request_body),
+                    status,
+                    json.dumps(headers),
+                    body,
+                    time.time(),
+                ),
+            )
+            self.conn.commit()
+
+    def find(self, method, url, request_body):
+        """
+        Return recorded responses for a request in the order they were recorded. If
+        there's no exact match, return responses for the same path with any query
+        string, since some spiders build query strings from the current date.
+        """
+        columns = "SELECT status, headers, body FROM exchanges "
+        with self.lock:
+            rows = self.conn.execute(
+                columns + "WHERE method = ? AND url = ? AND body_hash = ? ORDER BY id",
+                (method, canonicalize_url(url), body_hash(request_body)),
+            ).fetchall()
+            if not rows:
+                rows = self.conn.execute(
+                    columns + "WHERE method = ? AND path = ? ORDER BY id",
+                    (method, url_path(url)),
+                ).fetchall()
+        return [
+            {"status": status, "headers": json.loads(headers), "body": bytes(body)}
+            for status, headers, body in rows
+        ]
+
+    def close(self):
+        self.conn.close()
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """
+    Serves recorded responses for requests with the original URL as the path, like
+    http://127.0.0.1:8800/https://pittsburghpa.gov/dcp/notices
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.replay()
+
+    do_POST = do_GET
+    do_HEAD = do_GET
+    do_PUT = do_GET
+    do_DELETE = do_GET
+
+    def replay(self):
+        url = self.path[1:]
+        request_body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        response = self.server.next_response(self.command, url, request_body)
+        if response is None:
+            self.send_error(
+                404, "No recorded response for {} {}".format(self.command, url)
+            )
+            return
+        self.send_response(response["status"])
+        for name, values in response["headers"].items():
+            if name.lower() in SKIPPED_HEADERS:
+                continue
+            for value in values:
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response["body"])))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(response["body"])
+
+    def log_message(self, *args):
+        pass
+
+
+class ReplayServer(ThreadingMixIn, HTTPServer):
+    """
+    HTTP server replaying a RecordingStore. Repeated requests for the same URL get each
+    recorded response in turn, and then the last one again. Each response can be
+    delayed by `latency` seconds to stand in for a remote site.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, store, latency=0):
+        super().__init__(address, ReplayHandler)
+        self.store = store
+        self.latency = latency
+        self.counts = {}
+        self.counts_lock = threading.Lock()
+
+    def next_response(self, method, url, request_body):
+        responses = self.store.find(method, url, request_body)
+        if not responses:
+            return None
+        if self.latency:
+            time.sleep(self.latency)
+        key = (method, canonicalize_url(url), body_hash(request_body))
+        with self.counts_lock:
+            count = self.counts.get(key, 0)
+            self.counts[key] = count + 1
+        return responses[min(count, len(responses) - 1)]
@@ -0,0 +1,351 @@
+"""Run many spiders inside a single process and Twisted reactor.
+
+Starting a separate ``scrapy crawl`` for every spider re-imports Scrapy, Twisted and
+all of the parsing libraries each time and runs the crawls one after another. The
+helpers here schedule every spider on one :class:`scrapy.crawler.CrawlerProcess`,
+keeping at most ``concurrency`` of them running at once, and record how each crawl
+went so the nightly build can report it.
+
+Parsing still only uses one core in a single reactor, so :func:`run_sharded` can also
+split the spiders across several ``scrapy crawlall`` worker processes. Shards are
+balanced with each spider's crawl duration from earlier runs, and the workers'
+summaries and feeds are merged back into one report.
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+FAILED = "failed"
+
+
+class SpiderRun:
+    """Exit status and timing of one spider's crawl"""
+
+    def __init__(self, name):
+        self.name = name
+        self.status = None
+        self.finish_reason = None
+        self.item_count = 0
+        self.error_count = 0
+        self.started = None
+        self.elapsed = None
+        self.error = None
+        self.stats = {}
+
+    def start(self):
+        self.started = time.time()
+
+    def finish(self, stats, failure=None):
+        """Record the result of a crawl from its final stats and an optional failure"""
+        if self.started is not None:
+            self.elapsed = time.time() - self.started
+        self.stats = stats or {}
+        self.finish_reason = self.stats.get("finish_reason")
+        self.item_count = self.stats.get("item_scraped_count", 0)
+        self.error_count = self.stats.get("log_count/ERROR", 0)
+        if failure is not None:
+            self.error = failure.getErrorMessage()
+        if self.error or self.error_count or self.finish_reason != "finished":
+            self.status = FAILED
+        else:
+            self.status = OK
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "status": self.status,
+            "finish_reason": self.finish_reason,
+            "item_count": self.item_count,
+            "error_count": self.error_count,
+            "started": self.started,
+            "elapsed": self.elapsed,
+            "error": self.error,
+            "stats": self.stats,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        run = cls(data["name"])
+        for key, value in data.items():
+            setattr(run, key, value)
+        return run
+
+
+def _crawl(process, run):
+    """Start a single spider on the process, returning a Deferred that never errbacks"""
+    run.start()
+    try:
+        crawler = process.create_crawler(run.name)
+    except Exception:
+        run.finish({}, Failure())
+        logger.error("Could not create crawler for %s: %s", run.name, run.error)
+        return defer.succeed(run)
+
+    def _finished(result):
+        failure = result if isinstance(result, Failure) else None
+        run.finish(crawler.stats.get_stats(), failure)
+        if failure is not None:
+            logger.error("Spider %s failed: %s", run.name, run.error)
+        return run
+
+    return _as_deferred(process.crawl(crawler)).addBoth(_finished)
+
+
+def _as_deferred(result):
+    """Newer Scrapy versions return an asyncio task from ``crawl`` instead of a Deferred"""
+    if isinstance(result, defer.Deferred):
+        return result
+    return defer.Deferred.fromFuture(result)
+
+
+def crawl_all(process, spider_names, concurrency):
+    """Schedule spiders on a crawler process with at most ``concurrency`` running at once
+
+    :param process: :class:`scrapy.crawler.CrawlerRunner` or ``CrawlerProcess``
+    :param spider_names: Names of the spiders to run
+    :param concurrency: Maximum number of spiders crawling at the same time
+    :return: Deferred firing with a list of :class:`SpiderRun` in ``spider_names`` order
+    """
+    semaphore = defer.DeferredSemaphore(max(concurrency, 1))
+    runs = [SpiderRun(name) for name in spider_names]
+    crawls = [semaphore.run(_crawl, process, run) for run in runs]
+    return defer.DeferredList(crawls).addCallback(lambda _: runs)
+
+
+def run_all(process, spider_names, concurrency):
+    """Run spiders on a ``CrawlerProcess`` and block until all of them have finished"""
+    from twisted.internet import reactor
+
+    runs = []
+
+    def _start():
+        d = crawl_all(process, spider_names, concurrency)
+        d.addCallback(runs.extend)
+        d.addBoth(lambda _: reactor.stop())
+
+    reactor.callWhenRunning(_start)
+    process.start(stop_after_crawl=False)
+    return runs
+
+
+def format_summary(runs):
+    """Plain text table of the status and timing of each spider, slowest first"""
+    lines = [
+        "{:<40} {:<7} {:>9} {:>7} {:>7}".format(
+            "spider", "status", "seconds", "items", "errors"
+        )
+    ]
+    for run in sorted(runs, key=lambda r: -(r.elapsed or 0)):
+        lines.append(
+            "{:<40} {:<7} {:>9.1f} {:>7} {:>7}".format(
+                run.name,
+                run.status or "",
+                run.elapsed or 0,
+                run.item_count,
+                run.error_count,
+            )
+        )
+    failed = [run.name for run in runs if run.status != OK]
+    lines.append("{} spiders, {} failed".format(len(runs), len(failed)))
+    return "\n".join(lines)
+
+
+def write_summary(runs, path, elapsed=None, shards=None):
+    """Write a machine-readable JSON summary of a multi-spider run"""
+    summary = {"elapsed": elapsed, "spiders": [run.as_dict() for run in runs]}
+    if shards is not None:
+        summary["shards"] = shards
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2, default=str)
+
+
+def read_summary(path):
+    """Load the :class:`SpiderRun` list from a summary written by :func:`write_summary`"""
+    with open(path) as f:
+        return [SpiderRun.from_dict(data) for data in json.load(f)["spiders"]]
+
+
+def load_history(path):
+    """Load the recent crawl durations in seconds of each spider, keyed by name"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def update_history(history, runs, keep=5):
+    """Add the durations of successful runs to the history, keeping the latest few"""
+    for run in runs:
+        if run.status == OK and run.elapsed is not None:
+            history[run.name] = (history.get(run.name, []) + [run.elapsed])[-keep:]
+    return history
+
+
+def save_history(history, path):
+    with open(path, "w") as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+
+
+def expected_duration(history, name, default=None):
+    """Average recent crawl duration of a spider, or ``default`` if it has none"""
+    durations = history.get(name)
+    if not durations:
+        return default
+    return sum(durations) / len(durations)
+
+
+def shard_spiders(spider_names, history, shards, heavy=()):
+    """Split spiders into shards with similar total expected crawl durations
+
+    Spiders are placed longest first onto the shard with the smallest total so far. The
+    spiders listed in ``heavy`` are placed before all others and never share a shard.
+    Spiders with no history are assumed to take the average duration of the ones that
+    have it.
+
+    :param spider_names: Names of the spiders to run
+    :param history: Recent crawl durations keyed by spider name
+    :param shards: Number of shards to create
+    :param heavy: Names of spiders that should each get a separate shard
+    :return: List of non-empty lists of spider names
+    :raises ValueError: If more heavy spiders are run than there are shards
+    """
+    heavy_names = [name for name in spider_names if name in heavy]
+    if len(heavy_names) > max(shards, 1):
+        raise ValueError(
+            "{} heavy spiders can't each get a separate shard out of {}".format(
+                len(heavy_names), shards
+            )
+        )
+    known = [
+        expected_duration(history, name) for name in spider_names if history.get(name)
+    ]
+    default = sum(known) / len(known) if known else 1.0
+    durations = {
+        name: expected_duration(history, name, default) for name in spider_names
+    }
+    shard_names = [[] for _ in range(max(shards, 1))]
+    shard_totals = [0.0 for _ in shard_names]
+    shard_heavy = [False for _ in shard_names]
+
+    for name in sorted(
+        spider_names, key=lambda name: (name not in heavy, -durations[name], name)
+    ):
+        candidates = range(len(shard_names))
+        if name in heavy:
+            candidates = [i for i in candidates if not shard_heavy[i]]
+        idx = min(candidates, key=lambda i: shard_totals[i])
+        shard_heavy[idx] = shard_heavy[idx] or name in heavy
+        shard_names[idx].append(name)
+        shard_totals[idx] += durations[name]
+    return [names for names in shard_names if names]
+
+
+def _cmdline_settings(settings, exclude=()):
+    """Settings passed on the command line with ``-s``, to forward to workers"""
+    from scrapy.settings import SETTINGS_PRIORITIES
+
+    args = []
+    for name in settings:
+        if name in exclude:
+            continue
+        if settings.getpriority(name) == SETTINGS_PRIORITIES["cmdline"]:
+            args.extend(["-s", "{}={}".format(name, settings[name])])
+    return args
+
+
+def run_sharded(shards, settings, concurrency, output=None):
+    """Run each shard of spiders in a separate ``scrapy crawlall`` process
+
+    :param shards: Lists of spider names from :func:`shard_spiders`
+    :param settings: Settings of the parent command, ``-s`` values are forwarded
+    :param concurrency: Number of spiders each worker runs at once
+    :param output: Optional path of a jsonlines file combining every spider's items
+    :return: Tuple of the :class:`SpiderRun` list and a report for each shard
+    """
+    worker_settings = [
+        "CITY_SCRAPERS_CRAWLALL_SHARDS",
+        "CITY_SCRAPERS_CRAWLALL_CONCURRENCY",
+        "CITY_SCRAPERS_CRAWLALL_SUMMARY",
+        "CITY_SCRAPERS_CRAWLALL_HISTORY",
+        "CITY_SCRAPERS_CRAWLALL_OUTPUT",
+    ]
+    forwarded = _cmdline_settings(settings, exclude=worker_settings + ["FEEDS"])
+    work_dir = tempfile.mkdtemp(prefix="crawlall-")
+    workers = []
+    try:
+        for idx, spider_names in enumerate(shards):
+            summary_path = os.path.join(work_dir, "shard-{}.json".format(idx))
+            args = [sys.executable, "-m", "scrapy", "crawlall"] + spider_names
+            args += [
+                "-s",
+                "CITY_SCRAPERS_CRAWLALL_SHARDS=1",
+                "-s",
+                "CITY_SCRAPERS_CRAWLALL_CONCURRENCY={}".format(concurrency),
+                "-s",
+                "CITY_SCRAPERS_CRAWLALL_SUMMARY={}".format(summary_path),
+                "-s",
+                "CITY_SCRAPERS_CRAWLALL_HISTORY=",
+            ]
+            if output:
+                # Added alongside FEED_URI and the configured FEEDS so the regular feed
+                # storage still happens
+                feed_path = os.path.join(work_dir, "%(name)s.jsonl")
+                feeds = dict(settings.getdict("FEEDS"))
+                feeds[feed_path] = {"format": "jsonlines"}
+                args += ["-s", "FEEDS={}".format(json.dumps(feeds))]
+            args += forwarded
+            workers.append(
+                (spider_names, summary_path, time.time(), subprocess.Popen(args))
+            )
+
+        runs = []
+        shard_reports = []
+        for spider_names, summary_path, started, worker in workers:
+            returncode = worker.wait()
+            shard_reports.append(
+                {
+                    "spiders": spider_names,
+                    "elapsed": time.time() - started,
+                    "returncode": returncode,
+                }
+            )
+            if os.path.exists(summary_path):
+                runs.extend(read_summary(summary_path))
+                continue
+            for name in spider_names:
+                run = SpiderRun(name)
+                run.status = FAILED
+                run.error = "Worker exited with code {}".format(returncode)
+                runs.append(run)
+
+        if output:
+            merge_feeds(
+                [os.path.join(work_dir, "{}.jsonl".format(run.name)) for run in runs],
+                output,
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return runs, shard_reports
+
+
+def merge_feeds(paths, output):
+    """Concatenate jsonlines feeds into one file, skipping any that weren't written"""
+    with open(output, "wb") as out_file:
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as feed_file:
+                shutil.copyfileobj(feed_file, out_file)
@@ -0,0 +1,69 @@
+"""
+Flask app serving ranked, paginated search results from a meeting SearchIndex.
+
+    CITY_SCRAPERS_SEARCH_INDEX_PATH=search.db FLASK_APP=city_scrapers.search.app \
+        flask run
+
+GET /search?q=zoning&start=2019-01-01&end=2021-01-01&spider=pitt_city_planning&page=2
+"""
+
+import hashlib
+import os
+
+from flask import Flask, abort, g, jsonify, request
+
+from .index import SearchIndex
+
+MAX_PER_PAGE = 100
+
+
+def create_app(index_path=None):
+    app = Flask(__name__)
+    app.config["INDEX_PATH"] = index_path or os.getenv(
+        "CITY_SCRAPERS_SEARCH_INDEX_PATH", "search.db"
+    )
+
+    def get_index():
+        if "search_index" not in g:
+            g.search_index = SearchIndex(app.config["INDEX_PATH"])
+        return g.search_index
+
+    @app.teardown_appcontext
+    def close_index(exception):
+        search_index = g.pop("search_index", None)
+        if search_index is not None:
+            search_index.close()
+
+    @app.route("/search")
+    def search():
+        try:
+            page = max(int(request.args.get("page", 1)), 1)
+            per_page = min(int(request.args.get("per_page", 20)), MAX_PER_PAGE)
+        except ValueError:
+            abort(400)
+        search_index = get_index()
+        # Results only change when the index does, so the ETag can be checked before
+        # running the query
+        etag = hashlib.sha1(
+            "{}:{}".format(
+                search_index.version, request.query_string.decode("utf-8")
+            ).encode()
+        ).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = jsonify(
+                search_index.search(
+                    request.args.get("q", ""),
+                    start=request.args.get("start"),
+                    end=request.args.get("end"),
+                    spiders=request.args.getlist("spider"),
+                    page=page,
+                    per_page=per_page,
+                )
+            )
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    return app
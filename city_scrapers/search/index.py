@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+
+from ..exporters import iter_feed_lines
+
+# Relative weights of the indexed columns when ranking results with bm25
+COLUMN_WEIGHTS = (10.0, 1.0, 2.0, 1.0, 4.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    spider TEXT NOT NULL,
+    agency TEXT,
+    title TEXT,
+    description TEXT,
+    location TEXT,
+    links TEXT,
+    start TEXT NOT NULL,
+    status TEXT,
+    source TEXT,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS meetings_start ON meetings (start);
+CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5(
+    title,
+    description,
+    location,
+    links,
+    agency,
+    content='meetings',
+    content_rowid='rowid',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS meetings_insert AFTER INSERT ON meetings BEGIN
+    INSERT INTO meetings_fts (rowid, title, description, location, links, agency)
+    VALUES (new.rowid, new.title, new.description, new.location, new.links,
+            new.agency);
+END;
+CREATE TRIGGER IF NOT EXISTS meetings_delete AFTER DELETE ON meetings BEGIN
+    INSERT INTO meetings_fts (
+        meetings_fts, rowid, title, description, location, links, agency
+    )
+    VALUES ('delete', old.rowid, old.title, old.description, old.location,
+            old.links, old.agency);
+END;
+CREATE TABLE IF NOT EXISTS indexed_feeds (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+RESULT_COLUMNS = [
+    "id",
+    "spider",
+    "agency",
+    "title",
+    "description",
+    "location",
+    "links",
+    "start",
+    "status",
+    "source",
+]
+
+
+def meeting_fields(item, spider_name):
+    """Searchable fields of an OCD or Meeting feed item, keyed by the meeting ID"""
+    extras = item.get("extras") or item.get("extra") or {}
+    location = item.get("location") or {}
+    links = item.get("links") or []
+    sources = item.get("sources") or [{"url": item.get("source")}]
+    return {
+        "id": extras.get("cityscrapers/id") or item["id"],
+        "spider": spider_name,
+        "agency": extras.get("cityscrapers/agency") or item.get("agency"),
+        "title": item.get("name") or item.get("title"),
+        "description": item.get("description"),
+        "location": " ".join(
+            filter(None, [location.get("name"), location.get("address")])
+        ),
+        "links": " ".join(
+            filter(None, [link.get("note") or link.get("title") for link in links])
+        ),
+        "start": (item.get("start_time") or item.get("start"))[:19],
+        "status": item.get("status"),
+        "source": sources[0].get("url"),
+    }
+
+
+def match_query(text):
+    """
+    Convert free text into an FTS5 query matching every word, so punctuation in a
+    search can't be read as query syntax. Words ending in * match as prefixes.
+    """
+    return " ".join(
+        '"{}"{}'.format(word, prefix)
+        for word, prefix in re.findall(r"(\w+)(\*?)", text)
+    )
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 index of meetings from spider feeds. Meetings are keyed by the ID from
+    `_get_id`, so indexing newer feeds replaces earlier versions of the same meeting.
+    """
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+
+    @property
+    def version(self):
+        """Counter incremented whenever indexed meetings change, used for ETags"""
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'version'"
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def add(self, fields):
+        """Add or replace a meeting, returning True if it changed"""
+        content_hash = hashlib.sha1(
+            json.dumps(fields, sort_keys=True).encode()
+        ).hexdigest()
+        row = self.conn.execute(
+            "SELECT content_hash FROM meetings WHERE id = ?", (fields["id"],)
+        ).fetchone()
+        if row and row[0] == content_hash:
+            return False
+        if row:
+            self.conn.execute("DELETE FROM meetings WHERE id = ?", (fields["id"],))
+        self.conn.execute(
+            "INSERT INTO meetings ({}, content_hash) VALUES ({}?)".format(
+                ", ".join(RESULT_COLUMNS), "?, " * len(RESULT_COLUMNS)
+            ),
+            [fields[column] for column in RESULT_COLUMNS] + [content_hash],
+        )
+        return True
+
+    def add_feed(self, path, spider_name):
+        """Index every meeting in a possibly compressed jsonlines feed"""
+        changed = 0
+        with open(path, "rb") as f:
+            for line in iter_feed_lines(f):
+                changed += self.add(meeting_fields(json.loads(line), spider_name))
+        return changed
+
+    def update(self, feed_paths):
+        """
+        Index feeds that are new or modified since they were last indexed, oldest path
+        first so the latest version of each meeting is kept. Takes a dict of spider
+        names to feed paths and returns the number of meetings that changed.
+        """
+        changed = 0
+        feeds = sorted(
+            (path, spider_name)
+            for spider_name, paths in feed_paths.items()
+            for path in paths
+        )
+        for path, spider_name in feeds:
+            mtime = os.path.getmtime(path)
+            row = self.conn.execute(
+                "SELECT mtime FROM indexed_feeds WHERE path = ?", (path,)
+            ).fetchone()
+            if row and row[0] == mtime:
+                continue
+            changed += self.add_feed(path, spider_name)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO indexed_feeds VALUES (?, ?)", (path, mtime)
+            )
+        if changed:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                (str(self.version + 1),),
+            )
+        self.conn.commit()
+        return changed
+
+    def search(self, text, start=None, end=None, spiders=None, page=1, per_page=20):
+        """
+        Return a page of meetings matching every word in text, best matches first,
+        optionally only starting in [start, end) (ISO strings) or from some spiders
+        """
+        query = match_query(text)
+        if not query:
+            return {"total": 0, "page": page, "per_page": per_page, "results": []}
+        columns = ", ".join("m." + column for column in RESULT_COLUMNS)
+        offset = (page - 1) * per_page
+        where = []
+        params = [query]
+        if start:
+            where.append("m.start >= ?")
+            params.append(start)
+        if end:
+            where.append("m.start < ?")
+            params.append(end)
+        if spiders:
+            where.append("m.spider IN ({})".format(", ".join("?" * len(spiders))))
+            params.extend(spiders)
+
+        weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+        if where:
+            from_where = (
+                "FROM meetings_fts JOIN meetings m ON m.rowid = meetings_fts.rowid "
+                "WHERE meetings_fts MATCH ? AND " + " AND ".join(where)
+            )
+            total_sql = "SELECT COUNT(*) " + from_where
+            rows_sql = (
+                "SELECT {} {} ORDER BY bm25(meetings_fts, {}) LIMIT ? OFFSET ?"
+            ).format(columns, from_where, weights)
+        else:
+            # Without filters, count and rank on the full-text index alone and only
+            # join the meetings on the requested page
+            total_sql = "SELECT COUNT(*) FROM meetings_fts WHERE meetings_fts MATCH ?"
+            rows_sql = (
+                "SELECT {} FROM (SELECT rowid, bm25(meetings_fts, {}) AS rank "
+                "FROM meetings_fts WHERE meetings_fts MATCH ? "
+                "ORDER BY rank LIMIT ? OFFSET ?) AS page "
+                "JOIN meetings m ON m.rowid = page.rowid ORDER BY page.rank"
+            ).format(columns, weights)
+        total = self.conn.execute(total_sql, params).fetchone()[0]
+        rows = self.conn.execute(rows_sql, params + [per_page, offset])
+        return {
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "results": [dict(zip(RESULT_COLUMNS, row)) for row in rows],
+        }
+
+    def close(self):
+        self.conn.close()
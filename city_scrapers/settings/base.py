@@ -33,14 +33,95 @@ ITEM_PIPELINES = {
 # See http://scrapy.readthedocs.org/en/latest/topics/downloader-middleware.html
 DOWNLOADER_MIDDLEWARES = {
     "scrapy.downloadermiddlewares.robotstxt.RobotsTxtMiddleware": 543,
+    "city_scrapers.middlewares.RecorderMiddleware": 950,
 }
 
-# Use commands from city_scrapers_core package
+# Setting CITY_SCRAPERS_RECORD saves every request and response of a crawl to
+# CITY_SCRAPERS_RECORDING_PATH, which `scrapy replayserver` serves for crawls run with
+# the city_scrapers.settings.replay settings
 
-COMMANDS_MODULE = "city_scrapers_core.commands"
+CITY_SCRAPERS_RECORD = False
+
+CITY_SCRAPERS_RECORDING_PATH = "recordings.db"
+
+# Check the links of meetings from CITY_SCRAPERS_LINK_CHECK_SPIDERS before they're
+# output and remove links that return 404 or 410, with at most
+# CITY_SCRAPERS_LINK_CHECK_CONCURRENCY checks at once for each host. Working links are
+# kept in CITY_SCRAPERS_SPIDER_CACHE_PATH and checked again after a week.
+
+SPIDER_MIDDLEWARES = {
+    "city_scrapers.middlewares.LinkCheckMiddleware": 940,
+}
+
+CITY_SCRAPERS_LINK_CHECK_SPIDERS = []
+
+CITY_SCRAPERS_LINK_CHECK_CONCURRENCY = 2
+
+CITY_SCRAPERS_LINK_CHECK_EXPIRATION_SECS = 7 * 24 * 60 * 60
+
+# Use project commands, which include the commands from the city_scrapers_core package
+
+COMMANDS_MODULE = "city_scrapers.commands"
+
+# Number of spiders `scrapy crawlall` runs at the same time in a single process
+
+CITY_SCRAPERS_CRAWLALL_CONCURRENCY = 8
+
+# Setting CITY_SCRAPERS_CRAWLALL_SHARDS above 1 splits `scrapy crawlall` across worker
+# processes, balanced using each spider's recent durations from the history file. The
+# heaviest spiders in CITY_SCRAPERS_HEAVY_SPIDERS are always placed in separate shards,
+# so there must be at least as many shards as heavy spiders being run.
+
+CITY_SCRAPERS_CRAWLALL_SHARDS = 1
+
+CITY_SCRAPERS_CRAWLALL_HISTORY = "crawlall_history.json"
+
+CITY_SCRAPERS_HEAVY_SPIDERS = [
+    "pgh_public_schools",
+    "alle_county",
+    "pitt_city_council",
+    "bethel_park_public_meetings",
+]
+
+# SQLite file where spiders keep values between runs, like API tokens and details of
+# events that haven't changed
+
+CITY_SCRAPERS_SPIDER_CACHE_PATH = "spider_cache.db"
+
+# Request the full history of spiders that otherwise only request meetings since their
+# last run, like `scrapy crawl pgh_public_schools -a full_backfill=true` for one spider
+
+CITY_SCRAPERS_FULL_BACKFILL = False
+
+# Legistar Web API that Legistar spiders read events from. Set to an empty string to
+# scrape the Calendar.aspx pages of each site instead
+
+CITY_SCRAPERS_LEGISTAR_API_URL = "https://webapi.legistar.com/v1/"
+
+# Requests at once to each host for Legistar spiders, unless
+# CONCURRENT_REQUESTS_PER_DOMAIN is set on the command line
+
+CITY_SCRAPERS_LEGISTAR_CONCURRENCY = 8
+
+# Write a JSON report of download, callback and pipeline timings for each spider run
+# to CITY_SCRAPERS_INSTRUMENTATION_PATH
 
 EXTENSIONS = {
     "scrapy.extensions.closespider.CloseSpider": None,
+    "city_scrapers.extensions.InstrumentationExtension": 500,
+    "city_scrapers.extensions.ProfilerExtension": 510,
 }
 
+CITY_SCRAPERS_INSTRUMENTATION_PATH = "instrumentation/%(name)s.json"
+
+# Profile the callbacks and pipelines of a comma-separated list of spiders, like
+# "-s CITY_SCRAPERS_PROFILE_SPIDERS=pitt_ethics_board,pitt_city_planning", writing
+# .prof files and a summary of the top functions to CITY_SCRAPERS_PROFILE_PATH
+
+CITY_SCRAPERS_PROFILE_SPIDERS = []
+
+CITY_SCRAPERS_PROFILE_PATH = "profiles/%(name)s"
+
+CITY_SCRAPERS_PROFILE_TOP = 30
+
 CLOSESPIDER_ERRORCOUNT = 5
@@ -5,11 +5,39 @@ USER_AGENT = "City Scrapers [production mode]. Learn more and say hello at https
 # Configure item pipelines
 ITEM_PIPELINES = {
     "city_scrapers_core.pipelines.DefaultValuesPipeline": 100,
-    "city_scrapers_core.pipelines.S3DiffPipeline": 200,
+    "city_scrapers.pipelines.LocalDiffPipeline": 200,
     "city_scrapers_core.pipelines.MeetingPipeline": 300,
     "city_scrapers_core.pipelines.OpenCivicDataPipeline": 400,
 }
 
+# Revalidate start pages with If-None-Match / If-Modified-Since and replay the stored
+# body when unchanged. Stored responses are downloaded in full again after a week.
+
+DOWNLOADER_MIDDLEWARES = {
+    **DOWNLOADER_MIDDLEWARES,
+    "city_scrapers.middlewares.ConditionalGetMiddleware": 100,
+}
+
+CITY_SCRAPERS_CONDITIONAL_GET_PATH = "conditional_get.db"
+
+CITY_SCRAPERS_CONDITIONAL_GET_EXPIRATION_SECS = 7 * 24 * 60 * 60
+
+# Skip parsing responses identical to ones parsed before by the same spider code, and
+# re-emit the stored meetings with an updated status instead.
+
+SPIDER_MIDDLEWARES = {
+    **SPIDER_MIDDLEWARES,
+    "city_scrapers.middlewares.ParseCacheMiddleware": 950,
+}
+
+CITY_SCRAPERS_PARSE_CACHE_PATH = "parse_cache.db"
+
+CITY_SCRAPERS_PARSE_CACHE_EXPIRATION_SECS = 30 * 24 * 60 * 60
+
+# Stop publishing agenda, minutes and video links of Legistar meetings that are gone
+
+CITY_SCRAPERS_LINK_CHECK_SPIDERS = ["alle_county", "pitt_city_council"]
+
 SENTRY_DSN = os.getenv("SENTRY_DSN")
 
 # Uncomment one of the StatusExtension classes to write an SVG badge of each scraper's status to
@@ -23,15 +51,23 @@ EXTENSIONS = {
     "scrapy_sentry.extensions.Errors": 10,
     "city_scrapers_core.extensions.S3StatusExtension": 100,
     "scrapy.extensions.closespider.CloseSpider": None,
+    "city_scrapers.extensions.InstrumentationExtension": 500,
+    "city_scrapers.extensions.ProfilerExtension": 510,
 }
 
 FEED_EXPORTERS = {
     "json": "scrapy.exporters.JsonItemExporter",
     "jsonlines": "scrapy.exporters.JsonLinesItemExporter",
+    "jsonlines_compressed": "city_scrapers.exporters.CompressedJsonLinesItemExporter",
 }
 
 FEED_FORMAT = "jsonlines"
 
+# Compression of the copy of each spider's feed in FEEDS, either "gzip" or "zstd"
+
+CITY_SCRAPERS_FEED_COMPRESSION = "gzip"
+CITY_SCRAPERS_FEED_COMPRESSION_LEVEL = 6
+
 FEED_STORAGES = {
     "s3": "scrapy.extensions.feedexport.S3FeedStorage",
 }
@@ -43,8 +79,18 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 
 CITY_SCRAPERS_STATUS_BUCKET = "city-scrapers-pitt"
 
+# Each spider's store of previously scraped meetings for LocalDiffPipeline is synced
+# from and back to this location
+
+CITY_SCRAPERS_MEETING_STORE_URI = "s3://city-scrapers-pitt/meetings/%(name)s.db"
+
 # Uncomment the FEED_URI for whichever provider you're using
 
 FEED_URI = (
     "s3://city-scrapers-pitt/%(year)s/%(month)s/%(day)s/%(hour_min)s/%(name)s.json"
 )
+
+# Compressed copy of each spider's feed, written alongside the uncompressed feed that
+# combinefeeds and other consumers read
+
+FEEDS = {FEED_URI + ".gz": {"format": "jsonlines_compressed"}}
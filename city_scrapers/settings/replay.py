@@ -0,0 +1,17 @@
+from .base import *
+
+# Send every request to the local server started by `scrapy replayserver`, which
+# replays the responses recorded with CITY_SCRAPERS_RECORD so that complete crawls can
+# be run and benchmarked without network access
+
+DOWNLOADER_MIDDLEWARES = {
+    "scrapy.downloadermiddlewares.robotstxt.RobotsTxtMiddleware": 543,
+    "city_scrapers.middlewares.ReplayMiddleware": 950,
+}
+
+CITY_SCRAPERS_REPLAY_URL = "http://127.0.0.1:8800"
+
+# Seconds `scrapy replayserver` waits before each response, to stand in for the
+# latency of the original sites
+
+CITY_SCRAPERS_REPLAY_LATENCY = 0
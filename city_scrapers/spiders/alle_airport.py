@@ -5,6 +5,8 @@ from city_scrapers_core.constants import NOT_CLASSIFIED
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 
+from city_scrapers.utils.dates import parse_date
+
 DEBUG_MODE = False
 # I didn't know how to list defualt locations and time other than
 # hard code them in.
@@ -23,6 +25,8 @@ class AlleAirportSpider(CityScrapersSpider):
     timezone = "America/New_York"
     allowed_domains = ["flypittsburgh.com"]
     start_urls = ["https://www.flypittsburgh.com/about-us/leadership"]
+    # Dates without a year are read as this year's
+    dont_parse_cache = True
 
     def print_debug_message(self, str):
         if DEBUG_MODE:
@@ -116,33 +120,13 @@ class AlleAirportSpider(CityScrapersSpider):
     # ALLEGHENY AIRPORT STRING PARSING FUNCTIONS - AUTHOR ALEK BINION
 
     # Function to determine if the line is a date by seeing
-    # if a month is in the string
+    # if it has a month followed by a day
     def getDate(self, string):
-        month_lst = [
-            "January",
-            "February",
-            "March",
-            "April",
-            "May",
-            "June",
-            "July",
-            "August",
-            "September",
-            "October",
-            "November",
-            "December",
-        ]
-        for i in range(len(month_lst)):
-            if month_lst[i].lower() in string.lower():
-                # regex to remove all non-numeric chars from string
-                # leaving the day in month of eveny
-                day = re.sub("[^0-9]", "", string)
-                if day == "":
-                    return None
-                # index + 1 is calandar month
-                monthDay = [i + 1, int(day)]
-                return monthDay
-        return None
+        date = parse_date(string, default_year=datetime.today().year)
+        if date is None:
+            return None
+        # Calendar month and day of the event
+        return [date.month, date.day]
 
     # Function to check if the even was cancelled or moved
     def checkIfCancelledOrMoved(self, appointment, defaultTime):
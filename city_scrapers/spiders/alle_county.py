@@ -1,16 +1,21 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
 from city_scrapers_core.constants import CITY_COUNCIL, COMMITTEE, FORUM
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import LegistarSpider
 
+from city_scrapers.legistar import LegistarApiMixin
 
-class AlleCountySpider(LegistarSpider):
+
+class AlleCountySpider(LegistarApiMixin, LegistarSpider):
     name = "alle_county"
     agency = "Allegheny County Government"
     timezone = "America/New_York"
     allowed_domains = ["alleghenycounty.legistar.com"]
     start_urls = ["https://alleghenycounty.legistar.com"]
+    legistar_client = "alleghenycounty"
+    legistar_name_links = True
+    history_start = date(2015, 1, 1)
 
     def parse_legistar(self, events):
         """
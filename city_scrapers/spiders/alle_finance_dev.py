@@ -1,10 +1,12 @@
 import re
+from datetime import datetime
 
-import dateutil.parser
 from city_scrapers_core.constants import COMMISSION
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 
+from city_scrapers.utils.dates import find_dates, parse_time
+
 
 class AlleFinanceDevSpider(CityScrapersSpider):
     name = "alle_finance_dev"
@@ -52,13 +54,7 @@ class AlleFinanceDevSpider(CityScrapersSpider):
         meeting_soup = re.sub("\xa0", "", meeting_soup)
         meeting_soup = re.sub("</p>", "", meeting_soup)
         meeting_soup = meeting_soup.lower()
-        meetings = meeting_soup.split("<br>")[0:]
-        pattern = (
-            "(january|february|march|april|may|june|"
-            + "july|august|september|october|november|december) "
-            + "(\\d*),( )*(\\d\\d\\d\\d)"
-        )
-        meetings = re.findall(pattern, meeting_soup)
+        meetings = find_dates(meeting_soup)
 
         for item in meetings:
             meeting = Meeting(
@@ -93,9 +89,7 @@ class AlleFinanceDevSpider(CityScrapersSpider):
 
     def _parse_start(self, item):
         """Parse start datetime as a naive datetime object."""
-        return dateutil.parser.parse(
-            item[0] + " " + item[1] + " " + item[-1] + " " + self.TIME
-        )
+        return datetime.combine(item, parse_time(self.TIME))
 
     def _parse_end(self, item):
         """Parse end datetime as a naive datetime object. Added by pipeline if None"""
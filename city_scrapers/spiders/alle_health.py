@@ -5,6 +5,8 @@ from city_scrapers_core.constants import BOARD
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 
+from city_scrapers.utils.dates import parse_dates
+
 
 class AlleHealthSpider(CityScrapersSpider):
     name = "alle_health"
@@ -67,24 +69,21 @@ class AlleHealthSpider(CityScrapersSpider):
         meeting_list = (meeting_list1 and meeting_list1.group(0)) or ""
         meetings = re.findall(r"<li.*?</li>", meeting_list)
 
-        for item in meetings:
-            mdate1 = re.search(">([^<]+)", item)
-            if mdate1:
-                mdate2 = mdate1.group(1)
-
-                try:
-                    mdate = datetime.strptime(mdate2, "%B %d, %Y")
-                    meeting = Meeting(
-                        title=AlleHealthSpider.agency + " " + mdate2,
-                        start=mdate,
-                        source=AlleHealthSpider.start_urls[0],
-                        classification=BOARD,
-                    )
-                    meeting["status"] = self._get_status(meeting)
-                    meeting["id"] = self._get_id(meeting)
-                    yield meeting
-                except ValueError:
-                    pass
+        mdates = [re.search(">([^<]+)", item) for item in meetings]
+        mdates = [mdate1.group(1) for mdate1 in mdates if mdate1]
+
+        for mdate2, mdate in zip(mdates, parse_dates(mdates, "%B %d, %Y")):
+            if mdate is None:
+                continue
+            meeting = Meeting(
+                title=AlleHealthSpider.agency + " " + mdate2,
+                start=mdate,
+                source=AlleHealthSpider.start_urls[0],
+                classification=BOARD,
+            )
+            meeting["status"] = self._get_status(meeting)
+            meeting["id"] = self._get_id(meeting)
+            yield meeting
 
     def _parse_title(self, item):
         """Parse or generate meeting title."""
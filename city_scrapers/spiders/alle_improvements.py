@@ -5,6 +5,8 @@ from city_scrapers_core.constants import BOARD
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 
+from city_scrapers.utils.dates import parse_dates
+
 
 # Helper class for clean_date
 class MLStripper(HTMLParser):
@@ -52,13 +54,17 @@ class AlleImprovementsSpider(CityScrapersSpider):
     def parse(self, response) -> Meeting:
         self._check_starting_hour_has_not_changed(response)
         meeting_dates: list = self._parse_meeting_dates_list(response)
+        starts: list = parse_dates(meeting_dates, "%B%d,%Y")
 
-        for item in meeting_dates:
+        for item, start in zip(meeting_dates, starts):
+            if start is None:
+                self.logger.warning("Skipping meeting without a date: %r", item)
+                continue
             meeting = Meeting(
                 title=self._parse_title(),
                 description=self._parse_description(),
                 classification=self._parse_classification(),
-                start=self._parse_start(item),
+                start=self._parse_start(start),
                 end=self._parse_end(item),
                 all_day=self._parse_all_day(item),
                 time_notes=self._parse_time_notes(item),
@@ -94,8 +100,7 @@ class AlleImprovementsSpider(CityScrapersSpider):
         path: str = root + "div/div/div/div/div/table/tbody/tr/td[1]/p[2]/text()"
         assert response.xpath(path).get() == expected
 
-    def _parse_start(self, item) -> datetime:
-        date: datetime = datetime.strptime(item, "%B%d,%Y")
+    def _parse_start(self, date: datetime) -> datetime:
         # Every meeting is assumed to take place at 9:30am
         # as asserted by _check_starting_hour_has_not_changed
         date_with_time_of_day: datetime = date.replace(hour=9, minute=30)
@@ -1,13 +1,11 @@
-import unicodedata
 from urllib.parse import urlencode
 
-import ics
-from city_scrapers_core.constants import NOT_CLASSIFIED
-from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 
+from city_scrapers.ical import ICalEventsMixin
 
-class BethelParkSpider(CityScrapersSpider):
+
+class BethelParkSpider(ICalEventsMixin, CityScrapersSpider):
     """Spider for Bethel Park public meetings.
 
     This spider retrieves meetings from the Bethel Park website at:
@@ -41,64 +39,13 @@ class BethelParkSpider(CityScrapersSpider):
     }
     start_urls = ["http://bethelpark.net/?" + urlencode(params)]
 
-    def normalize(self, s):
-        """Apply some simple transformations to clean up a string (aka normalize it)
-
-        Specifically:
-        1. Apply unicode normalization to convert byte sequences like \xa0 to spaces.
-        2. Strip extra space from the beginning and end of the string.d
-        3. Strip extra space from each line of text.
-        """
-        if not s:
-            return ""
-        unicode_normalized = unicodedata.normalize("NFKD", s).strip()
-        stripped_lines = [line.strip() for line in unicode_normalized.split("\n")]
-        return "\n".join(stripped_lines)
-
-    def parse(self, response):
-        """ Convert the website reponse into Meeting objects
-
-        The Bethel Park website allows you to download their calendar in the icalendar format.
-        This function parses the icalendar file and converts each event into a Meeting.
-
-        Arguments:
-            response: The response from the website. We expect the body of this response to
-                contain icalendar data
-        Return:
-            Yields a meeting object for each event in the calendar
-        """
-        raw_calendar = response.body.decode("utf-8")
-        ics_calendar = ics.Calendar(raw_calendar)
-
-        for event in ics_calendar.events:
-            meeting = Meeting(
-                title=self.normalize(event.name),
-                description=self.normalize(event.description),
-                classification=NOT_CLASSIFIED,
-                start=self._parse_start(event),
-                end=self._parse_end(event),
-                all_day=False,
-                time_notes=None,
-                location={"address": self.normalize(event.location), "name": ""},
-                links=[],
-                source=event.url,
-            )
-            meeting["status"] = self._get_status(meeting)
-            meeting["id"] = self._get_id(meeting)
-            yield meeting
-
-    def _parse_start(self, event):
-        if event.begin:
-            return event.begin.datetime.replace(tzinfo=None)
-        return None
+    # Each event is output once at its start rather than for each recurrence
+    ical_expand_recurrences = False
 
-    def _parse_end(self, event):
-        if event.end:
-            # Some of the events have a start time which equals the end time.
-            # In this case, just set end to "None", and use whatever default
-            # is set by the parent spider
-            if event.begin == event.end:
-                return None
-            else:
-                return event.begin.datetime.replace(tzinfo=None)
-        return None
+    def _ical_end(self, begin, end):
+        # Some of the events have a start time which equals the end time.
+        # In this case, just set end to "None", and use whatever default
+        # is set by the parent spider
+        if end is None or begin == end:
+            return None
+        return self._ical_datetime(begin)
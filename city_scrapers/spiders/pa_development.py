@@ -1,27 +1,27 @@
 import html  # clean up html strings (such as &amp)
-import json  # interact with the Tribe Events API
-from datetime import datetime  # convert utc time to datetime
+from datetime import date, datetime  # convert utc time to datetime
 
 from city_scrapers_core.constants import BOARD
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 
+from city_scrapers.tribe import TribeEventsMixin
+
 
 # remove html encoding and convert to a string object
 def clean(my_json_string):
     return str(html.unescape(my_json_string))
 
 
-class PaDevelopmentSpider(CityScrapersSpider):
+class PaDevelopmentSpider(TribeEventsMixin, CityScrapersSpider):
     name = "pa_development"
     agency = "PA Department of Community & Economic Development"
     timezone = "America/New_York"
     allowed_domains = ["dced.pa.gov"]
     start_urls = ["https://dced.pa.gov/wp-json/tribe/events/v1/events"]
+    history_start = date(2019, 1, 1)
 
-    def parse(self, response):
-        events = json.loads(response.text)["events"]
-
+    def parse_tribe(self, events):
         for item in events:
             meeting = Meeting(
                 title=self._parse_title(item),
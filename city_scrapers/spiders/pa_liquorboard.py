@@ -5,6 +5,10 @@ from city_scrapers_core.constants import BOARD
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 
+from city_scrapers.utils.dates import parse_dates
+
+DATE_FORMAT = "%A, %B %d, %Y"
+
 
 class PaLiquorboardSpider(CityScrapersSpider):
     """Spider is a class that scapy provides to us,
@@ -36,14 +40,18 @@ class PaLiquorboardSpider(CityScrapersSpider):
         # Identify CSS node or XPath you're interested in
         meetings = response.xpath(select_txt).extract()  # Make variable of that text
         start_hour = self._parse_starting_hour(response)
+        dates = parse_dates([self._clean_date(item) for item in meetings], DATE_FORMAT)
 
-        for item in meetings:
+        for item, date in zip(meetings, dates):
+            if date is None:
+                self.logger.warning("Skipping meeting without a date: %r", item)
+                continue
 
             meeting = Meeting(
                 title=self._parse_title(item),
                 description=self._parse_description(item),
                 classification=self._parse_classification(item),
-                start=self._parse_start(item, start_hour),
+                start=self._parse_start(date, start_hour),
                 end=self._parse_end(item),
                 all_day=self._parse_all_day(item),
                 time_notes=self._parse_time_notes(item),
@@ -69,13 +77,15 @@ class PaLiquorboardSpider(CityScrapersSpider):
         """Parse or generate classification from allowed options."""
         return BOARD
 
-    def _parse_start(self, item: str, start_hour: int):
-        """Parse start datetime as a naive datetime object."""
+    def _clean_date(self, item: str):
         # Remove garbage from our date item:
         clean_item = item
         clean_item = re.sub("- ", "", item)
         clean_item = re.sub("\\xa0", " ", clean_item)
-        start_time = datetime.strptime(clean_item, "%A, %B %d, %Y")
+        return clean_item
+
+    def _parse_start(self, start_time: datetime, start_hour: int):
+        """Parse start datetime as a naive datetime object."""
 
         try:
             if self.EXPECTED_START_HOUR in start_hour:
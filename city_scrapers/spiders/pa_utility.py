@@ -3,7 +3,8 @@ from datetime import datetime, time
 from city_scrapers_core.constants import COMMISSION
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
-from dateutil.parser import parse
+
+from city_scrapers.utils.dates import parse_date, parse_dates
 
 url = "http://www.puc.pa.gov/about_puc/public_meeting_calendar/public_meeting_audio_summaries_.aspx"
 
@@ -28,7 +29,7 @@ class PaUtilitySpider(CityScrapersSpider):
 
         Change the `_parse_title`, `_parse_start`, etc methods to fit your scraping
         needs.
-       """
+        """
 
         self.logger.info("PARSING")
         content = response.css(".center").xpath(".//text()").getall()
@@ -51,14 +52,26 @@ class PaUtilitySpider(CityScrapersSpider):
         meeting_dates = [d for d in meeting_content if str.startswith(d, "\n\t")]
         # self.logger.warning(meeting_dates)
 
-        for date_str in meeting_dates:
+        # the dates are all like "Thursday, January 16, 2020 - ", so parse them at once
+        starts = parse_dates(
+            [date_str.strip(" \n\t\xa0-") for date_str in meeting_dates],
+            "%A, %B %d, %Y",
+        )
+
+        for date_str, start in zip(meeting_dates, starts):
             # self.logger.info(date_str)
+            if start is None:
+                # Dates in other formats are found anywhere in the line
+                start = parse_date(date_str)
+            if start is None:
+                self.logger.warning("Skipping meeting without a date: %r", date_str)
+                continue
 
             meeting = Meeting(
                 title=self._parse_title(date_str),
                 description=self._parse_description(date_str),
                 classification=self._parse_classification(date_str),
-                start=self._parse_start(date_str),
+                start=self._parse_start(start),
                 end=self._parse_end(date_str),
                 all_day=False,
                 time_notes=self._parse_time_notes(date_str),
@@ -84,9 +97,9 @@ class PaUtilitySpider(CityScrapersSpider):
         """Parse or generate classification from allowed options."""
         return COMMISSION
 
-    def _parse_start(self, date_str):
+    def _parse_start(self, start):
         """Parse start datetime as a naive datetime object."""
-        return datetime.combine(parse(date_str), DEFAULT_START_TIME)
+        return datetime.combine(start, DEFAULT_START_TIME)
 
     def _parse_end(self, item):
         """Parse end datetime as a naive datetime object. Added by pipeline if None"""
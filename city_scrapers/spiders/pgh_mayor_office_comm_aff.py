@@ -15,6 +15,8 @@ class PghMayorOfficeCommAffSpider(CityScrapersSpider):
     allowed_domains = ["nextdoor.com"]
     start_urls = ["https://nextdoor.com/login/"]
     cookies = {}
+    # Meetings end at the time they're parsed
+    dont_parse_cache = True
 
     def parse(self, response):
         """
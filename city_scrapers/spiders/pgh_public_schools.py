@@ -1,22 +1,48 @@
-from datetime import datetime
-from json import loads
+import hashlib
+import time
+from datetime import date, datetime
+from json import dumps, loads
 
 from city_scrapers_core.constants import BOARD
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 from scrapy import Request
 
+from city_scrapers.mixins import DateWindowMixin
 
-class PghPublicSchoolsSpider(CityScrapersSpider):
+
+class PghPublicSchoolsSpider(DateWindowMixin, CityScrapersSpider):
     name = "pgh_public_schools"
     agency = "Pittsburgh Public Schools"
     timezone = "US/Eastern"
     allowed_domains = ["www.pghschools.org", "awsapieast1-prod2.schoolwires.com"]
+    # Limit the detail requests sent to the schoolwires API at once
+    custom_settings = {"CONCURRENT_REQUESTS_PER_DOMAIN": 4}
 
     # start_urls = ["https://www.pghschools.org/calendar"]
     start_urls = [
         "https://www.pghschools.org/Generator/TokenGenerator.ashx/ProcessRequest"
     ]
+    api_server = "https://awsapieast1-prod2.schoolwires.com/REST/"
+    # Fetch a new token when the cached one expires within this many seconds
+    token_margin = 300
+    history_start = date(2019, 2, 1)
+
+    def start_requests(self):
+        """Request the calendar with a cached token if it hasn't expired"""
+        token = self.cache and self.cache.get("token", "api")
+        if token and token["ExpirationTime"] > time.time() + self.token_margin:
+            yield self._calendar_request(token["Token"])
+        else:
+            yield self._token_request()
+
+    def _token_request(self, retry=False):
+        return Request(
+            self.start_urls[0],
+            callback=self.parse,
+            meta={"token_retry": retry},
+            dont_filter=True,
+        )
 
     def parse(self, response):
         """
@@ -26,26 +52,18 @@ class PghPublicSchoolsSpider(CityScrapersSpider):
         needs.
         """
         json_response = loads(response.text)
-        token = json_response["Token"]
-        # api_server = json_response["ApiServer"]
-        api_server = "https://awsapieast1-prod2.schoolwires.com/REST/"
-        api_gateway = api_server + "api/v4/"
-        api_function = "CalendarEvents/GetEvents/1?"
-        start_date = "2019-02-01"
-        today = datetime.today()
-
-        e = today.replace(
-            year=today.year + 10,
-            month=1,
-            day=1,
-            hour=0,
-            minute=0,
-            second=1,
-            microsecond=1,
+        if self.cache is not None:
+            self.cache.set("token", "api", json_response)
+            self.cache.commit()
+        yield self._calendar_request(
+            json_response["Token"], retry=response.meta.get("token_retry", False)
         )
-        # the end date will be ten years from the date that the script runs
-        end_date = str(e.year) + "-" + str(e.month).zfill(2) + "-" + str(e.day).zfill(2)
-        dates = "StartDate={}&EndDate={}".format(start_date, end_date)
+
+    def _calendar_request(self, token, retry=False):
+        api_gateway = self.api_server + "api/v4/"
+        api_function = "CalendarEvents/GetEvents/1?"
+        start_date, end_date = self.date_window()
+        dates = "StartDate={:%Y-%m-%d}&EndDate={:%Y-%m-%d}".format(start_date, end_date)
         modules = "&ModuleInstanceFilter="
 
         # this line is to filter just school board meetings.
@@ -58,29 +76,73 @@ class PghPublicSchoolsSpider(CityScrapersSpider):
         dbstream = "&IsDBStreamAndShowAll=true"
         url = api_gateway + api_function + dates + modules + category + dbstream
         headers = {"Authorization": "Bearer " + token, "Accept": "application/json"}
-        req = Request(url, headers=headers, callback=self._parse_api)
-
-        yield req
+        # A cached token can be revoked before it expires, so handle 401 responses
+        return Request(
+            url,
+            headers=headers,
+            callback=self._parse_api,
+            meta={"handle_httpstatus_list": [401], "token_retry": retry},
+            dont_filter=True,
+        )
 
     def _parse_api(self, response):
+        if response.status == 401:
+            if self.cache is not None:
+                self.cache.delete("token", "api")
+                self.cache.commit()
+            if response.meta.get("token_retry"):
+                self.logger.error("New token was rejected, stopping")
+                return
+            self.logger.info("Token was rejected, requesting a new one")
+            yield self._token_request(retry=True)
+            return
+
         headers = response.request.headers
 
-        api_server = "https://awsapieast1-prod2.schoolwires.com/REST/"
-        api_gateway = api_server + "api/v4/"
+        api_gateway = self.api_server + "api/v4/"
         api_function = "CalendarEvents/GetEventDate/1/"
         url = api_gateway + api_function
 
         meetings = loads(response.text)
 
+        cached_ids = self.cache.keys("details") if self.cache is not None else set()
         for item in meetings:
+            # Only request details for events that are new or changed in the calendar
+            calendar_hash = hashlib.sha1(
+                dumps(item, sort_keys=True).encode()
+            ).hexdigest()
+            cached = self.cache and self.cache.get("details", item["Id"])
+            if cached and cached["calendar_hash"] == calendar_hash:
+                self.crawler.stats.inc_value("pgh_public_schools/cached_details")
+                yield self._parse_detail(cached["detail"], cached["url"])
+                continue
             detail_url = url + str(item["Id"])
             meeting = Request(
-                detail_url, headers=headers, callback=self._parse_detail_api
+                detail_url,
+                headers=headers,
+                callback=self._parse_detail_api,
+                cb_kwargs={"event_id": item["Id"], "calendar_hash": calendar_hash},
             )
             yield meeting
 
-    def _parse_detail_api(self, response):
+        if self.cache is not None:
+            # Drop details of events that are no longer in the calendar
+            for event_id in cached_ids - {str(item["Id"]) for item in meetings}:
+                self.cache.delete("details", event_id)
+            self.cache.commit()
+
+    def _parse_detail_api(self, response, event_id=None, calendar_hash=None):
         item = loads(response.text)
+        if self.cache is not None and calendar_hash is not None:
+            self.cache.set(
+                "details",
+                event_id,
+                {"calendar_hash": calendar_hash, "detail": item, "url": response.url},
+            )
+            self.cache.commit()
+        yield self._parse_detail(item, response.url)
+
+    def _parse_detail(self, item, source):
         meeting = Meeting(
             title=self._parse_title(item["Event"]),
             description=self._parse_description(item["Event"]),
@@ -91,12 +153,12 @@ class PghPublicSchoolsSpider(CityScrapersSpider):
             time_notes=self._parse_time_notes(item),
             location=self._parse_location(item),
             links=self._parse_links(item),
-            source=self._parse_source(response),
+            source=source,
         )
 
         meeting["status"] = self._get_status(meeting)
         meeting["id"] = self._get_id(meeting)
-        yield meeting
+        return meeting
 
     def _parse_title(self, item):
         """Parse or generate meeting title."""
@@ -143,8 +205,3 @@ class PghPublicSchoolsSpider(CityScrapersSpider):
     def _parse_links(self, item):
         """Parse or generate links."""
         return [{"href": "", "title": ""}]
-
-    def _parse_source(self, response):
-        """Parse or generate source."""
-        # https://www.pghschools.org/calendar#calendar1/20190205/event/19034
-        return response.url
@@ -4,6 +4,8 @@ from city_scrapers_core.constants import CANCELLED, COMMISSION
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 
+from city_scrapers.utils.dates import parse_dates
+
 
 class PittArtCommissionSpider(CityScrapersSpider):
     name = "pitt_art_commission"
@@ -27,20 +29,32 @@ class PittArtCommissionSpider(CityScrapersSpider):
         the meeting, along with a few potential links to relevant meeting documents.
         """
 
-        meeting_rows = response.xpath("//table//tr[@class='data']")
-        for row in meeting_rows:
+        meeting_rows = []
+        for row in response.xpath("//table//tr[@class='data']"):
             columns = row.xpath(".//td")
-            if len(columns) != self.expected_column_count:
+            if len(columns) == self.expected_column_count:
+                meeting_rows.append((row, columns))
+        # Parse the dates of every row at once, since they're all in the same format
+        dates = parse_dates(
+            [columns[1].xpath(".//text()").get() for _, columns in meeting_rows],
+            "%m/%d/%Y",
+        )
+
+        for (row, columns), date in zip(meeting_rows, dates):
+            if date is None:
+                self.logger.warning(
+                    "Skipping meeting without a date: %r",
+                    columns[1].xpath(".//text()").get(),
+                )
                 continue
 
-            date_str = columns[1].xpath(".//text()").get()
             cancelled_str = columns[6].xpath(".//text()").get()
 
             meeting = Meeting(
                 title=self._parse_title(row),
                 description=self._parse_description(row),
                 classification=self._parse_classification(row),
-                start=self._parse_start(date_str),
+                start=self._parse_start(date),
                 end=self._parse_end(row),
                 all_day=self._parse_all_day(row),
                 time_notes=self._parse_time_notes(row),
@@ -69,15 +83,13 @@ class PittArtCommissionSpider(CityScrapersSpider):
         """Parse or generate classification from allowed options."""
         return COMMISSION
 
-    def _parse_start(self, date_str):
+    def _parse_start(self, date):
         """Parse start datetime as a naive datetime object.
 
         Note that we currently use a fixed start time, since this information is not available
         from the webpage, save through looking at PDF downloads.
         """
-        return datetime.combine(
-            datetime.strptime(date_str, "%m/%d/%Y"), self.default_start_time
-        )
+        return datetime.combine(date, self.default_start_time)
 
     def _parse_end(self, row):
         """Parse end datetime as a naive datetime object. Added by pipeline if None"""
@@ -1,16 +1,20 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
 from city_scrapers_core.constants import CITY_COUNCIL, COMMITTEE
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import LegistarSpider
 
+from city_scrapers.legistar import LegistarApiMixin
 
-class PittCityCouncilSpider(LegistarSpider):
+
+class PittCityCouncilSpider(LegistarApiMixin, LegistarSpider):
     name = "pitt_city_council"
     agency = "Pittsburgh City Council"
     timezone = "America/New_York"
     allowed_domains = ["pittsburgh.legistar.com"]
     start_urls = ["https://pittsburgh.legistar.com"]
+    legistar_client = "pittsburgh"
+    history_start = date(2015, 1, 1)
     # Add the titles of any links not included in the scraped results
     link_types = []
 
@@ -23,7 +27,7 @@ class PittCityCouncilSpider(LegistarSpider):
         """
         for event, _ in events:
             start = self.legistar_start(event)
-            title = event.get("Name")
+            title = self._parse_title(event)
             meeting = Meeting(
                 title=title,
                 description=self._parse_description(event),
@@ -42,6 +46,13 @@ class PittCityCouncilSpider(LegistarSpider):
 
             yield meeting
 
+    def _parse_title(self, item):
+        """Parse title, which is a link to the body's page on some calendars"""
+        name = item.get("Name")
+        if isinstance(name, dict):
+            return name.get("label")
+        return name
+
     def _parse_end(self, start):
         return start + timedelta(hours=3)
 
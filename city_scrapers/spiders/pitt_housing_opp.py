@@ -1,17 +1,15 @@
 import json  # interact with the Tribe Events API
 import re  # parse strings
-import urllib.request  # pull info from the website
 from datetime import datetime  # convert utc time to datetime
 from html.parser import HTMLParser  # clean up HTML
 
 from city_scrapers_core.constants import BOARD
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
+from scrapy import Request
 
-# Downloads the json list dictating what pages are to be crawled:
+# The json list dictating what pages are to be crawled
 json_url = "http://www.ura.org/events.json"
-url = urllib.request.urlopen(json_url)
-json_events = json.loads(url.read().decode())
 
 
 # Accepts an iso_8601 string, returns an equivalent datetime object.
@@ -53,20 +51,30 @@ def strip_tags(html):
     return s.get_data()
 
 
-# Returns an array of urls representing meeting detail pages
-def get_ura_urls():
-    urls = []
-    base = "https://www.ura.org/events/housing-opportunity-fund-advisory-board-meeting?day="
-    searchKey = "Housing Opportunity Fund Advisory Board Meeting"
-    for event in json_events:
-        if searchKey in event["title"]:
-            candidate = _pittsburgh_iso_to_datetime(event["start"])
-            month = str(candidate.month)
-            day = str(candidate.day)
-            year = str(candidate.year)
-            date_url_query_parameter = month + "-" + day + "-" + year
-            urls.append(str(base + date_url_query_parameter))
-    return urls
+detail_base = (
+    "https://www.ura.org/events/housing-opportunity-fund-advisory-board-meeting"
+)
+search_key = "Housing Opportunity Fund Advisory Board Meeting"
+
+# Fields that aren't in events.json, which are read from each date's detail page. Only
+# the description is ever included, so every date's page is still requested
+DETAIL_FIELDS = ["description", "location"]
+# Used for meetings whose detail page couldn't be downloaded
+DEFAULT_DETAIL = {
+    "description": "",
+    "location": {
+        "address": "City-County Building, Fifth Floor, 414 Grant Street, "
+        "Pittsburgh, PA 15219",
+        "name": "City Council Chambers",
+    },
+}
+
+
+# Accepts a meeting start datetime, returns the url of that date's detail page for
+# events without their own url
+def get_ura_url(start):
+    date_url_query_parameter = "{}-{}-{}".format(start.month, start.day, start.year)
+    return detail_base + "?day=" + date_url_query_parameter
 
 
 class PittHousingOppSpider(CityScrapersSpider):
@@ -74,7 +82,97 @@ class PittHousingOppSpider(CityScrapersSpider):
     agency = "Housing Opportunity Fund Advisory Board Pittsburgh"
     timezone = "America/New_York"
     allowed_domains = ["www.ura.org"]
-    start_urls = get_ura_urls()
+    start_urls = [json_url]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Meetings waiting on each detail page, keyed by its url
+        self._pending_meetings = {}
+
+    def start_requests(self):
+        """Download the events list through Scrapy instead of at import time"""
+        for url in self.start_urls:
+            yield Request(url, callback=self.parse_events)
+
+    def parse_events(self, response):
+        """
+        Build meetings from the events list, only requesting a date's detail page for
+        fields that events.json doesn't include. Events listed more than once share
+        one detail request.
+        """
+        for event in json.loads(response.text):
+            if search_key not in event["title"]:
+                continue
+            fields = self._parse_event(event)
+            url = self._detail_url(fields)
+            if url is None:
+                yield self._build_meeting(fields)
+            elif url in self._pending_meetings:
+                self._pending_meetings[url].append(fields)
+            else:
+                self._pending_meetings[url] = [fields]
+                yield Request(
+                    url,
+                    callback=self._parse_detail,
+                    errback=self._detail_failed,
+                    cb_kwargs={"url": url},
+                )
+
+    def _parse_detail(self, response, url):
+        """Complete the meetings that were waiting on a detail page"""
+        detail = self._parse_detail_fields(response)
+        for fields in self._pending_meetings.pop(url, []):
+            yield self._build_meeting(fields, detail)
+
+    def _detail_failed(self, failure):
+        """Complete the meetings waiting on a detail page that couldn't be downloaded"""
+        url = failure.request.cb_kwargs["url"]
+        self.logger.warning("Couldn't download detail page %s", url)
+        for fields in self._pending_meetings.pop(url, []):
+            yield self._build_meeting(fields, DEFAULT_DETAIL)
+
+    def _detail_url(self, fields):
+        """Return the url of the detail page a meeting still needs, or None"""
+        if fields["end"] is None or any(
+            fields[field] is None for field in DETAIL_FIELDS
+        ):
+            return fields["source"]
+        return None
+
+    def _parse_event(self, event):
+        """Parse meeting fields from an events.json record, None if not included"""
+        start = _pittsburgh_iso_to_datetime(event["start"])
+        end = None
+        if event.get("end"):
+            end = _pittsburgh_iso_to_datetime(event["end"])
+        description = None
+        if event.get("description"):
+            description = re.sub("\n", "", strip_tags(event["description"]))
+        return {
+            "title": strip_tags(event["title"]),
+            "description": description,
+            "classification": self._parse_classification(event),
+            "start": start,
+            "end": end,
+            "all_day": self._parse_all_day(event),
+            "time_notes": self._parse_time_notes(event),
+            "location": None,
+            "links": self._parse_links(event),
+            "source": event.get("url") or get_ura_url(start),
+        }
+
+    def _build_meeting(self, fields, detail=None):
+        """Create a Meeting, filling fields missing from events.json from a detail page"""
+        detail = detail or {}
+        meeting = Meeting(
+            **{
+                field: detail.get(field) if value is None else value
+                for field, value in fields.items()
+            }
+        )
+        meeting["status"] = self._get_status(meeting)
+        meeting["id"] = self._get_id(meeting)
+        return meeting
 
     def parse(self, item):
         """
@@ -82,24 +180,28 @@ class PittHousingOppSpider(CityScrapersSpider):
         Change the `_parse_id`, `_parse_name`, etc methods to fit your scraping
         needs.
         """
-        meeting = Meeting(
-            title=self._parse_title(item),
-            description=self._parse_description(item),
-            classification=self._parse_classification(item),
-            start=self._parse_start(item),
-            end=self._parse_end(item),
-            all_day=self._parse_all_day(item),
-            time_notes=self._parse_time_notes(item),
-            location=self._parse_location(item),
-            links=self._parse_links(item),
-            source=self._parse_source(item),
-        )
+        meeting = Meeting(**self._parse_detail_fields(item))
 
         meeting["status"] = self._get_status(meeting)
         meeting["id"] = self._get_id(meeting)
 
         yield meeting
 
+    def _parse_detail_fields(self, item):
+        """Parse all meeting fields from a detail page"""
+        return {
+            "title": self._parse_title(item),
+            "description": self._parse_description(item),
+            "classification": self._parse_classification(item),
+            "start": self._parse_start(item),
+            "end": self._parse_end(item),
+            "all_day": self._parse_all_day(item),
+            "time_notes": self._parse_time_notes(item),
+            "location": self._parse_location(item),
+            "links": self._parse_links(item),
+            "source": self._parse_source(item),
+        }
+
     def _parse_title(self, item):
         """Parse or generate meeting title."""
         return strip_tags(item.xpath('//*[@id="main"]/div/div[1]/div/h2').get())
@@ -1,10 +1,11 @@
 import re
-from datetime import datetime
 
 from city_scrapers_core.constants import NOT_CLASSIFIED
 from city_scrapers_core.items import Meeting
 from city_scrapers_core.spiders import CityScrapersSpider
 
+from city_scrapers.utils.dates import parse_datetime
+
 
 class PittPublicAlgorithmsTaskForceSpider(CityScrapersSpider):
     name = "pitt_public_algorithms_task_force"
@@ -59,15 +60,14 @@ class PittPublicAlgorithmsTaskForceSpider(CityScrapersSpider):
     def _parse_start(self, item):
         """Parse start datetime as a naive datetime object."""
         dtline = re.search(r"<p>(.*?\s*\|\s*.*?)(?:\-.*?)?<br>", item)
-        return datetime.strptime(dtline.group(1), "%B %d, %Y | %I:%M%p")
+        return parse_datetime(dtline.group(1))
 
     def _parse_end(self, item):
         """Parse end datetime as a naive datetime object. Added by pipeline if None"""
         dtline = re.search(r"<p>(.*?)\|(.*?)\-(.*?)(?: \(.*?\))?<br>", item)
         if dtline is None:
             return None
-        dtend = dtline.group(1) + dtline.group(3)
-        return datetime.strptime(dtend, "%B %d, %Y %I:%M%p")
+        return parse_datetime(dtline.group(1) + dtline.group(3))
 
     def _parse_time_notes(self, item):
         """Parse any additional notes on the timing of the meeting"""
@@ -0,0 +1,47 @@
+from urllib.parse import urlencode
+
+from scrapy import Request
+
+from .mixins import DateWindowMixin
+from .utils import loads_json
+
+
+class TribeEventsMixin(DateWindowMixin):
+    """
+    Mixin for spiders of WordPress sites using the events API of The Events Calendar
+    (/wp-json/tribe/events/v1/events) as `start_urls[0]`.
+
+    Requests the date window from DateWindowMixin with as many events per page as the
+    API allows, then requests every other page at once after reading `total_pages`
+    from the first one. Spiders implement `parse_tribe(events)` like `parse`.
+    """
+
+    # Largest page size the events API allows by default
+    tribe_per_page = 50
+
+    def start_requests(self):
+        yield self._tribe_request(1, callback=self.parse)
+
+    def parse(self, response):
+        data = loads_json(response.body)
+        for page in range(2, data.get("total_pages", 1) + 1):
+            yield self._tribe_request(page, callback=self._parse_tribe_page)
+        yield from self.parse_tribe(data["events"])
+
+    def parse_tribe(self, events):
+        raise NotImplementedError("Must implement parse_tribe")
+
+    def _parse_tribe_page(self, response):
+        yield from self.parse_tribe(loads_json(response.body)["events"])
+
+    def _tribe_request(self, page, callback):
+        start_date, end_date = self.date_window()
+        params = {
+            "page": page,
+            "per_page": self.tribe_per_page,
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d"),
+        }
+        return Request(
+            "{}?{}".format(self.start_urls[0], urlencode(params)), callback=callback
+        )
@@ -0,0 +1,2 @@
+from .fast_json import loads_json  # noqa
+from .ical import iter_ical_events  # noqa
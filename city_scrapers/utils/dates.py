@@ -0,0 +1,286 @@
+import re
+from datetime import date, datetime, time
+from functools import lru_cache
+
+MONTH_NAMES = [
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+    "june",
+    "july",
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+]
+
+# Month numbers by full name and abbreviation
+MONTHS = {name: idx + 1 for idx, name in enumerate(MONTH_NAMES)}
+MONTHS.update({name[:3]: idx + 1 for idx, name in enumerate(MONTH_NAMES)})
+MONTHS["sept"] = 9
+WEEKDAY_NAMES = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+
+# Dates like "January 16, 2020", "Jan. 16th 2020" or "January 16", with longer month
+# names first so "sept" is matched before "sep". Weekdays before dates are skipped.
+DATE_PATTERN = (
+    r"\b(?P<month>{})\b\.?\s*(?P<day>\d{{1,2}})(?:st|nd|rd|th)?\b"
+    r"(?:\s*,?\s*(?P<year>\d{{4}})\b)?".format(
+        "|".join(sorted(MONTHS, key=len, reverse=True))
+    )
+)
+# Times like "5:30pm", "9:30 a.m." or "10 AM"
+MERIDIAN_TIME_PATTERN = (
+    r"\b(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridian>[ap])\.?\s*m\b\.?"
+)
+DATE_RE = re.compile(DATE_PATTERN, flags=re.IGNORECASE)
+# Patterns of strptime directives for parse_dates, which only match English names like
+# strptime does in the default C locale
+FORMAT_DIRECTIVES = {
+    "Y": r"\d{4}",
+    "y": r"\d{2}",
+    "m": r"1[0-2]|0[1-9]|[1-9]",
+    "d": r"3[01]|[12]\d|0[1-9]|[1-9]| [1-9]",
+    "H": r"2[0-3]|[0-1]\d|\d",
+    "I": r"1[0-2]|0[1-9]|[1-9]",
+    "M": r"[0-5]\d|\d",
+    "S": r"6[0-1]|[0-5]\d|\d",
+    "p": r"am|pm",
+    "B": "|".join(MONTH_NAMES),
+    "b": "|".join(name[:3] for name in MONTH_NAMES),
+    "A": "|".join(WEEKDAY_NAMES),
+    "a": "|".join(name[:3] for name in WEEKDAY_NAMES),
+}
+# Dates directly followed by a time, like "March 10, 2020 | 5:30pm", which are matched
+# at once since it's the most common shape on schedule pages
+DATETIME_RE = re.compile(
+    DATE_PATTERN + r"(?:[\s,|@-]*(?:at\s+)?" + MERIDIAN_TIME_PATTERN + ")?",
+    flags=re.IGNORECASE,
+)
+# Times anywhere in text, which can also be "noon" or 24-hour times like "18:30"
+TIME_RE = re.compile(
+    MERIDIAN_TIME_PATTERN
+    + r"|\b(?P<noon>noon)\b"
+    + r"|\b(?P<hour24>[01]?\d|2[0-3]):(?P<minute24>[0-5]\d)\b",
+    flags=re.IGNORECASE,
+)
+
+
+def _meridian_time(hour, minute, meridian):
+    hour = int(hour)
+    minute = int(minute or 0)
+    if not 1 <= hour <= 12 or minute > 59:
+        return None
+    if meridian in "pP":
+        return time(hour % 12 + 12, minute)
+    return time(hour % 12, minute)
+
+
+def _search_datetime(text):
+    """
+    Return the year or None, month and day of the first date in text, along with the
+    time directly after it or None and the span of the match
+    """
+    for match in DATETIME_RE.finditer(text):
+        month, day, year, hour, minute, meridian = match.group(
+            "month", "day", "year", "hour", "minute", "meridian"
+        )
+        day = int(day)
+        if not 1 <= day <= 31:
+            continue
+        parsed_time = None
+        if hour is not None:
+            parsed_time = _meridian_time(hour, minute, meridian)
+        return (
+            int(year) if year else None,
+            MONTHS[month.lower()],
+            day,
+            parsed_time,
+            match.span(),
+        )
+    return None
+
+
+def parse_time(text):
+    """Return the first time in text, like "5:30pm", "9:30 a.m." or "noon", or None"""
+    for match in TIME_RE.finditer(text):
+        if match.group("noon"):
+            return time(12)
+        if match.group("hour24"):
+            return time(int(match.group("hour24")), int(match.group("minute24")))
+        parsed = _meridian_time(*match.group("hour", "minute", "meridian"))
+        if parsed is not None:
+            return parsed
+    return None
+
+
+def parse_date(text, default_year=None):
+    """
+    Return the first date in free text with a month name, like "Thursday, January 16,
+    2020" or "Jan. 16th", or None if it has no valid date. Dates without a year use
+    `default_year`, and are None without one.
+    """
+    return _found_date(_search_datetime(text), default_year)
+
+
+def parse_datetime(text, default_time=None, default_year=None):
+    """
+    Return the first date in text combined with the first time after it, or before it if
+    there's none after. Uses `default_time` if text has no time, and returns None if it
+    has no date or time.
+    """
+    found = _search_datetime(text)
+    parsed_date = _found_date(found, default_year)
+    if parsed_date is None:
+        return None
+    parsed_time, (start, end) = found[3:]
+    if parsed_time is None:
+        parsed_time = parse_time(text[end:]) or parse_time(text[:start]) or default_time
+    if parsed_time is None:
+        return None
+    return datetime.combine(parsed_date, parsed_time)
+
+
+def _found_date(found, default_year):
+    """Return the date of a match from _search_datetime, or None if it isn't valid"""
+    if found is None:
+        return None
+    year, month, day = found[:3]
+    if year is None:
+        year = default_year
+    if year is None:
+        return None
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def find_dates(text, default_year=None):
+    """Return every valid date in text, in order"""
+    dates = []
+    for match in DATE_RE.finditer(text):
+        month, day, year = match.group("month", "day", "year")
+        year = int(year) if year else default_year
+        if year is None:
+            continue
+        try:
+            dates.append(date(year, MONTHS[month.lower()], int(day)))
+        except ValueError:
+            continue
+    return dates
+
+
+@lru_cache(maxsize=64)
+def _compile_format(fmt):
+    """
+    Return a pattern matching each line of newline-joined strings, with an "ok" group
+    for lines in a strptime format that captures each directive in a group of its name.
+    Returns None for formats with directives that aren't supported or are repeated.
+    """
+    parts = []
+    fields = []
+    idx = 0
+    while idx < len(fmt):
+        char = fmt[idx]
+        if char == "%" and idx + 1 < len(fmt):
+            directive = fmt[idx + 1]
+            idx += 2
+            if directive == "%":
+                parts.append("%")
+            elif directive in FORMAT_DIRECTIVES and directive not in fields:
+                fields.append(directive)
+                parts.append(
+                    "(?P<{}>{})".format(directive, FORMAT_DIRECTIVES[directive])
+                )
+            else:
+                return None
+        elif char.isspace():
+            # Whitespace matches any run of whitespace, as in strptime
+            while idx < len(fmt) and fmt[idx].isspace():
+                idx += 1
+            parts.append(r"[^\S\n]+")
+        else:
+            parts.append(re.escape(char))
+            idx += 1
+    pattern = r"^(?:(?P<ok>{})$|.*$)".format("".join(parts))
+    return re.compile(pattern, flags=re.IGNORECASE | re.MULTILINE)
+
+
+def _format_datetime(values):
+    """Return the datetime of a dict of strptime directives and their values"""
+    if "Y" in values:
+        year = int(values["Y"])
+    elif "y" in values:
+        # Two digit years are read as strptime does
+        year = int(values["y"])
+        year += 2000 if year < 69 else 1900
+    else:
+        year = 1900
+    if "m" in values:
+        month = int(values["m"])
+    elif "B" in values or "b" in values:
+        month = MONTHS[(values.get("B") or values["b"]).lower()]
+    else:
+        month = 1
+    if "I" in values:
+        hour = int(values["I"]) % 12
+        if values.get("p", "").lower() == "pm":
+            hour += 12
+    else:
+        hour = int(values.get("H", 0))
+    return datetime(
+        year,
+        month,
+        int(values.get("d", 1)),
+        hour,
+        int(values.get("M", 0)),
+        int(values.get("S", 0)),
+    )
+
+
+def _strptime(value, fmt):
+    try:
+        return datetime.strptime(value, fmt)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_dates(strings, fmt):
+    """
+    Parse a list of strings all in one strptime format, returning a list of naive
+    datetimes with None for each string that isn't a valid date in the format.
+
+    The format is compiled into a pattern once, and the strings are matched by running
+    it over all of them joined by newlines, rather than calling strptime for each one.
+    Strings with newlines and formats with directives other than %Y, %y, %m, %d, %H,
+    %I, %M, %S, %p, %B, %b, %A and %a are parsed with strptime instead.
+    """
+    strings = ["" if value is None else value for value in strings]
+    pattern = _compile_format(fmt)
+    text = "\n".join(strings)
+    if pattern is None or text.count("\n") != max(len(strings) - 1, 0):
+        return [_strptime(value, fmt) for value in strings]
+    parsed = []
+    for match in pattern.finditer(text):
+        if len(parsed) == len(strings):
+            # Empty matches after the last line
+            break
+        if match.group("ok") is None:
+            parsed.append(None)
+            continue
+        try:
+            parsed.append(_format_datetime(match.groupdict()))
+        except ValueError:
+            parsed.append(None)
+    return parsed
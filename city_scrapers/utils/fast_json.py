@@ -0,0 +1,16 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads_json(data):
+    """
+    Decode JSON from response bytes with orjson when it's installed, and otherwise with
+    the json module. Decoding the body directly skips building `response.text`.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
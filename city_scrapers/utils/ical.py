@@ -0,0 +1,203 @@
+import io
+import re
+from datetime import datetime, timedelta
+
+from dateutil.tz import UTC, gettz
+
+# Escaped characters in text values, with escaped backslashes matched first so that
+# an escaped backslash followed by "n" isn't read as a newline
+ESCAPE_RE = re.compile(r"\\([\\;,nNrR])")
+UNESCAPED = {"\\": "\\", ";": ";", ",": ",", "n": "\n", "N": "\n", "r": "\r", "R": "\r"}
+DURATION_RE = re.compile(
+    r"([-+])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+
+
+def unescape_text(value):
+    """Replace the escaped characters in an iCalendar text value"""
+    if "\\" not in value:
+        return value
+    return ESCAPE_RE.sub(lambda match: UNESCAPED[match.group(1)], value)
+
+
+def parse_ical_datetime(value, tzid=None):
+    """
+    Parse an iCalendar DATE or DATE-TIME value, returning a datetime that's in UTC for
+    values ending in "Z", in the zone of `tzid` if it's set and otherwise naive. Dates
+    are returned as midnight. Zones that can't be found, like the Windows names defined
+    in Outlook's VTIMEZONE blocks, are left naive to be read as the local time.
+    """
+    value = value.strip()
+    year, month, day = int(value[:4]), int(value[4:6]), int(value[6:8])
+    hour = minute = second = 0
+    if len(value) > 8:
+        hour, minute = int(value[9:11]), int(value[11:13])
+        if len(value) > 13 and value[13].isdigit():
+            second = int(value[13:15])
+    if value.endswith(("Z", "z")):
+        tzinfo = UTC
+    elif tzid:
+        tzinfo = gettz(tzid)
+    else:
+        tzinfo = None
+    return datetime(year, month, day, hour, minute, second, tzinfo=tzinfo)
+
+
+def parse_ical_duration(value):
+    """Parse an iCalendar DURATION value like "PT1H30M" into a timedelta"""
+    match = DURATION_RE.match(value.strip())
+    if not match:
+        return None
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+    return -duration if sign == "-" else duration
+
+
+def parse_content_line(line):
+    """Split an unfolded content line into its name, dict of parameters and raw value"""
+    if '"' not in line:
+        head, _, value = line.partition(":")
+        name, *param_strs = head.split(";")
+    else:
+        # Quoted parameter values can contain ":", ";" and ","
+        name, param_strs, value = None, [], ""
+        start, quoted = 0, False
+        for idx, char in enumerate(line):
+            if char == '"':
+                quoted = not quoted
+            elif not quoted and char in ";:":
+                part = line[start:idx]
+                if name is None:
+                    name = part
+                else:
+                    param_strs.append(part)
+                start = idx + 1
+                if char == ":":
+                    value = line[start:]
+                    break
+        if name is None:
+            name = line
+    params = {}
+    for param_str in param_strs:
+        key, _, param_value = param_str.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def unfold_lines(lines):
+    """
+    Join folded lines of iCalendar bytes and decode each one. Lines are folded by octet
+    count, so multibyte characters split across lines are only decoded once joined.
+    """
+    current = None
+    for raw_line in lines:
+        line = raw_line.rstrip(b"\r\n")
+        if not line.strip():
+            continue
+        if current is not None and line[:1] in (b" ", b"\t"):
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current.decode("utf-8", errors="replace")
+        current = line
+    if current is not None:
+        yield current.decode("utf-8", errors="replace")
+
+
+class ICalEvent:
+    """Properties of a VEVENT by name, as lists of parameter dicts and raw values"""
+
+    __slots__ = ("properties",)
+
+    def __init__(self):
+        self.properties = {}
+
+    def add(self, name, params, value):
+        self.properties.setdefault(name, []).append((params, value))
+
+    def raw(self, name):
+        values = self.properties.get(name)
+        if not values:
+            return None
+        return values[0][1]
+
+    def params(self, name):
+        values = self.properties.get(name)
+        if not values:
+            return {}
+        return values[0][0]
+
+    def text(self, name):
+        """Return the unescaped value of a text property, or None if it's missing"""
+        value = self.raw(name)
+        if value is None:
+            return None
+        return unescape_text(value)
+
+    def datetime(self, name):
+        value = self.raw(name)
+        if not value:
+            return None
+        return parse_ical_datetime(value, self.params(name).get("TZID"))
+
+    @property
+    def all_day(self):
+        value = self.raw("DTSTART")
+        return bool(value) and "T" not in value
+
+    @property
+    def begin(self):
+        return self.datetime("DTSTART")
+
+    @property
+    def end(self):
+        """
+        Return DTEND, DTSTART plus DURATION if it's set, or otherwise the day after
+        DTSTART for all-day events and DTSTART for other events
+        """
+        begin = self.begin
+        duration = self.raw("DURATION")
+        if duration and begin is not None:
+            parsed = parse_ical_duration(duration)
+            if parsed is not None:
+                return begin + parsed
+        end = self.datetime("DTEND")
+        if end is not None or begin is None:
+            return end
+        if self.all_day:
+            return begin + timedelta(days=1)
+        return begin
+
+
+def iter_ical_events(data):
+    """
+    Yield an ICalEvent for each VEVENT in iCalendar bytes or an iterable of byte lines,
+    like an open file, as each one is read. Components nested in events like VALARM are
+    skipped, and only one event is kept in memory at a time.
+    """
+    if isinstance(data, (bytes, bytearray)):
+        data = io.BytesIO(data)
+    event = None
+    # Depth of components nested within the current event
+    depth = 0
+    for line in unfold_lines(data):
+        name, params, value = parse_content_line(line)
+        if name == "BEGIN":
+            if event is not None:
+                depth += 1
+            elif value.strip().upper() == "VEVENT":
+                event = ICalEvent()
+        elif name == "END":
+            if depth:
+                depth -= 1
+            elif event is not None and value.strip().upper() == "VEVENT":
+                yield event
+                event = None
+        elif event is not None and not depth:
+            event.add(name, params, value)
@@ -0,0 +1,86 @@
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+from city_scrapers.archive import compact_feeds, monthly_counts, read_meetings
+
+
+def ocd_item(meeting_id, start, status="tentative"):
+    return {
+        "_id": "ocd-event/{}".format(meeting_id),
+        "name": "Board Meeting",
+        "status": status,
+        "classification": "Board",
+        "start_time": start + "-05:00",
+        "end_time": None,
+        "location": {"name": "City Hall"},
+        "sources": [{"url": "https://example.com", "note": ""}],
+        "extras": {"cityscrapers/id": meeting_id},
+    }
+
+
+def write_feed(path, items, compress=False):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    content = "\n".join(json.dumps(item) for item in items).encode()
+    path.write_bytes(gzip.compress(content) if compress else content)
+
+
+@pytest.fixture
+def dataset_dir(tmp_path):
+    feeds_dir = tmp_path / "feeds"
+    write_feed(
+        feeds_dir / "2020/01/01/0600/alle_county.json",
+        [
+            ocd_item("a1", "2020-01-15T10:00:00"),
+            ocd_item("a2", "2020-02-12T10:00:00"),
+        ],
+    )
+    write_feed(
+        feeds_dir / "2020/02/01/0600/alle_county.json.gz",
+        [
+            ocd_item("a2", "2020-02-12T10:00:00", status="cancelled"),
+            ocd_item("a3", "2020-02-26T10:00:00"),
+        ],
+        compress=True,
+    )
+    write_feed(
+        feeds_dir / "2020/02/01/0600/pitt_city_council.json",
+        [ocd_item("p1", "2020-02-03T10:00:00")],
+    )
+    write_feed(feeds_dir / "latest.json", [ocd_item("x", "2020-02-03T10:00:00")])
+    dataset_dir = tmp_path / "dataset"
+    counts = compact_feeds(str(feeds_dir), str(dataset_dir))
+    assert counts == {"alle_county": 3, "pitt_city_council": 1}
+    return str(dataset_dir)
+
+
+def test_latest_version_kept(dataset_dir):
+    table = read_meetings(dataset_dir, spiders=["alle_county"])
+    statuses = dict(
+        zip(table.column("id").to_pylist(), table.column("status").to_pylist())
+    )
+    assert statuses == {"a1": "tentative", "a2": "cancelled", "a3": "tentative"}
+    assert table.column("start").to_pylist()[0] == datetime(2020, 1, 15, 10)
+
+
+def test_partition_filters(dataset_dir):
+    table = read_meetings(
+        dataset_dir, start=datetime(2020, 2, 1), columns=["id", "spider"]
+    )
+    assert table.column_names == ["id", "spider"]
+    assert sorted(table.column("id").to_pylist()) == ["a2", "a3", "p1"]
+    assert monthly_counts(dataset_dir, "alle_county") == {(2020, 1): 1, (2020, 2): 2}
+
+
+def test_recompact_replaces_spider(dataset_dir, tmp_path):
+    feeds_dir = tmp_path / "feeds"
+    write_feed(
+        feeds_dir / "2020/03/01/0600/pitt_city_council.json",
+        [ocd_item("p2", "2020-03-02T10:00:00")],
+    )
+    compact_feeds(str(feeds_dir), dataset_dir, spider_names=["pitt_city_council"])
+    table = read_meetings(dataset_dir, spiders=["pitt_city_council"], columns=["id"])
+    assert sorted(table.column("id").to_pylist()) == ["p1", "p2"]
+    assert read_meetings(dataset_dir, spiders=["alle_county"]).num_rows == 3
@@ -0,0 +1,102 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from scrapy.settings import Settings
+
+from city_scrapers.commands.combinefeeds import Command
+
+now = datetime.now().replace(microsecond=0)
+
+
+class FakeSpiderLoader:
+    def list(self):
+        return ["spider_a", "spider_b"]
+
+
+class FakeCrawlerProcess:
+    spider_loader = FakeSpiderLoader()
+
+
+def write_feed(path, starts):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        "\n".join(
+            json.dumps({"_id": str(start), "start_time": start.isoformat()})
+            for start in starts
+        )
+    )
+
+
+def run_command(tmp_path, **settings):
+    command = Command()
+    command.settings = Settings(
+        {
+            "FEED_URI": str(
+                tmp_path / "%(year)s" / "%(month)s" / "%(day)s" / "%(name)s.json"
+            ),
+            "CITY_SCRAPERS_DIFF_FEED_PREFIX": "%Y/%m/%d",
+            "ITEM_PIPELINES": {
+                "city_scrapers_core.pipelines.OpenCivicDataPipeline": 400
+            },
+            **settings,
+        }
+    )
+    command.crawler_process = FakeCrawlerProcess()
+    command.run([], None)
+
+
+def feed_starts(text):
+    return [json.loads(line)["start_time"] for line in text.split("\n")]
+
+
+def test_combine_local(tmp_path):
+    day_dir = tmp_path / now.strftime("%Y/%m/%d")
+    upcoming = [now + timedelta(days=days) for days in (1, 3, 5)]
+    past = [now - timedelta(days=days) for days in (10, 4)]
+    write_feed(day_dir / "0600" / "spider_a.json", [now])
+    write_feed(day_dir / "0700" / "spider_a.json", [upcoming[2], past[1], upcoming[0]])
+    write_feed(day_dir / "0700" / "spider_b.json", [upcoming[1], past[0]])
+
+    run_command(tmp_path)
+
+    latest = feed_starts((tmp_path / "latest.json").read_text())
+    assert latest == [dt.isoformat() for dt in past + upcoming]
+    upcoming_feed = feed_starts((tmp_path / "upcoming.json").read_text())
+    assert upcoming_feed == [dt.isoformat() for dt in upcoming]
+    assert (tmp_path / "spider_a.json").read_text() == (
+        day_dir / "0700" / "spider_a.json"
+    ).read_text()
+
+
+def test_combine_local_ignores_compressed_copies(tmp_path):
+    day_dir = tmp_path / now.strftime("%Y/%m/%d") / "0600"
+    write_feed(day_dir / "spider_a.json", [now])
+    with gzip.open(str(day_dir / "spider_a.json.gz"), "wt") as f:
+        f.write(json.dumps({"_id": "x", "start_time": now.isoformat()}))
+
+    run_command(tmp_path)
+
+    assert feed_starts((tmp_path / "latest.json").read_text()) == [now.isoformat()]
+    assert (tmp_path / "spider_a.json").exists()
+    assert not (tmp_path / "spider_a.json.gz").exists()
+
+
+def test_combine_local_gzip(tmp_path):
+    write_feed(tmp_path / now.strftime("%Y/%m/%d") / "spider_b.json", [now])
+
+    run_command(tmp_path, CITY_SCRAPERS_COMBINEFEEDS_GZIP=True)
+
+    with gzip.open(str(tmp_path / "latest.json.gz"), "rt") as f:
+        assert feed_starts(f.read()) == [now.isoformat()]
+
+
+def test_combine_local_runs(tmp_path):
+    starts = [now + timedelta(days=days) for days in (4, -2, 6, 1, -8, 3, 2)]
+    write_feed(tmp_path / now.strftime("%Y/%m/%d") / "spider_a.json", starts)
+
+    # Feeds larger than a run are sorted in chunks and merged
+    run_command(tmp_path, CITY_SCRAPERS_COMBINEFEEDS_RUN_SIZE=2)
+
+    latest = feed_starts((tmp_path / "latest.json").read_text())
+    assert latest == [dt.isoformat() for dt in sorted(starts)]
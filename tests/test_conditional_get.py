@@ -0,0 +1,118 @@
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from os.path import dirname, join
+
+import pytest
+from scrapy import Request, Spider
+from scrapy.http import HtmlResponse, Response
+from scrapy.utils.test import get_crawler
+
+from city_scrapers.middlewares import ConditionalGetMiddleware
+
+with open(join(dirname(__file__), "files", "pitt_art_commission.html"), "rb") as f:
+    page_body = f.read()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves a static schedule page with an ETag, like most of our sources"""
+
+    etag = '"v1"'
+    full_responses = 0
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == StandInHandler.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        StandInHandler.full_responses += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", StandInHandler.etag)
+        self.send_header("Content-Length", str(len(page_body)))
+        self.end_headers()
+        self.wfile.write(page_body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = HTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}/schedule".format(server.server_port)
+    server.shutdown()
+
+
+def download(request):
+    """Fetch a Scrapy request from the stand-in server and return a Scrapy response"""
+    headers = {
+        name.decode(): values[-1].decode() for name, values in request.headers.items()
+    }
+    try:
+        res = urllib.request.urlopen(
+            urllib.request.Request(request.url, headers=headers)
+        )
+        status, res_headers, body = res.status, res.headers, res.read()
+    except urllib.error.HTTPError as e:
+        status, res_headers, body = e.code, e.headers, b""
+    return Response(
+        request.url, status=status, headers=dict(res_headers.items()), body=body
+    )
+
+
+def crawl(middleware, spider, url):
+    request = Request(url)
+    assert middleware.process_request(request, spider) is None
+    return middleware.process_response(request, download(request), spider)
+
+
+def test_replays_not_modified(tmpdir, server_url):
+    spider = Spider(name="pitt_art_commission")
+    settings = {"CITY_SCRAPERS_CONDITIONAL_GET_PATH": str(tmpdir.join("cache.db"))}
+    StandInHandler.full_responses = 0
+
+    crawler = get_crawler(Spider, settings)
+    middleware = ConditionalGetMiddleware.from_crawler(crawler)
+    middleware.spider_opened(spider)
+    first = crawl(middleware, spider, server_url)
+    middleware.spider_closed(spider)
+    assert first.status == 200
+    assert crawler.stats.get_value("conditional_get/stored") == 1
+
+    crawler = get_crawler(Spider, settings)
+    middleware = ConditionalGetMiddleware.from_crawler(crawler)
+    middleware.spider_opened(spider)
+    second = crawl(middleware, spider, server_url)
+    middleware.spider_closed(spider)
+
+    assert StandInHandler.full_responses == 1
+    assert second.status == 200
+    assert "cached" in second.flags
+    assert second.body == page_body
+    assert isinstance(second, HtmlResponse)
+    assert second.xpath("//title/text()").get()
+    assert crawler.stats.get_value("conditional_get/hit_ratio") == 1
+
+
+def test_expired_downloads_again(tmpdir, server_url):
+    spider = Spider(name="pitt_art_commission")
+    settings = {
+        "CITY_SCRAPERS_CONDITIONAL_GET_PATH": str(tmpdir.join("cache.db")),
+        "CITY_SCRAPERS_CONDITIONAL_GET_EXPIRATION_SECS": 60,
+    }
+    StandInHandler.full_responses = 0
+    for _ in range(2):
+        crawler = get_crawler(Spider, settings)
+        middleware = ConditionalGetMiddleware.from_crawler(crawler)
+        middleware.spider_opened(spider)
+        crawl(middleware, spider, server_url)
+        # Age the stored response past the expiration before the next run
+        middleware.store.conn.execute("UPDATE responses SET stored_at = 0")
+        middleware.store.conn.commit()
+        middleware.spider_closed(spider)
+    assert StandInHandler.full_responses == 2
+    assert crawler.stats.get_value("conditional_get/hit_ratio") == 0
@@ -0,0 +1,109 @@
+from datetime import date, datetime, time, timedelta
+from os.path import dirname, join
+
+import pytest
+from city_scrapers_core.utils import file_response
+from dateutil.parser import parse
+
+from city_scrapers.utils.dates import (
+    find_dates,
+    parse_date,
+    parse_dates,
+    parse_datetime,
+    parse_time,
+)
+
+# Every day from 2019 through 2021
+DAYS = [datetime(2019, 1, 1) + timedelta(days=idx) for idx in range(365 * 3 + 1)]
+
+
+@pytest.mark.parametrize(
+    "fmt", ["%A, %B %d, %Y", "%B %d, %Y", "%b. %d %Y", "%a %b %d, %Y -\xa0"]
+)
+def test_parse_date_matches_strptime(fmt):
+    for day in DAYS:
+        text = day.strftime(fmt)
+        assert parse_date(text) == datetime.strptime(text, fmt).date(), text
+
+
+def test_parse_datetime_matches_strptime():
+    fmt = "%B %d, %Y | %I:%M%p"
+    for idx, day in enumerate(DAYS):
+        text = (day + timedelta(minutes=idx * 7 % 1440)).strftime(fmt)
+        assert parse_datetime(text) == datetime.strptime(text, fmt), text
+
+
+def test_parse_date_matches_dateutil():
+    response = file_response(
+        join(dirname(__file__), "files", "pa_utility.html"),
+        url="http://www.puc.pa.gov/",
+    )
+    lines = [
+        text
+        for text in response.css(".center").xpath(".//text()").getall()
+        if text.lstrip("\r").startswith("\n\t") and any(c.isdigit() for c in text)
+    ]
+    assert len(lines) > 0
+    for text in lines:
+        assert parse_date(text) == parse(text).date(), text
+
+
+def test_free_text():
+    assert parse_date("*September 20 – (Allegheny County Airport)", 2019) == date(
+        2019, 9, 20
+    )
+    assert parse_date("August – NO BOARD MEETING", 2019) is None
+    assert parse_date("Mayor's office, June 3rd", 2019) == date(2019, 6, 3)
+    assert parse_date("February 30, 2020") is None
+    assert parse_date("March 4") is None
+    assert parse_time("9:30 a.m.") == time(9, 30)
+    assert parse_time("12 noon") == time(12)
+    assert parse_time("12:15 AM") == time(0, 15)
+    assert parse_time("18:30") == time(18, 30)
+    assert parse_datetime("10am on Tues., Jan 7, 2020") == datetime(2020, 1, 7, 10)
+    assert parse_datetime("Jan 7, 2020", default_time=time(9)) == datetime(
+        2020, 1, 7, 9
+    )
+    assert find_dates("january 13, 2020<br>march 9,  2020<br>june 8 2020") == [
+        date(2020, 1, 13),
+        date(2020, 3, 9),
+        date(2020, 6, 8),
+    ]
+
+
+@pytest.mark.parametrize(
+    "fmt",
+    ["%m/%d/%Y", "%A, %B %d, %Y", "%B%d,%Y", "%b %d %y %I:%M %p", "%Y-%m-%d %H:%M:%S"],
+)
+def test_parse_dates_matches_strptime(fmt):
+    strings = [
+        (day + timedelta(minutes=idx * 7 % 1440)).strftime(fmt)
+        for idx, day in enumerate(DAYS)
+    ]
+    strings += ["", "  ", "February 30, 2020", "13/01/2020", "2/29/2021"]
+    expected = []
+    for value in strings:
+        try:
+            expected.append(datetime.strptime(value, fmt))
+        except ValueError:
+            expected.append(None)
+    assert parse_dates(strings, fmt) == expected
+
+
+def test_parse_dates_failures():
+    assert parse_dates([], "%m/%d/%Y") == []
+    assert parse_dates(["1/2/2020", None, "1/2/20"], "%m/%d/%Y") == [
+        datetime(2020, 1, 2),
+        None,
+        None,
+    ]
+    # Lists with a string containing a newline are parsed with strptime
+    assert parse_dates(["1/2/2020", "x\ny", "1/3/2020"], "%m/%d/%Y") == [
+        datetime(2020, 1, 2),
+        None,
+        datetime(2020, 1, 3),
+    ]
+    assert parse_dates(["1/2/2020\n"], "%m/%d/%Y") == [None]
+    # Formats with other directives are parsed with strptime
+    assert parse_dates(["2020-01-02T10", "x"], "%Y-%m-%dT%H%z") == [None, None]
+    assert parse_dates(["Q1 2020"], "Q1 %Y") == [datetime(2020, 1, 1)]
@@ -0,0 +1,62 @@
+import io
+import json
+
+import pytest
+from scrapy.utils.test import get_crawler
+
+from city_scrapers.exporters import (
+    GZIP_MAGIC,
+    ZSTD_MAGIC,
+    CompressedJsonLinesItemExporter,
+    iter_feed_lines,
+)
+
+items = [{"title": "Board Meeting", "index": idx} for idx in range(50)]
+
+
+def export(file, exporter):
+    exporter.start_exporting()
+    for item in items:
+        exporter.export_item(item)
+    exporter.finish_exporting()
+    return file.getvalue()
+
+
+@pytest.mark.parametrize(
+    "compression,magic",
+    [(None, b'{"title'), ("gzip", GZIP_MAGIC), ("zstd", ZSTD_MAGIC)],
+)
+def test_round_trip(compression, magic):
+    file = io.BytesIO()
+    output = export(
+        file, CompressedJsonLinesItemExporter(file, compression=compression)
+    )
+    assert output.startswith(magic)
+    assert not file.closed
+    assert [json.loads(line) for line in iter_feed_lines(io.BytesIO(output))] == items
+
+
+def test_settings():
+    crawler = get_crawler(
+        settings_dict={
+            "CITY_SCRAPERS_FEED_COMPRESSION": "gzip",
+            "CITY_SCRAPERS_FEED_COMPRESSION_LEVEL": "1",
+        }
+    )
+    file = io.BytesIO()
+    fast_output = export(
+        file, CompressedJsonLinesItemExporter.from_crawler(crawler, file)
+    )
+    assert fast_output.startswith(GZIP_MAGIC)
+    # The gzip header's extra flags are 4 for the fastest compression level
+    assert fast_output[8] == 4
+
+
+def test_concatenated_feeds():
+    output = b""
+    for compression in ["zstd", "zstd"]:
+        file = io.BytesIO()
+        output += export(
+            file, CompressedJsonLinesItemExporter(file, compression=compression)
+        )
+    assert len(list(iter_feed_lines(io.BytesIO(output)))) == len(items) * 2
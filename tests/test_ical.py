@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from os.path import dirname, join
+
+import ics
+import pytest
+from city_scrapers_core.constants import BOARD
+from city_scrapers_core.spiders import CityScrapersSpider
+from dateutil.tz import UTC, gettz
+from freezegun import freeze_time
+from scrapy.http import TextResponse
+from scrapy.utils.test import get_crawler
+
+from city_scrapers.ical import ICalEventsMixin
+from city_scrapers.utils import iter_ical_events
+
+FIXTURE = join(
+    dirname(__file__), "files", "bethel_park", "bethel_park_public_meetings.ics"
+)
+
+CALENDAR = """BEGIN:VCALENDAR\r
+BEGIN:VEVENT\r
+UID:1@example.com\r
+SUMMARY:Board \\; Committee\\, Meeting\\nRoom 2 \\\\n\r
+DTSTART;TZID=America/New_York:20200105T183000\r
+DURATION:PT1H30M\r
+LOCATION;ALTREP="http://example.com/a:b;c":City Hall\r
+DESCRIPTION:Agenda posted at caf\xc3\r
+ \xa9\r
+BEGIN:VALARM\r
+DESCRIPTION:Reminder\r
+END:VALARM\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:2@example.com\r
+DTSTART;VALUE=DATE:20200106\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:3@example.com\r
+DTSTART:20200107T120000Z\r
+DTEND:20200107T1300\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+def test_iter_ical_events():
+    first, second, third = iter_ical_events(CALENDAR.encode("latin-1"))
+    assert first.text("SUMMARY") == "Board ; Committee, Meeting\nRoom 2 \\n"
+    assert first.text("LOCATION") == "City Hall"
+    assert first.params("LOCATION")["ALTREP"] == "http://example.com/a:b;c"
+    # Folded lines are joined before decoding characters split between them
+    assert first.text("DESCRIPTION") == "Agenda posted at café"
+    assert first.begin == datetime(2020, 1, 5, 18, 30, tzinfo=gettz("America/New_York"))
+    assert first.end - first.begin == timedelta(hours=1, minutes=30)
+
+    assert second.all_day
+    assert second.end == datetime(2020, 1, 7)
+    assert second.text("SUMMARY") is None
+
+    assert third.begin == datetime(2020, 1, 7, 12, tzinfo=UTC)
+    assert third.end == datetime(2020, 1, 7, 13)
+
+
+def test_matches_ics_library():
+    with open(FIXTURE, "rb") as f:
+        events = list(iter_ical_events(f))
+    with open(FIXTURE, encoding="utf-8") as f:
+        ics_events = {event.uid: event for event in ics.Calendar(f.read()).events}
+
+    assert len(events) == len(ics_events)
+    for event in events:
+        ics_event = ics_events[event.text("UID")]
+        assert event.text("SUMMARY") == ics_event.name
+        assert event.text("DESCRIPTION") == ics_event.description
+        assert event.text("LOCATION") == ics_event.location
+        assert event.text("URL") == ics_event.url
+        assert event.begin == ics_event.begin.datetime
+        assert event.end == ics_event.end.datetime
+
+
+RECURRING_CALENDAR = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+UID:board@example.com
+DTSTAMP:{stamp}
+SUMMARY:Board Meeting
+DTSTART;TZID=America/New_York:20190102T180000
+DTEND;TZID=America/New_York:20190102T193000
+RRULE:FREQ=MONTHLY;BYDAY=1WE
+EXDATE;TZID=America/New_York:20200506T180000
+SEQUENCE:{sequence}
+END:VEVENT
+BEGIN:VEVENT
+UID:board@example.com
+RECURRENCE-ID;TZID=America/New_York:20200401T180000
+SUMMARY:Board Meeting Rescheduled
+DTSTART:20200408T220000Z
+END:VEVENT
+BEGIN:VEVENT
+UID:hearing@example.com
+DTSTAMP:{stamp}
+SUMMARY:Public Hearing
+DTSTART;TZID=America/New_York:20200315T100000
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+class ICalSpider(ICalEventsMixin, CityScrapersSpider):
+    name = "ical"
+    agency = "Example Agency"
+    timezone = "America/New_York"
+    start_urls = ["https://example.com/calendar.ics"]
+    ical_past_days = 30
+    ical_future_days = 90
+
+
+def calendar_response(stamp="20200301T120000Z", sequence=0):
+    return TextResponse(
+        ICalSpider.start_urls[0],
+        body=RECURRING_CALENDAR.format(stamp=stamp, sequence=sequence).encode(),
+    )
+
+
+@pytest.fixture
+def crawler(tmpdir):
+    return get_crawler(
+        ICalSpider, {"CITY_SCRAPERS_SPIDER_CACHE_PATH": str(tmpdir.join("cache.db"))}
+    )
+
+
+def parse(crawler, response):
+    spider = ICalSpider.from_crawler(crawler)
+    with freeze_time("2020-03-20"):
+        items = list(spider.parse(response))
+    spider.closed("finished")
+    return sorted(items, key=lambda item: item["start"])
+
+
+def test_recurrences(crawler):
+    items = parse(crawler, calendar_response())
+    assert [(item["title"], item["start"]) for item in items] == [
+        ("Board Meeting", datetime(2020, 3, 4, 18)),
+        ("Public Hearing", datetime(2020, 3, 15, 10)),
+        # The override replaces the April occurrence, and May's is excluded
+        ("Board Meeting Rescheduled", datetime(2020, 4, 8, 18)),
+        ("Board Meeting", datetime(2020, 6, 3, 18)),
+    ]
+    assert items[0]["end"] == datetime(2020, 3, 4, 19, 30)
+    assert items[0]["source"] == ICalSpider.start_urls[0]
+    assert items[1]["end"] is None
+    assert crawler.stats.get_value("ical/parsed") == 3
+
+
+def test_unchanged_events(crawler):
+    first = parse(crawler, calendar_response())
+    # DTSTAMP changes on every export without events changing
+    assert parse(crawler, calendar_response(stamp="20200302T120000Z")) == first
+    assert crawler.stats.get_value("ical/cached") == 3
+    assert crawler.stats.get_value("ical/parsed") == 3
+
+    assert parse(crawler, calendar_response(sequence=1)) == first
+    assert crawler.stats.get_value("ical/parsed") == 4
+
+
+def test_changed_spider(crawler, monkeypatch):
+    parse(crawler, calendar_response())
+    monkeypatch.setattr(ICalSpider, "ical_classification", BOARD)
+    items = parse(crawler, calendar_response())
+    # Cached meetings are built again once the spider changes
+    assert crawler.stats.get_value("ical/cached") is None
+    assert crawler.stats.get_value("ical/parsed") == 6
+    assert {item["classification"] for item in items} == {BOARD}
+
+
+def test_unknown_timezone(crawler, caplog):
+    with open(join(dirname(__file__), "files", "ical_outlook.ics"), "rb") as f:
+        response = TextResponse(ICalSpider.start_urls[0], body=f.read())
+    items = parse(crawler, response)
+    # Outlook's Windows zone names are read in the spider's timezone, not UTC
+    assert [(item["start"], item["end"]) for item in items] == [
+        (datetime(2020, 3, 25, 18), datetime(2020, 3, 25, 19, 30))
+    ]
+    assert "Eastern Standard Time" in caplog.text
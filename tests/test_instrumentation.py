@@ -0,0 +1,87 @@
+import functools
+import json
+from collections import deque
+from os.path import dirname, join
+from types import SimpleNamespace
+
+from city_scrapers_core.pipelines import DefaultValuesPipeline, MeetingPipeline
+from city_scrapers_core.utils import file_response
+from freezegun import freeze_time
+from scrapy import Request
+from scrapy.utils.test import get_crawler
+
+from city_scrapers.extensions import InstrumentationExtension
+from city_scrapers.extensions.instrumentation import histogram
+from city_scrapers.spiders.pitt_ethics_board import PittEthicsBoardSpider
+
+test_response = file_response(
+    join(dirname(__file__), "files", "pitt_ethics_board.html"),
+    url="http://pittsburghpa.gov/ehb/ehb-meetings",
+)
+
+
+def coroutine_wrapper(method):
+    """Wrap a pipeline method like older versions of Scrapy do to accept coroutines"""
+
+    @functools.wraps(method)
+    def wrapped(*args):
+        return method(*args)
+
+    return wrapped
+
+
+def test_histogram():
+    summary = histogram([float(value) for value in range(1, 101)])
+    assert summary["count"] == 100
+    assert summary["p50"] == 51.0
+    assert summary["p95"] == 95.0
+    assert summary["max"] == 100.0
+    assert histogram([])["p50"] is None
+
+
+@freeze_time("2020-02-09")
+def test_report(tmp_path):
+    crawler = get_crawler(
+        PittEthicsBoardSpider,
+        {"CITY_SCRAPERS_INSTRUMENTATION_PATH": str(tmp_path / "%(name)s.json")},
+    )
+    spider = PittEthicsBoardSpider()
+    pipelines = [DefaultValuesPipeline(), MeetingPipeline()]
+    itemproc = SimpleNamespace(
+        methods={
+            "process_item": deque(
+                [
+                    pipelines[0].process_item,
+                    coroutine_wrapper(pipelines[1].process_item),
+                ]
+            )
+        }
+    )
+    crawler.engine = SimpleNamespace(scraper=SimpleNamespace(itemproc=itemproc))
+    ext = InstrumentationExtension.from_crawler(crawler)
+    ext.spider_opened(spider)
+
+    request = Request(test_response.url)
+    ext.request_scheduled(request, spider)
+    request.meta["download_latency"] = 0.25
+    ext.response_received(test_response, request, spider)
+    for item in request.callback(test_response):
+        for process_item in itemproc.methods["process_item"]:
+            item = process_item(item, spider)
+        ext.item_scraped(item, spider)
+
+    # Rescheduling the same callback, as retries do, doesn't wrap it twice
+    callback = request.callback
+    ext.request_scheduled(request, spider)
+    assert request.callback is callback
+
+    ext.spider_closed(spider, "finished")
+    with open(str(tmp_path / "pitt_ethics_board.json")) as f:
+        report = json.load(f)
+    parse_report = report["callbacks"]["parse"]
+    assert parse_report["download_latency"]["max"] == 0.25
+    assert parse_report["response_bytes"]["max"] == len(test_response.body)
+    assert parse_report["callback_time"]["count"] == 1
+    assert parse_report["item_count"] == report["item_count"] > 0
+    assert set(report["pipelines"]) == {"DefaultValuesPipeline", "MeetingPipeline"}
+    assert report["pipelines"]["MeetingPipeline"]["count"] == report["item_count"]
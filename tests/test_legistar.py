@@ -0,0 +1,394 @@
+import json
+import subprocess
+import sys
+import threading
+import urllib.request
+from datetime import datetime, timedelta
+from os.path import dirname, join
+from urllib.parse import parse_qsl, unquote
+
+import pytest
+from freezegun import freeze_time
+from scrapy import Request
+from scrapy.http import HtmlResponse, TextResponse
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from city_scrapers.legistar import YEAR_TARGET, LegistarApiServer
+from city_scrapers.spiders.alle_county import AlleCountySpider
+from city_scrapers.spiders.pitt_city_council import PittCityCouncilSpider
+
+
+def api_event(event_id, event_date, modified, **kwargs):
+    return dict(
+        {
+            "EventId": event_id,
+            "EventGuid": "GUID-{}".format(event_id),
+            "EventLastModifiedUtc": modified,
+            "EventBodyId": 26127,
+            "EventBodyName": "County Council",
+            "EventDate": event_date + "T00:00:00",
+            "EventTime": "5:00 PM",
+            "EventLocation": "Regular Meeting, Fourth Floor, Gold Room",
+            "EventComment": None,
+            "EventAgendaFile": None,
+            "EventMinutesFile": None,
+            "EventVideoPath": None,
+            "EventInSiteURL": "https://alleghenycounty.legistar.com/MeetingDetail.aspx"
+            "?LEGID={}".format(event_id),
+        },
+        **kwargs
+    )
+
+
+def serve(events, page_size=1000):
+    server = LegistarApiServer(("127.0.0.1", 0), events, page_size=page_size)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def api_crawler(spider_cls, server, tmpdir):
+    return get_crawler(
+        spider_cls,
+        {
+            "CITY_SCRAPERS_SPIDER_CACHE_PATH": str(tmpdir.join("cache.db")),
+            "CITY_SCRAPERS_LEGISTAR_API_URL": "http://127.0.0.1:{}/v1/".format(
+                server.server_port
+            ),
+        },
+    )
+
+
+@pytest.fixture
+def server():
+    server = serve(
+        {
+            "alleghenycounty": [
+                api_event(1, "2018-06-05", "2018-06-01T10:00:00"),
+                api_event(
+                    2,
+                    "2019-01-22",
+                    "2019-01-10T10:00:00.5",
+                    EventAgendaFile="https://alleghenycounty.legistar.com/View.ashx"
+                    "?M=A&ID=2",
+                ),
+                api_event(3, "2019-02-05", "2019-01-20T10:00:00"),
+            ]
+        },
+        page_size=2,
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def crawler(server, tmpdir, monkeypatch):
+    monkeypatch.setattr(AlleCountySpider, "legistar_page_size", server.page_size)
+    return api_crawler(AlleCountySpider, server, tmpdir)
+
+
+def crawl(crawler, run_date, **kwargs):
+    """Run the requests of a spider against the stand-in API and return its items"""
+    with freeze_time(run_date):
+        spider = crawler.spidercls.from_crawler(crawler, **kwargs)
+        items = []
+        queue = list(spider.start_requests())
+        while queue:
+            request = queue.pop(0)
+            assert request.headers["Accept"] == b"application/json"
+            body = urllib.request.urlopen(request.url).read()
+            response = TextResponse(request.url, body=body, request=request)
+            for output in request.callback(response, **request.cb_kwargs):
+                if isinstance(output, Request):
+                    queue.append(output)
+                else:
+                    items.append(output)
+        spider.closed("finished")
+    return items
+
+
+def test_legistar_api(crawler, server):
+    items = crawl(crawler, "2019-01-23")
+    # Both pages of events since 2015 are requested on the first run
+    assert len(server.requests) == 2
+    assert "$filter=EventDate ge datetime'2015-01-01'" in unquote(server.requests[0])
+    assert [item["start"] for item in items] == [
+        datetime(2018, 6, 5, 17),
+        datetime(2019, 1, 22, 17),
+        datetime(2019, 2, 5, 17),
+    ]
+    item = items[1]
+    assert item["title"] == "County Council"
+    assert item["end"] == datetime(2019, 1, 22, 20)
+    assert item["source"] == (
+        "https://alleghenycounty.legistar.com/DepartmentDetail.aspx?ID=26127"
+    )
+    assert item["links"] == [
+        {
+            "href": "https://alleghenycounty.legistar.com/View.ashx?M=A&ID=2",
+            "title": "Agenda",
+        }
+    ]
+    assert item["location"]["address"] == (
+        "Regular Meeting, Fourth Floor, Gold Room, 436 Grant Street, Pittsburgh, "
+        "PA 15219"
+    )
+
+    events = server.events["alleghenycounty"]
+    events[2] = dict(
+        events[2],
+        EventLocation="Public Hearing, Gold Room",
+        EventLastModifiedUtc="2019-01-25T08:00:00",
+    )
+    events.pop(1)
+    events.append(api_event(4, "2019-02-19", "2019-01-26T09:00:00"))
+    del server.requests[:]
+
+    items = crawl(crawler, "2019-02-01")
+    # Only changed events are requested, along with the IDs in the date window
+    assert len(server.requests) == 4
+    assert "EventLastModifiedUtc gt datetime'2019-01-20T10:00:00'" in unquote(
+        server.requests[0]
+    )
+    assert "$select=EventId" in server.requests[2]
+    assert "datetime'2018-11-24'" in unquote(server.requests[2])
+    # Events before the window and deleted events are dropped
+    assert [item["start"] for item in items] == [
+        datetime(2019, 2, 5, 17),
+        datetime(2019, 2, 19, 17),
+    ]
+    assert items[0]["classification"] == "Forum"
+
+    # Unchanged events still come from the cache
+    del server.requests[:]
+    items = crawl(crawler, "2019-02-02")
+    assert "datetime'2019-01-26T09:00:00'" in unquote(server.requests[0])
+    assert len(items) == 2
+
+    # Full backfills request everything again
+    del server.requests[:]
+    items = crawl(crawler, "2019-02-03", full_backfill="true")
+    assert "datetime'2015-01-01'" in unquote(server.requests[0])
+    assert len(items) == 3
+
+
+def test_pitt_city_council_api(tmpdir):
+    server = serve(
+        {
+            "pittsburgh": [
+                api_event(
+                    1,
+                    "2019-02-27",
+                    "2019-02-01T10:00:00",
+                    EventBodyName="Standing Committee",
+                    EventTime="10:00 AM",
+                    EventLocation="Council Chambers",
+                    EventComment="Rescheduled from February 26",
+                    EventInSiteURL=None,
+                ),
+                api_event(
+                    2,
+                    "2019-03-05",
+                    "2019-02-01T10:00:00",
+                    EventBodyName="City Council",
+                    EventTime="10:00 AM",
+                    EventInSiteURL="https://pittsburgh.legistar.com/MeetingDetail.aspx"
+                    "?ID=2",
+                ),
+            ]
+        }
+    )
+    try:
+        items = crawl(api_crawler(PittCityCouncilSpider, server, tmpdir), "2019-02-25")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [(item["title"], item["start"]) for item in items] == [
+        ("Standing Committee", datetime(2019, 2, 27, 10)),
+        ("City Council", datetime(2019, 3, 5, 10)),
+    ]
+    assert items[0]["classification"] == "Committee"
+    assert items[0]["description"] == "Rescheduled from February 26"
+    assert items[0]["location"]["address"] == "414 Grant Street, Pittsburgh, PA 15219"
+    # Events without a detail page link to the calendar of the site
+    assert items[0]["source"] == "https://pittsburgh.legistar.com/Calendar.aspx"
+    assert items[1]["source"] == (
+        "https://pittsburgh.legistar.com/MeetingDetail.aspx?ID=2"
+    )
+
+
+def test_pitt_city_council_calendar(tmpdir):
+    crawler = get_crawler(
+        PittCityCouncilSpider,
+        {
+            "CITY_SCRAPERS_SPIDER_CACHE_PATH": str(tmpdir.join("cache.db")),
+            "CITY_SCRAPERS_LEGISTAR_API_URL": "",
+        },
+    )
+    with open(join(dirname(__file__), "files", "legistar", "calendar.html"), "rb") as f:
+        body = f.read()
+
+    with freeze_time("2019-01-23"):
+        spider = PittCityCouncilSpider.from_crawler(crawler)
+        request = list(spider.start_requests())[-1]
+        assert request.url == "https://pittsburgh.legistar.com/Calendar.aspx"
+        outputs = list(
+            spider._parse_calendar_page(
+                HtmlResponse(request.url, body=body, request=request), year=2019
+            )
+        )
+    spider.closed("finished")
+    items = [output for output in outputs if not isinstance(output, Request)]
+    assert [(item["title"], item["start"]) for item in items] == [
+        ("County Council", datetime(2019, 1, 22, 17)),
+        ("Committee on Budget and Finance", datetime(2019, 1, 29, 16, 30)),
+    ]
+    assert items[1]["classification"] == "Committee"
+    assert items[0]["source"] == (
+        "https://pittsburgh.legistar.com/MeetingDetail.aspx?ID=673968&GUID=2D730472"
+        "&Options=info&Search="
+    )
+
+
+def test_calendar_years(tmpdir):
+    crawler = get_crawler(
+        AlleCountySpider,
+        {
+            "CITY_SCRAPERS_SPIDER_CACHE_PATH": str(tmpdir.join("cache.db")),
+            "CITY_SCRAPERS_LEGISTAR_API_URL": "",
+        },
+    )
+    with open(join(dirname(__file__), "files", "legistar", "calendar.html"), "rb") as f:
+        body = f.read()
+
+    with freeze_time("2019-01-23"):
+        spider = AlleCountySpider.from_crawler(crawler, full_backfill="true")
+        requests = list(spider.start_requests())
+    # Every year in the window gets its own session
+    assert [r.meta["cookiejar"] for r in requests] == [
+        "legistar-{}".format(year) for year in range(2015, 2020)
+    ]
+    assert {r.url for r in requests} == {
+        "https://alleghenycounty.legistar.com/Calendar.aspx"
+    }
+
+    response = HtmlResponse(requests[-1].url, body=body, request=requests[-1])
+    request = next(spider._parse_calendar_session(response, year=2019))
+    form = dict(parse_qsl(request.body.decode()))
+    assert form["__VIEWSTATE"] == "VIEWSTATE-PAGE"
+    assert form["__EVENTVALIDATION"] == "VALIDATION-PAGE"
+    assert form["__EVENTTARGET"] == YEAR_TARGET
+    assert json.loads(form["ctl00_ContentPlaceHolder1_lstYears_ClientState"]) == {
+        "value": "2019"
+    }
+    assert request.meta["cookiejar"] == "legistar-2019"
+
+    with freeze_time("2019-01-23"):
+        outputs = list(
+            spider._parse_calendar_page(
+                HtmlResponse(request.url, body=body, request=request), year=2019
+            )
+        )
+    items, next_page = outputs[:-1], outputs[-1]
+    assert [item["title"] for item in items] == [
+        "County Council",
+        "Committee on Budget and Finance",
+    ]
+    assert items[0]["start"] == datetime(2019, 1, 22, 17)
+    assert items[0]["source"] == (
+        "https://alleghenycounty.legistar.com/DepartmentDetail.aspx?ID=26127&GUID=0B26890F"
+    )
+    assert items[0]["links"] == [
+        {
+            "href": "https://alleghenycounty.legistar.com/View.ashx?M=A&ID=673968&GUID=2D730472",
+            "title": "Agenda",
+        }
+    ]
+    next_form = dict(parse_qsl(next_page.body.decode()))
+    assert next_form["__EVENTTARGET"].endswith("$ctl03")
+    assert next_form["ctl00_ContentPlaceHolder1_lstYears_ClientState"] == (
+        form["ctl00_ContentPlaceHolder1_lstYears_ClientState"]
+    )
+    assert next_page.meta["cookiejar"] == "legistar-2019"
+
+    last_body = body.replace(b'<a href="javascript:__doPostBack', b"<span")
+    outputs = list(
+        spider._parse_calendar_page(
+            HtmlResponse(next_page.url, body=last_body, request=next_page), year=2019
+        )
+    )
+    # Meetings already seen on other pages are skipped
+    assert outputs == []
+    assert crawler.stats.get_value("legistar/year_pages/2019") == 2
+    assert crawler.stats.get_value("legistar/year_seconds/2019") >= 0
+    spider.closed("finished")
+
+
+def test_legistar_settings():
+    settings = Settings({"CITY_SCRAPERS_LEGISTAR_CONCURRENCY": 4})
+    AlleCountySpider.update_settings(settings)
+    assert settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN") == 4
+    assert settings.getdict("DOWNLOAD_HANDLERS")["https"] == (
+        "city_scrapers.handlers.SharedPoolDownloadHandler"
+    )
+
+    settings = Settings({"CITY_SCRAPERS_LEGISTAR_CONCURRENCY": 4})
+    settings.set("CONCURRENT_REQUESTS_PER_DOMAIN", 2, priority="cmdline")
+    AlleCountySpider.update_settings(settings)
+    assert settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN") == 2
+
+
+def test_shared_pool_crawl(tmpdir):
+    # Events in the window of a crawl run today, since the crawl runs in a new process
+    event_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+    modified = datetime.now().strftime("%Y-%m-%dT00:00:00")
+    server = serve(
+        {
+            "alleghenycounty": [api_event(1, event_date, modified)],
+            "pittsburgh": [
+                api_event(
+                    2,
+                    event_date,
+                    modified,
+                    EventBodyName="City Council",
+                    EventTime="10:00 AM",
+                    EventInSiteURL=None,
+                )
+            ],
+        }
+    )
+    summary_path = str(tmpdir.join("summary.json"))
+    args = [sys.executable, "-m", "scrapy", "crawlall", "alle_county"]
+    args.append("pitt_city_council")
+    for name, value in [
+        ("CITY_SCRAPERS_SPIDER_CACHE_PATH", str(tmpdir.join("cache.db"))),
+        (
+            "CITY_SCRAPERS_LEGISTAR_API_URL",
+            "http://127.0.0.1:{}/v1/".format(server.server_port),
+        ),
+        ("CITY_SCRAPERS_CRAWLALL_SUMMARY", summary_path),
+        ("CITY_SCRAPERS_INSTRUMENTATION_PATH", str(tmpdir.join("%(name)s.json"))),
+        ("ROBOTSTXT_OBEY", "False"),
+    ]:
+        args.extend(["-s", "{}={}".format(name, value)])
+    try:
+        # Both spiders crawl in one process through SharedPoolDownloadHandler
+        subprocess.run(
+            args,
+            cwd=dirname(dirname(__file__)),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            check=True,
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with open(summary_path) as f:
+        runs = {run["name"]: run for run in json.load(f)["spiders"]}
+    assert runs["alle_county"]["item_count"] == 1
+    assert runs["pitt_city_council"]["item_count"] == 1
+    assert runs["pitt_city_council"]["error_count"] == 0
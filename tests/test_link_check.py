@@ -0,0 +1,137 @@
+from datetime import datetime
+
+import pytest
+from city_scrapers_core.items import Meeting
+from freezegun import freeze_time
+from scrapy import Request, Spider
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+from twisted.python.failure import Failure
+
+from city_scrapers.middlewares import LinkCheckMiddleware
+
+BASE_URL = "https://alleghenycounty.legistar.com/"
+SOURCE_URL = BASE_URL + "MeetingDetail.aspx?ID=1"
+
+
+class LinkSpider(Spider):
+    name = "alle_county"
+
+
+def meeting(*names):
+    return Meeting(
+        title="County Council",
+        start=datetime(2019, 1, 22, 17),
+        source=SOURCE_URL,
+        links=[
+            {"href": BASE_URL + "View.ashx?M={}".format(name), "title": name}
+            for name in names
+        ],
+    )
+
+
+@pytest.fixture
+def middleware(tmpdir):
+    crawler = get_crawler(
+        LinkSpider,
+        {
+            "CITY_SCRAPERS_LINK_CHECK_SPIDERS": ["alle_county"],
+            "CITY_SCRAPERS_LINK_CHECK_CONCURRENCY": 2,
+            "CITY_SCRAPERS_LINK_CHECK_EXPIRATION_SECS": 24 * 60 * 60,
+            "CITY_SCRAPERS_SPIDER_CACHE_PATH": str(tmpdir.join("cache.db")),
+        },
+    )
+    middleware = LinkCheckMiddleware.from_crawler(crawler)
+    middleware.spider_opened(LinkSpider())
+    yield middleware
+    middleware.spider_closed(LinkSpider())
+
+
+def respond(request, status=200, headers=None):
+    return list(
+        request.callback(
+            Response(request.url, status=status, headers=headers, request=request)
+        )
+    )
+
+
+def test_not_configured():
+    with pytest.raises(NotConfigured):
+        LinkCheckMiddleware.from_crawler(get_crawler(LinkSpider))
+
+
+def test_link_check(middleware):
+    spider = LinkSpider()
+    page = Response(BASE_URL + "Calendar.aspx", request=Request(BASE_URL))
+    item = meeting("Agenda", "Minutes")
+    outputs = list(middleware.process_spider_output(page, [item], spider))
+    # The third URL waits for one of the two checks allowed at once for the host
+    assert all(output.method == "HEAD" for output in outputs)
+    assert len(outputs) == 2
+    first, second = outputs
+
+    third = respond(first, headers={"Content-Type": "text/html", "Content-Length": "5"})
+    assert len(third) == 1 and isinstance(third[0], Request)
+    # Servers that don't allow HEAD get a GET for the first byte
+    retry = respond(second, status=405)[0]
+    assert retry.method == "GET" and retry.headers["Range"] == b"bytes=0-0"
+    assert respond(retry, status=404) == []
+    outputs = respond(
+        third[0],
+        status=206,
+        headers={"Content-Type": "application/pdf", "Content-Range": "bytes 0-0/2048"},
+    )
+    assert outputs == [item]
+    assert len(item["links"]) == 1
+    assert middleware.stats.get_value("link_check/dead") == 1
+
+    cached = middleware.cache.items("links")
+    assert set(cached) == {SOURCE_URL, first.url, third[0].url} - {retry.url}
+    assert cached[third[0].url]["status"] == 206
+
+    # Checked links aren't requested again
+    middleware.results = {}
+    item = meeting("Agenda")
+    item["links"].append({"href": retry.url, "title": "Minutes"})
+    outputs = list(middleware.process_spider_output(page, [item], spider))
+    assert [output.url for output in outputs] == [retry.url]
+    assert respond(outputs[0], status=500) == [item]
+    assert len(item["links"]) == 2
+
+
+def test_link_errors(middleware):
+    spider = LinkSpider()
+    page = Response(BASE_URL + "Calendar.aspx", request=Request(BASE_URL))
+    first, second = list(
+        middleware.process_spider_output(page, [meeting("Agenda")], spider)
+    )
+    assert respond(first) == []
+    failure = Failure(ConnectionError())
+    failure.request = second
+    outputs = list(second.errback(failure))
+    assert len(outputs) == 1 and outputs[0]["source"] == SOURCE_URL
+    assert middleware.stats.get_value("link_check/errors") == 1
+
+    # Responses to link checks pass through unchanged
+    response = Response(first.url, request=first)
+    assert list(middleware.process_spider_output(response, [1], spider)) == [1]
+
+
+def test_link_expiration(middleware):
+    spider = LinkSpider()
+    page = Response(BASE_URL + "Calendar.aspx", request=Request(BASE_URL))
+    with freeze_time("2019-01-22"):
+        item = meeting()
+        (check,) = middleware.process_spider_output(page, [item], spider)
+        assert respond(check) == [item]
+
+    middleware.results = {}
+    with freeze_time("2019-01-22 23:00"):
+        assert list(middleware.process_spider_output(page, [item], spider)) == [item]
+
+    # Working links are checked again once their result expires
+    middleware.results = {}
+    with freeze_time("2019-01-23 01:00"):
+        (check,) = middleware.process_spider_output(page, [item], spider)
+        assert check.url == SOURCE_URL
@@ -0,0 +1,111 @@
+import json
+from datetime import datetime, timedelta
+
+from city_scrapers_core.constants import CANCELLED
+from city_scrapers_core.items import Meeting
+from city_scrapers_core.spiders import CityScrapersSpider
+from scrapy.settings import Settings
+from scrapy.signalmanager import SignalManager
+
+from city_scrapers.pipelines import LocalDiffPipeline
+
+now = datetime.now().replace(microsecond=0)
+upcoming_start = now + timedelta(days=7)
+past_start = now - timedelta(days=7)
+
+
+class FakeCrawler:
+    def __init__(self, settings):
+        self.settings = Settings(settings)
+        self.signals = SignalManager()
+        self.spider = CityScrapersSpider(name="test_spider")
+
+
+def ocd_item(meeting_id, uid, start):
+    return {
+        "_id": uid,
+        "start_time": start.isoformat() + "-04:00",
+        "status": "tentative",
+        "extras": {"cityscrapers/id": meeting_id},
+    }
+
+
+def open_pipeline(tmp_path, run, **settings):
+    crawler = FakeCrawler(
+        dict(
+            {
+                "ITEM_PIPELINES": {
+                    "city_scrapers_core.pipelines.OpenCivicDataPipeline": 400
+                },
+                "CITY_SCRAPERS_MEETING_STORE_PATH": str(tmp_path / run / "%(name)s.db"),
+                # Local directory standing in for object storage
+                "CITY_SCRAPERS_MEETING_STORE_URI": str(
+                    tmp_path / "remote" / "%(name)s.db"
+                ),
+            },
+            **settings
+        )
+    )
+    return LocalDiffPipeline.from_crawler(crawler), crawler.spider
+
+
+def test_previous_runs_from_synced_store(tmp_path):
+    pipeline, spider = open_pipeline(tmp_path, "first")
+    assert spider._previous_results == []
+    pipeline.item_scraped(ocd_item("upcoming", "ocd-event/1", upcoming_start), spider)
+    pipeline.item_scraped(ocd_item("past", "ocd-event/2", past_start), spider)
+    pipeline.spider_closed(spider)
+    assert (tmp_path / "remote" / "test_spider.db").exists()
+
+    pipeline, spider = open_pipeline(tmp_path, "second")
+    # Only upcoming meetings are loaded to be cancelled if they're missing
+    assert [item["_id"] for item in spider._previous_results] == ["ocd-event/1"]
+
+    # Past meetings are merged by point lookup
+    meeting = pipeline.process_item(Meeting(id="past", start=past_start), spider)
+    assert meeting["_id"] == "ocd-event/2"
+    new_meeting = pipeline.process_item(Meeting(id="new", start=now), spider)
+    assert "_id" not in new_meeting
+
+    cancelled = pipeline.process_item(spider._previous_results[0], spider)
+    assert cancelled["status"] == CANCELLED
+    pipeline.item_scraped(cancelled, spider)
+    pipeline.spider_closed(spider)
+
+    pipeline, spider = open_pipeline(tmp_path, "third")
+    assert spider._previous_results[0]["status"] == CANCELLED
+    pipeline.spider_closed(spider)
+
+
+def test_stale_local_store(tmp_path):
+    pipeline, spider = open_pipeline(tmp_path, "first")
+    pipeline.spider_closed(spider)
+    pipeline, spider = open_pipeline(tmp_path, "second")
+    pipeline.item_scraped(ocd_item("upcoming", "ocd-event/1", upcoming_start), spider)
+    pipeline.spider_closed(spider)
+
+    # A local copy left by the first run is replaced by the newer remote store
+    pipeline, spider = open_pipeline(tmp_path, "first")
+    assert [item["_id"] for item in spider._previous_results] == ["ocd-event/1"]
+    pipeline.spider_closed(spider)
+
+
+def test_seed_from_feed(tmp_path):
+    feed_uri = str(
+        tmp_path / "feeds" / "%(year)s" / "%(month)s" / "%(day)s" / "%(name)s.json"
+    )
+    for day, uid in [("01", "ocd-event/old"), ("02", "ocd-event/1")]:
+        feed_dir = tmp_path / "feeds" / "2020" / "01" / day
+        feed_dir.mkdir(parents=True)
+        # Only the uncompressed feed is read
+        (feed_dir / "test_spider.json.gz").write_bytes(b"")
+        (feed_dir / "test_spider.json").write_text(
+            json.dumps(ocd_item("upcoming", uid, upcoming_start)) + "\n"
+        )
+
+    # Meetings in the latest published feed keep their IDs on the first run
+    pipeline, spider = open_pipeline(tmp_path, "first", FEED_URI=feed_uri)
+    assert [item["_id"] for item in spider._previous_results] == ["ocd-event/1"]
+    meeting = pipeline.process_item(Meeting(id="upcoming", start=now), spider)
+    assert meeting["_id"] == "ocd-event/1"
+    pipeline.spider_closed(spider)
@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+from city_scrapers_core.spiders import CityScrapersSpider
+from freezegun import freeze_time
+from scrapy.utils.test import get_crawler
+
+from city_scrapers.mixins import DateWindowMixin
+
+
+class WindowSpider(DateWindowMixin, CityScrapersSpider):
+    name = "window"
+    history_start = date(2015, 1, 1)
+    window_days = 30
+    horizon_days = 365
+
+
+@pytest.fixture
+def settings(tmpdir):
+    return {"CITY_SCRAPERS_SPIDER_CACHE_PATH": str(tmpdir.join("cache.db"))}
+
+
+def run(settings, run_date, reason="finished", **kwargs):
+    with freeze_time(run_date):
+        spider = WindowSpider.from_crawler(
+            get_crawler(WindowSpider, settings), **kwargs
+        )
+        window = spider.date_window()
+        spider.closed(reason)
+    return window
+
+
+def test_date_window(settings):
+    assert run(settings, "2020-03-01") == (date(2015, 1, 1), date(2021, 3, 1))
+    assert run(settings, "2020-05-01") == (date(2020, 1, 31), date(2021, 5, 1))
+    # Cursors only move when runs finish
+    assert run(settings, "2020-06-01", reason="shutdown")[0] == date(2020, 4, 1)
+    assert run(settings, "2020-06-02")[0] == date(2020, 4, 1)
+    assert run(settings, "2020-06-03")[0] == date(2020, 5, 3)
+
+
+def test_full_backfill(settings):
+    run(settings, "2020-03-01")
+    assert run(settings, "2020-03-02", full_backfill="true")[0] == date(2015, 1, 1)
+    assert run(settings, "2020-03-03", full_backfill="0")[0] == date(2020, 2, 1)
+    settings["CITY_SCRAPERS_FULL_BACKFILL"] = True
+    assert run(settings, "2020-03-04")[0] == date(2015, 1, 1)
+
+
+def test_without_crawler():
+    spider = WindowSpider()
+    assert spider.cache is None
+    with freeze_time("2020-03-01"):
+        assert spider.date_window() == (date(2015, 1, 1), date(2021, 3, 1))
+    spider.closed("finished")
@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from os.path import dirname, join
 
@@ -5,6 +6,8 @@ import pytest
 from city_scrapers_core.constants import BOARD
 from city_scrapers_core.utils import file_response
 from freezegun import freeze_time
+from scrapy import Request
+from scrapy.http import TextResponse
 
 from city_scrapers.spiders.pa_development import PaDevelopmentSpider
 
@@ -74,3 +77,24 @@ def test_classification():
 @pytest.mark.parametrize("item", parsed_items)
 def test_all_day(item):
     assert item["all_day"] is False
+
+
+def test_pages():
+    with freeze_time("2019-03-11"):
+        spider = PaDevelopmentSpider()
+        request = next(spider.start_requests())
+        assert request.url == (
+            "https://dced.pa.gov/wp-json/tribe/events/v1/events?page=1&per_page=50"
+            "&start_date=2019-01-01&end_date=2029-03-08"
+        )
+        data = dict(json.loads(test_response.text), total_pages=3)
+        response = TextResponse(
+            request.url, body=json.dumps(data).encode(), request=request
+        )
+        outputs = list(spider.parse(response))
+
+    page_requests = [output for output in outputs if isinstance(output, Request)]
+    assert [r.url.split("&")[0][-6:] for r in page_requests] == ["page=2", "page=3"]
+    assert len(outputs) == len(parsed_items) + 2
+    page = TextResponse(page_requests[0].url, body=test_response.body)
+    assert len(list(page_requests[0].callback(page))) == len(parsed_items)
@@ -81,3 +81,15 @@ def test_all_day(item):
 # @pytest.mark.parametrize("item", parsed_items)
 # def test_all_day(item):
 #     assert item["all_day"] is False
+
+
+def test_other_date_formats():
+    # Dates outside the usual format are still found in the line
+    response = test_response.replace(
+        body=test_response.body.replace(
+            b"Thursday, January 16, 2020 -", b"Thurs., Jan. 16, 2020 -"
+        )
+    )
+    with freeze_time("2020-01-16"):
+        items = list(spider.parse(response))
+    assert [item["start"] for item in items] == [item["start"] for item in parsed_items]
@@ -0,0 +1,128 @@
+from os.path import dirname, join
+
+from city_scrapers_core.constants import PASSED, TENTATIVE
+from city_scrapers_core.utils import file_response
+from freezegun import freeze_time
+from scrapy import Request
+from scrapy.utils.test import get_crawler
+
+from city_scrapers.middlewares import ParseCacheMiddleware
+from city_scrapers.spiders.alle_airport import AlleAirportSpider
+from city_scrapers.spiders.bethel_park_public_meetings import BethelParkSpider
+from city_scrapers.spiders.pitt_ethics_board import PittEthicsBoardSpider
+
+test_response = file_response(
+    join(dirname(__file__), "files", "pitt_ethics_board.html"),
+    url="http://pittsburghpa.gov/ehb/ehb-meetings",
+)
+spider = PittEthicsBoardSpider()
+
+
+def open_middleware(path):
+    crawler = get_crawler(
+        PittEthicsBoardSpider, {"CITY_SCRAPERS_PARSE_CACHE_PATH": path}
+    )
+    middleware = ParseCacheMiddleware.from_crawler(crawler)
+    middleware.spider_opened(spider)
+    return crawler, middleware
+
+
+def unparsed():
+    raise AssertionError("Callback should have been skipped")
+    yield
+
+
+def test_skips_unchanged_response(tmpdir):
+    path = str(tmpdir.join("parse_cache.db"))
+    crawler, middleware = open_middleware(path)
+    with freeze_time("2020-02-09"):
+        parsed_items = list(
+            middleware.process_spider_output(
+                test_response, spider.parse(test_response), spider
+            )
+        )
+    middleware.spider_closed(spider)
+    assert crawler.stats.get_value("parse_cache/miss") == 1
+
+    crawler, middleware = open_middleware(path)
+    with freeze_time("2030-01-01"):
+        cached_items = list(
+            middleware.process_spider_output(test_response, unparsed(), spider)
+        )
+    middleware.spider_closed(spider)
+
+    assert crawler.stats.get_value("parse_cache/skip_ratio") == 1
+    assert len(cached_items) == len(parsed_items)
+    assert [item["id"] for item in cached_items] == [
+        item["id"] for item in parsed_items
+    ]
+    assert TENTATIVE in [item["status"] for item in parsed_items]
+    assert all(item["status"] == PASSED for item in cached_items)
+
+
+def test_code_change_invalidates(tmpdir):
+    path = str(tmpdir.join("parse_cache.db"))
+    _, middleware = open_middleware(path)
+    list(
+        middleware.process_spider_output(
+            test_response, spider.parse(test_response), spider
+        )
+    )
+    middleware.spider_closed(spider)
+
+    crawler, middleware = open_middleware(path)
+    middleware.code_version = "changed"
+    items = list(
+        middleware.process_spider_output(
+            test_response, spider.parse(test_response), spider
+        )
+    )
+    middleware.spider_closed(spider)
+    assert len(items) > 0
+    assert crawler.stats.get_value("parse_cache/hit") is None
+
+
+def parse_twice(tmpdir, first, second):
+    path = str(tmpdir.join("parse_cache.db"))
+    for response in [first, second]:
+        crawler, middleware = open_middleware(path)
+        list(middleware.process_spider_output(response, spider.parse(response), spider))
+        middleware.spider_closed(spider)
+    return crawler
+
+
+def test_request_meta_in_key(tmpdir):
+    first = test_response.replace(
+        request=Request(test_response.url, meta={"year": 2020, "depth": 1})
+    )
+    second = test_response.replace(
+        request=Request(test_response.url, meta={"year": 2021, "depth": 1})
+    )
+    crawler = parse_twice(tmpdir, first, second)
+    assert crawler.stats.get_value("parse_cache/hit") is None
+
+    # Meta that Scrapy sets itself doesn't change the key
+    third = test_response.replace(
+        request=Request(test_response.url, meta={"year": 2020, "depth": 2})
+    )
+    crawler = parse_twice(tmpdir, first, third)
+    assert crawler.stats.get_value("parse_cache/hit") == 1
+
+
+def test_skips_cb_kwargs(tmpdir):
+    response = test_response.replace(
+        request=Request(test_response.url, cb_kwargs={"key": "value"})
+    )
+    crawler = parse_twice(tmpdir, response, response)
+    assert crawler.stats.get_value("parse_cache/hit") is None
+    assert crawler.stats.get_value("parse_cache/miss") is None
+
+
+def test_skips_date_dependent_spiders(tmpdir, monkeypatch):
+    # Spiders whose output depends on the current date opt out entirely
+    monkeypatch.setattr(PittEthicsBoardSpider, "dont_parse_cache", True, raising=False)
+    crawler = parse_twice(tmpdir, test_response, test_response)
+    assert crawler.stats.get_value("parse_cache/hit") is None
+    assert crawler.stats.get_value("parse_cache/miss") is None
+    assert BethelParkSpider.dont_parse_cache
+    assert AlleAirportSpider.dont_parse_cache
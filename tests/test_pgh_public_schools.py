@@ -1,7 +1,12 @@
+import json
+import time
 from os.path import dirname, join
 
+import pytest
 from city_scrapers_core.utils import file_response
 from freezegun import freeze_time
+from scrapy.http import Response, TextResponse
+from scrapy.utils.test import get_crawler
 
 from city_scrapers.spiders.pgh_public_schools import PghPublicSchoolsSpider
 
@@ -9,6 +14,14 @@ test_detail_response = file_response(
     join(dirname(__file__), "files", "pgh_public_schools", "detail.json"),
     url="https://awsapieast1-prod2.schoolwires.com/REST/api/v4/CalendarEvents/GetEventDate/1/17864",
 )
+test_token_response = file_response(
+    join(dirname(__file__), "files", "pgh_public_schools", "token.json"),
+    url=PghPublicSchoolsSpider.start_urls[0],
+)
+test_calendar_response = file_response(
+    join(dirname(__file__), "files", "pgh_public_schools", "calendar.json"),
+    url="https://awsapieast1-prod2.schoolwires.com/REST/api/v4/CalendarEvents/GetEvents/1",
+)
 spider = PghPublicSchoolsSpider()
 
 freezer = freeze_time("2019-02-26")
@@ -67,3 +80,107 @@ def test_title():
 # @pytest.mark.parametrize("item", parsed_items)
 # def test_all_day(item):
 #     assert item["all_day"] is False
+
+
+@pytest.fixture
+def cached_spider(tmpdir):
+    crawler = get_crawler(
+        PghPublicSchoolsSpider,
+        {"CITY_SCRAPERS_SPIDER_CACHE_PATH": str(tmpdir.join("cache.db"))},
+    )
+    spider = PghPublicSchoolsSpider.from_crawler(crawler)
+    yield spider
+    spider.closed("finished")
+
+
+def test_cached_token(cached_spider):
+    assert (
+        next(cached_spider.start_requests()).url == PghPublicSchoolsSpider.start_urls[0]
+    )
+
+    token_response = test_token_response.replace(request=cached_spider._token_request())
+    calendar_request = next(cached_spider.parse(token_response))
+    assert calendar_request.headers["Authorization"].startswith(b"Bearer eyJ")
+
+    # The fixture's token expired in 2019
+    assert (
+        next(cached_spider.start_requests()).url == PghPublicSchoolsSpider.start_urls[0]
+    )
+    cached_spider.cache.set(
+        "token", "api", {"Token": "cached", "ExpirationTime": time.time() + 3600}
+    )
+    request = next(cached_spider.start_requests())
+    assert request.headers["Authorization"] == b"Bearer cached"
+
+    rejected = Response(request.url, status=401, request=request)
+    token_request = next(cached_spider._parse_api(rejected))
+    assert token_request.callback == cached_spider.parse
+    assert cached_spider.cache.get("token", "api") is None
+
+    # A new token is only requested once if it's rejected too
+    token_response = test_token_response.replace(request=token_request)
+    retried = next(cached_spider.parse(token_response))
+    rejected = Response(retried.url, status=401, request=retried)
+    assert list(cached_spider._parse_api(rejected)) == []
+
+
+def test_rejected_token_without_cache():
+    request = spider._calendar_request("token")
+    rejected = Response(request.url, status=401, request=request)
+    assert next(spider._parse_api(rejected)).callback == spider.parse
+
+
+def test_cached_details(cached_spider):
+    calendar = json.loads(test_calendar_response.text)
+
+    def crawl_calendar(events):
+        request = cached_spider._calendar_request("token")
+        response = TextResponse(
+            request.url, body=json.dumps(events).encode(), request=request
+        )
+        return list(cached_spider._parse_api(response))
+
+    detail_requests = crawl_calendar(calendar)
+    assert [r.cb_kwargs["event_id"] for r in detail_requests] == [
+        event["Id"] for event in calendar
+    ]
+    with freeze_time("2019-02-26"):
+        for request in detail_requests:
+            items = list(
+                cached_spider._parse_detail_api(
+                    test_detail_response, **request.cb_kwargs
+                )
+            )
+            assert items[0]["title"] == "2nd Report Card"
+
+    with freeze_time("2019-02-26"):
+        outputs = crawl_calendar(calendar)
+    assert [item["title"] for item in outputs] == ["2nd Report Card"] * len(calendar)
+    assert outputs[0]["source"] == test_detail_response.url
+    assert cached_spider.crawler.stats.get_value(
+        "pgh_public_schools/cached_details"
+    ) == len(calendar)
+
+    # Changed events are requested again and removed events are dropped
+    changed = dict(calendar[0], Title="Rescheduled")
+    outputs = crawl_calendar([changed])
+    assert [r.cb_kwargs["event_id"] for r in outputs] == [changed["Id"]]
+    assert cached_spider.cache.keys("details") == {str(changed["Id"])}
+
+
+def test_date_window(tmpdir):
+    crawler = get_crawler(
+        PghPublicSchoolsSpider,
+        {"CITY_SCRAPERS_SPIDER_CACHE_PATH": str(tmpdir.join("cache.db"))},
+    )
+    with freeze_time("2020-03-15"):
+        spider = PghPublicSchoolsSpider.from_crawler(crawler)
+        assert "StartDate=2019-02-01&EndDate=2030-03-13&" in (
+            spider._calendar_request("token").url
+        )
+        spider.closed("finished")
+
+    with freeze_time("2020-06-01"):
+        spider = PghPublicSchoolsSpider.from_crawler(crawler)
+        assert "StartDate=2020-01-15&" in spider._calendar_request("token").url
+        spider.closed("finished")
@@ -1,9 +1,11 @@
+import json
 from datetime import datetime
 from os.path import dirname, join
 
 import pytest
 from city_scrapers_core.utils import file_response
 from freezegun import freeze_time
+from twisted.python.failure import Failure
 
 from city_scrapers.spiders.pitt_housing_opp import PittHousingOppSpider
 
@@ -11,12 +13,22 @@ test_response = file_response(
     join(dirname(__file__), "files", "pitt_housing_opp.html"),
     url="https://www.ura.org/events/housing-opportunity-fund-advisory-board-meeting",
 )
+test_events_response = file_response(
+    join(dirname(__file__), "files", "pitt_housing_opp.json"),
+    url="http://www.ura.org/events.json",
+)
 spider = PittHousingOppSpider()
 
 freezer = freeze_time("2019-03-13")
 freezer.start()
 
 parsed_items = [item for item in spider.parse(test_response)]
+parsed_requests = [request for request in spider.parse_events(test_events_response)]
+events_items = [
+    item
+    for request in parsed_requests
+    for item in spider._parse_detail(test_response, **request.cb_kwargs)
+]
 
 freezer.stop()
 
@@ -86,3 +98,66 @@ def test_classification():
 @pytest.mark.parametrize("item", parsed_items)
 def test_all_day(item):
     assert item["all_day"] is False
+
+
+def test_start_requests():
+    requests = [request for request in spider.start_requests()]
+    assert [request.url for request in requests] == ["http://www.ura.org/events.json"]
+    assert requests[0].callback == spider.parse_events
+
+
+def test_detail_requests():
+    base_url = (
+        "https://www.ura.org/events/housing-opportunity-fund-advisory-board-meeting"
+    )
+    assert [request.url for request in parsed_requests] == [
+        base_url + "?day=4-4-2019",
+        base_url + "?day=6-6-2019",
+    ]
+
+
+def test_events_meetings():
+    assert [item["start"] for item in events_items] == [
+        datetime(2019, 4, 4, 9, 0),
+        datetime(2019, 6, 6, 9, 0),
+    ]
+    assert [item["end"] for item in events_items] == [
+        datetime(2019, 4, 4, 11, 0),
+        datetime(2019, 6, 6, 11, 0),
+    ]
+    for item in events_items:
+        assert item["title"] == "Housing Opportunity Fund Advisory Board Meeting"
+        assert item["location"] == location
+        assert "The Housing Opportunity Fund (HOF) was " in item["description"]
+    assert events_items[1]["id"] == (
+        "pitt_housing_opp/201906060900/x/housing_opportunity_fund_advisory_board_meeting"
+    )
+
+
+def test_detail_failed():
+    failed_spider = PittHousingOppSpider()
+    requests = list(failed_spider.parse_events(test_events_response))
+    failure = Failure(ConnectionRefusedError())
+    failure.request = requests[1]
+    items = list(failed_spider._detail_failed(failure))
+    assert [item["start"] for item in items] == [datetime(2019, 6, 6, 9, 0)]
+    assert items[0]["location"] == location
+    assert items[0]["description"] == ""
+
+
+def test_event_urls():
+    url = "https://www.ura.org/events/housing-opportunity-fund-advisory-board-meeting-2"
+    event = {
+        "title": "Housing Opportunity Fund Advisory Board Meeting",
+        "start": "2019-04-04T09:00:00.000-04:00",
+        "end": "2019-04-04T11:00:00.000-04:00",
+        "url": url,
+    }
+    response = test_events_response.replace(body=json.dumps([event, event]).encode())
+    url_spider = PittHousingOppSpider()
+    requests = list(url_spider.parse_events(response))
+    # Events listed twice share the detail request at their own url
+    assert [request.url for request in requests] == [url]
+    with freeze_time("2019-03-13"):
+        items = list(url_spider._parse_detail(test_response, **requests[0].cb_kwargs))
+    assert [item["source"] for item in items] == [url, url]
@@ -0,0 +1,77 @@
+import pstats
+from collections import deque
+from os.path import dirname, join
+from types import SimpleNamespace
+
+import pytest
+from city_scrapers_core.pipelines import DefaultValuesPipeline, MeetingPipeline
+from city_scrapers_core.utils import file_response
+from freezegun import freeze_time
+from scrapy import Request
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.test import get_crawler
+
+from city_scrapers.extensions import InstrumentationExtension, ProfilerExtension
+from city_scrapers.spiders.pitt_ethics_board import PittEthicsBoardSpider
+
+test_response = file_response(
+    join(dirname(__file__), "files", "pitt_ethics_board.html"),
+    url="http://pittsburghpa.gov/ehb/ehb-meetings",
+)
+
+
+def test_not_configured():
+    with pytest.raises(NotConfigured):
+        ProfilerExtension.from_crawler(get_crawler(PittEthicsBoardSpider))
+    with pytest.raises(NotConfigured):
+        ProfilerExtension.from_crawler(
+            get_crawler(
+                PittEthicsBoardSpider,
+                {"CITY_SCRAPERS_PROFILE_SPIDERS": "pitt_city_planning"},
+            )
+        )
+
+
+@freeze_time("2020-02-09")
+def test_profile(tmp_path):
+    crawler = get_crawler(
+        PittEthicsBoardSpider,
+        {
+            "CITY_SCRAPERS_PROFILE_SPIDERS": "pitt_ethics_board,pitt_city_planning",
+            "CITY_SCRAPERS_PROFILE_PATH": str(tmp_path / "%(name)s"),
+            "CITY_SCRAPERS_PROFILE_TOP": 5,
+            "CITY_SCRAPERS_INSTRUMENTATION_PATH": str(tmp_path / "%(name)s.json"),
+        },
+    )
+    spider = PittEthicsBoardSpider()
+    pipelines = [DefaultValuesPipeline(), MeetingPipeline()]
+    itemproc = SimpleNamespace(
+        methods={"process_item": deque(p.process_item for p in pipelines)}
+    )
+    crawler.engine = SimpleNamespace(scraper=SimpleNamespace(itemproc=itemproc))
+    # Both extensions wrap the same callbacks and pipelines
+    extensions = [
+        InstrumentationExtension.from_crawler(crawler),
+        ProfilerExtension.from_crawler(crawler),
+    ]
+    request = Request(test_response.url)
+    for ext in extensions:
+        ext.spider_opened(spider)
+        ext.request_scheduled(request, spider)
+    callback = request.callback
+    for ext in extensions:
+        ext.request_scheduled(request, spider)
+    assert request.callback is callback
+
+    for item in request.callback(test_response):
+        for process_item in itemproc.methods["process_item"]:
+            item = process_item(item, spider)
+    for ext in extensions:
+        ext.spider_closed(spider, "finished")
+
+    stats = pstats.Stats(str(tmp_path / "pitt_ethics_board.prof"))
+    profiled = {func_name for _, _, func_name in stats.stats}
+    assert {"parse", "_parse_title", "process_item"} <= profiled
+    summary = (tmp_path / "pitt_ethics_board.txt").read_text()
+    assert "cumulative" in summary
+    assert (tmp_path / "pitt_ethics_board.json").exists()
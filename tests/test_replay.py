@@ -0,0 +1,110 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from scrapy import Request, Spider
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+
+from city_scrapers.middlewares import RecorderMiddleware, ReplayMiddleware
+from city_scrapers.replay import RecordingStore, ReplayServer
+
+TOKEN_URL = "https://www.pghschools.org/Generator/TokenGenerator.ashx/ProcessRequest"
+EVENTS_URL = "https://awsapieast1-prod2.schoolwires.com/REST/api/v4/CalendarEvents/"
+
+
+def download(request):
+    """Fetch a Scrapy request with urllib and return a Scrapy response"""
+    try:
+        res = urllib.request.urlopen(
+            urllib.request.Request(request.url, data=request.body or None)
+        )
+        status, res_headers, body = res.status, res.headers, res.read()
+    except urllib.error.HTTPError as e:
+        status, res_headers, body = e.code, e.headers, b""
+    return Response(
+        request.url, status=status, headers=dict(res_headers.items()), body=body
+    )
+
+
+@pytest.fixture
+def recording_path(tmpdir):
+    spider = Spider(name="pgh_public_schools")
+    path = str(tmpdir.join("recordings.db"))
+    crawler = get_crawler(
+        Spider, {"CITY_SCRAPERS_RECORD": True, "CITY_SCRAPERS_RECORDING_PATH": path}
+    )
+    middleware = RecorderMiddleware.from_crawler(crawler)
+    middleware.spider_opened(spider)
+    for url, body in [
+        (TOKEN_URL, b'{"Token": "first"}'),
+        (TOKEN_URL, b'{"Token": "second"}'),
+        (EVENTS_URL + "GetEvents/1?StartDate=2019-02-01", b"[]"),
+    ]:
+        response = Response(
+            url, headers={"Content-Type": "application/json"}, body=body
+        )
+        assert middleware.process_response(Request(url), response, spider) is response
+    middleware.spider_closed(spider)
+    assert crawler.stats.get_value("replay/recorded") == 3
+    return path
+
+
+@pytest.fixture
+def replay_url(recording_path):
+    store = RecordingStore(recording_path)
+    server = ReplayServer(("127.0.0.1", 0), store)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(server.server_port)
+    server.shutdown()
+    server.server_close()
+    store.close()
+
+
+def replay(middleware, spider, url):
+    request = middleware.process_request(Request(url), spider)
+    assert request.url == middleware.replay_url + url
+    assert request.meta["download_slot"] in url
+    assert middleware.process_request(request, spider) is None
+    return request, middleware.process_response(request, download(request), spider)
+
+
+def test_prod_settings_keep_recorder():
+    from city_scrapers.settings import prod
+
+    assert "city_scrapers.middlewares.RecorderMiddleware" in (
+        prod.DOWNLOADER_MIDDLEWARES
+    )
+
+
+def test_not_configured():
+    with pytest.raises(NotConfigured):
+        RecorderMiddleware.from_crawler(get_crawler(Spider))
+    with pytest.raises(NotConfigured):
+        ReplayMiddleware.from_crawler(get_crawler(Spider))
+
+
+def test_replays_recording(replay_url):
+    spider = Spider(name="pgh_public_schools")
+    middleware = ReplayMiddleware.from_crawler(
+        get_crawler(Spider, {"CITY_SCRAPERS_REPLAY_URL": replay_url})
+    )
+
+    request, response = replay(middleware, spider, TOKEN_URL)
+    assert response.url == TOKEN_URL
+    assert response.body == b'{"Token": "first"}'
+    assert response.headers["Content-Type"] == b"application/json"
+    # Repeated requests get each recorded response in turn, then the last one again
+    for _ in range(2):
+        assert replay(middleware, spider, TOKEN_URL)[1].body == b'{"Token": "second"}'
+
+    # Query strings built from the current date fall back to the recorded path
+    _, response = replay(
+        middleware, spider, EVENTS_URL + "GetEvents/1?StartDate=2020-02-01"
+    )
+    assert response.status == 200 and response.body == b"[]"
+    _, response = replay(middleware, spider, EVENTS_URL + "GetEventDate/1/1")
+    assert response.status == 404
@@ -0,0 +1,143 @@
+import pytest
+from twisted.internet import defer
+
+from city_scrapers.runner import (
+    FAILED,
+    OK,
+    SpiderRun,
+    crawl_all,
+    format_summary,
+    shard_spiders,
+    update_history,
+)
+
+
+class FakeStats:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def get_stats(self):
+        return self.stats
+
+
+class FakeCrawler:
+    def __init__(self, name, stats):
+        self.name = name
+        self.stats = FakeStats(stats)
+
+
+class FakeProcess:
+    """Stands in for a CrawlerProcess with crawls that finish immediately"""
+
+    def __init__(self, results):
+        self.results = results
+        self.running = 0
+        self.max_running = 0
+        self.pending = []
+
+    def create_crawler(self, name):
+        if name not in self.results:
+            raise KeyError("Spider not found: {}".format(name))
+        return FakeCrawler(name, self.results[name])
+
+    def crawl(self, crawler):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        d = defer.Deferred()
+        self.pending.append(d)
+        return d
+
+    def finish_next(self):
+        self.running -= 1
+        self.pending.pop(0).callback(None)
+
+
+finished_stats = {"finish_reason": "finished", "item_scraped_count": 3}
+error_stats = {"finish_reason": "finished", "log_count/ERROR": 2}
+
+
+def test_finish_ok():
+    run = SpiderRun("spider")
+    run.start()
+    run.finish(finished_stats)
+    assert run.status == OK
+    assert run.item_count == 3
+    assert run.elapsed >= 0
+
+
+def test_finish_errors():
+    run = SpiderRun("spider")
+    run.finish(error_stats)
+    assert run.status == FAILED
+    assert run.error_count == 2
+
+
+def test_crawl_all_concurrency():
+    process = FakeProcess({"a": finished_stats, "b": error_stats, "c": finished_stats})
+    results = []
+    crawl_all(process, ["a", "b", "c", "missing"], 2).addCallback(results.extend)
+    while process.pending:
+        process.finish_next()
+    assert process.max_running == 2
+    assert [run.name for run in results] == ["a", "b", "c", "missing"]
+    assert [run.status for run in results] == [OK, FAILED, OK, FAILED]
+    assert "Spider not found" in results[3].error
+
+
+def test_format_summary():
+    run = SpiderRun("spider")
+    run.finish(error_stats)
+    summary = format_summary([run])
+    assert "spider" in summary
+    assert summary.endswith("1 spiders, 1 failed")
+
+
+history = {
+    "pgh_public_schools": [300.0],
+    "alle_county": [200.0, 240.0],
+    "pitt_city_council": [250.0],
+    "alle_airport": [5.0],
+    "pa_liquorboard": [10.0],
+    "pitt_art_commission": [8.0],
+}
+heavy = ["pgh_public_schools", "alle_county", "pitt_city_council"]
+
+
+def test_shard_spiders_balanced():
+    shards = shard_spiders(list(history) + ["new_spider"], history, 3)
+    assert sorted(name for shard in shards for name in shard) == sorted(
+        list(history) + ["new_spider"]
+    )
+    totals = [
+        sum(sum(history.get(n, [50.0])) / len(history.get(n, [50.0])) for n in shard)
+        for shard in shards
+    ]
+    assert max(totals) - min(totals) < 100
+
+
+def test_shard_spiders_heavy_separate():
+    shards = shard_spiders(list(history), {}, 3, heavy=heavy)
+    for shard in shards:
+        assert len([name for name in shard if name in heavy]) == 1
+
+
+def test_shard_spiders_too_many_heavy():
+    with pytest.raises(ValueError):
+        shard_spiders(list(history), {}, 2, heavy=heavy)
+    # Only heavy spiders that are being run need their own shard
+    assert len(shard_spiders(["alle_county", "alle_airport"], {}, 2, heavy=heavy)) == 2
+
+
+def test_shard_spiders_fewer_spiders():
+    assert shard_spiders(["a", "b"], {}, 4) == [["a"], ["b"]]
+
+
+def test_update_history():
+    ok_run = SpiderRun("alle_airport")
+    ok_run.status = OK
+    ok_run.elapsed = 7.0
+    failed_run = SpiderRun("pa_liquorboard")
+    failed_run.status = FAILED
+    failed_run.elapsed = 0.1
+    updated = update_history({"alle_airport": [1, 2, 3]}, [ok_run, failed_run], keep=3)
+    assert updated == {"alle_airport": [2, 3, 7.0]}
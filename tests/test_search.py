@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+from city_scrapers.archive import find_feeds
+from city_scrapers.search import SearchIndex
+from city_scrapers.search.app import create_app
+
+
+def ocd_item(meeting_id, title, description="", start="2020-02-03T10:00:00"):
+    return {
+        "_id": "ocd-event/{}".format(meeting_id),
+        "name": title,
+        "description": description,
+        "status": "tentative",
+        "start_time": start + "-05:00",
+        "location": {"name": "City Hall 414 Grant St"},
+        "links": [{"note": "Agenda", "url": "https://example.com/agenda.pdf"}],
+        "sources": [{"url": "https://example.com", "note": ""}],
+        "extras": {
+            "cityscrapers/id": meeting_id,
+            "cityscrapers/agency": "Pittsburgh City Planning",
+        },
+    }
+
+
+def write_feed(path, items):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(json.dumps(item) for item in items))
+
+
+@pytest.fixture
+def feeds_dir(tmp_path):
+    feeds_dir = tmp_path / "feeds"
+    write_feed(
+        feeds_dir / "2020/02/01/0600/pitt_city_planning.json",
+        [
+            ocd_item("p1", "Planning Commission", "Zoning map amendments"),
+            ocd_item("p2", "Zoning Board of Adjustment", start="2019-03-01T10:00:00"),
+            ocd_item("p3", "Historic Review Commission"),
+        ],
+    )
+    return feeds_dir
+
+
+@pytest.fixture
+def index_path(tmp_path, feeds_dir):
+    path = str(tmp_path / "search.db")
+    search_index = SearchIndex(path)
+    assert search_index.update(find_feeds(str(feeds_dir))) == 3
+    search_index.close()
+    return path
+
+
+def test_ranked_results(index_path):
+    search_index = SearchIndex(index_path)
+    results = search_index.search("zoning")
+    assert results["total"] == 2
+    # Title matches are weighted above description matches
+    assert [r["id"] for r in results["results"]] == ["p2", "p1"]
+    assert search_index.search("zon*")["total"] == 2
+    assert search_index.search("agenda city hall")["total"] == 3
+    assert search_index.search("zoning", start="2020-01-01")["total"] == 1
+    assert search_index.search('"zoning" (')["total"] == 2
+    page = search_index.search("commission", page=2, per_page=1)
+    assert page["total"] == 2 and len(page["results"]) == 1
+
+
+def test_incremental_update(index_path, feeds_dir):
+    search_index = SearchIndex(index_path)
+    version = search_index.version
+    assert search_index.update(find_feeds(str(feeds_dir))) == 0
+    assert search_index.version == version
+
+    write_feed(
+        feeds_dir / "2020/02/02/0600/pitt_city_planning.json",
+        [
+            ocd_item("p1", "Planning Commission", "Zoning map amendments"),
+            ocd_item("p3", "Historic Review Commission", "Zoning overlay district"),
+        ],
+    )
+    assert search_index.update(find_feeds(str(feeds_dir))) == 1
+    assert search_index.version == version + 1
+    assert search_index.search("zoning")["total"] == 3
+    assert search_index.search("overlay")["results"][0]["id"] == "p3"
+
+
+def test_app_etag(index_path, feeds_dir):
+    client = create_app(index_path).test_client()
+    response = client.get("/search?q=zoning")
+    assert response.status_code == 200
+    assert response.get_json()["total"] == 2
+    etag = response.headers["ETag"]
+
+    response = client.get("/search?q=zoning", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    feed_path = feeds_dir / "2020/02/01/0600/pitt_city_planning.json"
+    write_feed(feed_path, [ocd_item("p4", "Zoning Hearing")])
+    os.utime(str(feed_path), (0, 0))
+    search_index = SearchIndex(index_path)
+    search_index.update(find_feeds(str(feeds_dir)))
+    search_index.close()
+    response = client.get("/search?q=zoning", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["total"] == 3